@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+"""
+Benchmark per-request HTTP overhead with and without a pooled client.
+
+Fires the same number of concurrent GETs at a target twice: once with a fresh
+httpx.AsyncClient per request (what core used to do) and once through a single
+pooled client built from ollie.core.clients, then prints throughput and latency
+percentiles for both. Without --url a trivial local uvicorn server is started,
+so the numbers isolate connection setup rather than downstream work.
+
+Usage: python scripts/bench-http-pool.py [--url http://ollama:11434/api/tags] [--requests 500] [--concurrency 16]
+"""
+import argparse
+import asyncio
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+from ollie.core.clients import ServiceConfig
+
+
+async def ping(scope, receive, send):
+    """Minimal ASGI app used as the default target."""
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", b"application/json")],
+        }
+    )
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+async def run(fetch, n_requests: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            resp = await fetch()
+            resp.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(n_requests)))
+    return time.perf_counter() - start, sorted(latencies)
+
+
+def report(label: str, elapsed: float, latencies):
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(
+        f"{label:>8}: {len(latencies) / elapsed:8.1f} req/s  "
+        f"p50 {statistics.median(latencies) * 1000:6.2f} ms  p95 {p95 * 1000:6.2f} ms"
+    )
+
+
+async def bench(url: str, n_requests: int, concurrency: int):
+    async def fresh():
+        async with httpx.AsyncClient(timeout=30.0) as client:
+            return await client.get(url)
+
+    config = ServiceConfig(
+        url, read_timeout=30.0, max_connections=concurrency, max_keepalive=concurrency
+    )
+    pooled_client = config.build_client()
+
+    async def pooled():
+        return await pooled_client.get("")
+
+    # Warm both paths (DNS, server-side lazy init) before measuring
+    await run(fresh, concurrency, concurrency)
+    await run(pooled, concurrency, concurrency)
+
+    report("fresh", *await run(fresh, n_requests, concurrency))
+    report("pooled", *await run(pooled, n_requests, concurrency))
+    await pooled_client.aclose()
+
+
+def wait_until_up(url: str, timeout: float = 15.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            httpx.get(url, timeout=1.0)
+            return
+        except httpx.TransportError:
+            time.sleep(0.1)
+    raise TimeoutError(f"{url} did not come up")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", help="Target URL (default: start a local ping server)")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--port", type=int, default=8011)
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if url is None:
+        url = f"http://127.0.0.1:{args.port}/"
+        server = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "uvicorn",
+                "--app-dir",
+                sys.path[0],
+                "bench-http-pool:ping",
+                "--port",
+                str(args.port),
+                "--log-level",
+                "warning",
+            ],
+        )
+    try:
+        wait_until_up(url)
+        print(f"{args.requests} requests, concurrency {args.concurrency} -> {url}")
+        asyncio.run(bench(url, args.requests, args.concurrency))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
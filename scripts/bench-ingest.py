@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+"""
+Benchmark sustained transcript ingestion, inline vs write-behind queue.
+
+Submits --items transcripts from --concurrency concurrent producers twice, each
+time into a fresh database and memory store: once the way
+/save_streaming_transcription used to (one transaction for the conversation,
+then a single-item embedding and upsert, then the dedup remap, all before
+returning) and once through ollie.core.ingest.IngestQueue with its worker
+running. For the queue it reports both how fast producers get their
+acknowledgement and how long until every item is stored and indexed.
+
+Usage: python scripts/bench-ingest.py [--items 2000] [--concurrency 8] [--batch-size 64]
+"""
+import argparse
+import asyncio
+import shutil
+import statistics
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from ollie.core.ingest import IngestQueue
+from ollie.memory.async_memory import AsyncMemorySystem
+from ollie.memory.retrieval import MemorySystem
+from ollie.storage.database import (
+    create_async_db_engine,
+    create_db_engine,
+    to_async_url,
+)
+from ollie.storage.models import Base, Conversation, IngestItem, Session
+
+
+def transcripts(n: int):
+    return [
+        f"transcript {i}: went for a walk and talked about item {i * 7919 % 1009}"
+        for i in range(n)
+    ]
+
+
+async def inline_add(sessions, memory, session_id: int, transcript: str):
+    async with sessions() as db:
+        conv = Conversation(
+            session_id=session_id,
+            speaker="User",
+            transcript=transcript,
+            timestamp=datetime.utcnow(),
+        )
+        db.add(conv)
+        await db.flush()
+        conv.embedding_id = f"conv_{conv.id}"
+        await db.commit()
+    memory_id = await memory.add_memory(
+        text=transcript,
+        metadata={
+            "speaker": "User",
+            "session_id": session_id,
+            "timestamp": conv.timestamp.isoformat(),
+            "type": "conversation",
+        },
+        memory_id=f"conv_{conv.id}",
+    )
+    if memory_id != conv.embedding_id:
+        async with sessions() as db:
+            await db.execute(
+                update(Conversation), [{"id": conv.id, "embedding_id": memory_id}]
+            )
+            await db.commit()
+
+
+async def produce(texts, concurrency: int, submit):
+    """Run submit(text) for every text with `concurrency` producers; returns per-call latencies."""
+    pending = list(reversed(texts))
+    latencies = []
+
+    async def producer():
+        while pending:
+            text = pending.pop()
+            t = time.perf_counter()
+            await submit(text)
+            latencies.append(time.perf_counter() - t)
+
+    await asyncio.gather(*(producer() for _ in range(concurrency)))
+    return latencies
+
+
+async def run_inline(sessions, memory, texts, concurrency: int):
+    async with sessions() as db:
+        session = Session()
+        db.add(session)
+        await db.commit()
+    start = time.perf_counter()
+    latencies = await produce(
+        texts, concurrency, lambda text: inline_add(sessions, memory, session.id, text)
+    )
+    return latencies, time.perf_counter() - start
+
+
+async def run_queued(sessions, memory, texts, concurrency: int, batch_size: int):
+    queue = IngestQueue(memory, sessions, batch_size=batch_size)
+    first = await queue.enqueue(texts[0])
+    worker = asyncio.create_task(queue.run_forever(poll_seconds=0.5))
+    start = time.perf_counter()
+    latencies = await produce(
+        texts[1:], concurrency, lambda text: queue.enqueue(text, first.session_id)
+    )
+    accepted = time.perf_counter() - start
+    while True:
+        async with sessions() as db:
+            remaining = await db.scalar(select(func.count()).select_from(IngestItem))
+        if not remaining:
+            break
+        await asyncio.sleep(0.05)
+    drained = time.perf_counter() - start
+    worker.cancel()
+    return latencies, accepted, drained
+
+
+def report(label: str, n: int, latencies, seconds: float):
+    latencies.sort()
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    print(
+        f"  {label:<24} {n / seconds:>9.1f} {statistics.median(latencies) * 1000:>9.2f} {p95 * 1000:>9.2f}"
+    )
+
+
+async def bench(args, workdir: Path, memory_factory):
+    texts = transcripts(args.items)
+    print(f"  {'':<24} {'items/s':>9} {'p50 ms':>9} {'p95 ms':>9}")
+    for mode in ("inline", "queued"):
+        url = f"sqlite:///{workdir / mode / 'ollie.db'}"
+        shutil.rmtree(workdir / mode, ignore_errors=True)
+        (workdir / mode).mkdir()
+        Base.metadata.create_all(bind=create_db_engine(url))
+        engine = create_async_db_engine(to_async_url(url))
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+        memory = memory_factory(workdir / mode / "chroma")
+        if mode == "inline":
+            latencies, seconds = await run_inline(
+                sessions, memory, texts, args.concurrency
+            )
+            report("inline (ack = indexed)", len(texts), latencies, seconds)
+        else:
+            latencies, accepted, drained = await run_queued(
+                sessions, memory, texts, args.concurrency, args.batch_size
+            )
+            report("queued (ack = enqueued)", len(latencies), latencies, accepted)
+            print(f"  {'queued (all indexed)':<24} {len(texts) / drained:>9.1f}")
+        memory.shutdown()
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--items", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument(
+        "--dir", default=None, help="Where to build the databases (default: a temp dir)"
+    )
+    args = parser.parse_args()
+
+    workdir = Path(args.dir or tempfile.mkdtemp(prefix="ollie-bench-ingest-"))
+    workdir.mkdir(parents=True, exist_ok=True)
+    print(f"Ingesting {args.items} transcripts with {args.concurrency} producers")
+    asyncio.run(
+        bench(
+            args,
+            workdir,
+            lambda path: AsyncMemorySystem(MemorySystem(persist_path=str(path))),
+        )
+    )
+    if not args.dir:
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
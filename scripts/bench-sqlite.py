@@ -0,0 +1,206 @@
+#!/usr/bin/env python
+"""
+Benchmark concurrent SQLite reads and writes, default vs production profile.
+
+Builds a database with the original schema (no indexes) and --rows
+conversations, copies it and upgrades the copy with the migrations (timing the
+upgrade), then runs the same mixed workload against both for --duration
+seconds: reader threads run the queries core and the training export issue
+(a session's history, the newest sessions, a time-range scan) while writer
+threads append chat turns, one transaction per turn. The default profile
+connects with a plain engine (rollback journal, no pragmas); the production
+profile uses ollie.storage.database.create_db_engine.
+
+Usage: python scripts/bench-sqlite.py [--rows 2000000] [--readers 4] [--writers 2] [--duration 20]
+"""
+import argparse
+import random
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from ollie.storage.database import create_db_engine
+from ollie.storage.migrations import migrate
+
+LEGACY_SCHEMA = """
+CREATE TABLE sessions (id INTEGER PRIMARY KEY, start_time DATETIME, end_time DATETIME, summary TEXT);
+CREATE TABLE conversations (
+    id INTEGER PRIMARY KEY, session_id INTEGER NOT NULL REFERENCES sessions(id), timestamp DATETIME,
+    speaker VARCHAR(50), transcript TEXT, audio_path VARCHAR(255), embedding_id VARCHAR(100)
+);
+CREATE TABLE metadata (key VARCHAR(50) PRIMARY KEY, value TEXT);
+"""
+
+READS = {
+    "session_history": "SELECT speaker, transcript FROM conversations WHERE session_id = :session_id ORDER BY timestamp, id",
+    "recent_sessions": "SELECT id, start_time, summary FROM sessions ORDER BY start_time DESC LIMIT 20",
+    "time_range": "SELECT id, session_id, transcript FROM conversations WHERE timestamp >= :since ORDER BY timestamp LIMIT 500",
+}
+
+
+def populate(db_path: Path, rows: int, turns_per_session: int = 20):
+    start = datetime(2024, 1, 1)
+    n_sessions = max(1, rows // turns_per_session)
+    with sqlite3.connect(db_path) as conn:
+        conn.executescript(LEGACY_SCHEMA)
+        conn.executemany(
+            "INSERT INTO sessions (id, start_time) VALUES (?, ?)",
+            ((i + 1, start + timedelta(minutes=30 * i)) for i in range(n_sessions)),
+        )
+        conn.executemany(
+            "INSERT INTO conversations (session_id, timestamp, speaker, transcript) VALUES (?, ?, ?, ?)",
+            (
+                (
+                    i // turns_per_session + 1,
+                    start
+                    + timedelta(
+                        minutes=30 * (i // turns_per_session),
+                        seconds=i % turns_per_session,
+                    ),
+                    "User" if i % 2 == 0 else "Ollie",
+                    f"message {i} " + "lorem ipsum " * 8,
+                )
+                for i in range(rows)
+            ),
+        )
+    return n_sessions, start + timedelta(minutes=30 * n_sessions)
+
+
+def run_workload(
+    engine, n_sessions: int, end: datetime, readers: int, writers: int, duration: float
+):
+    stop = time.monotonic() + duration
+    latencies = {name: [] for name in READS}
+    latencies["write_turn"] = []
+    errors = {"locked": 0}
+    lock = threading.Lock()
+
+    def reader():
+        rng = random.Random()
+        while time.monotonic() < stop:
+            name = rng.choice(list(READS))
+            params = {
+                "session_id": rng.randint(1, n_sessions),
+                "since": end - timedelta(days=1),
+            }
+            t = time.perf_counter()
+            try:
+                with engine.connect() as conn:
+                    conn.execute(text(READS[name]), params).fetchall()
+            except OperationalError:
+                with lock:
+                    errors["locked"] += 1
+                continue
+            with lock:
+                latencies[name].append(time.perf_counter() - t)
+
+    def writer():
+        rng = random.Random()
+        while time.monotonic() < stop:
+            session_id = rng.randint(1, n_sessions)
+            now = datetime.utcnow()
+            t = time.perf_counter()
+            try:
+                with engine.begin() as conn:
+                    for speaker in ("User", "Ollie"):
+                        conn.execute(
+                            text(
+                                "INSERT INTO conversations (session_id, timestamp, speaker, transcript) VALUES (:s, :t, :sp, :tx)"
+                            ),
+                            {
+                                "s": session_id,
+                                "t": now,
+                                "sp": speaker,
+                                "tx": "benchmark turn",
+                            },
+                        )
+            except OperationalError:
+                with lock:
+                    errors["locked"] += 1
+                continue
+            with lock:
+                latencies["write_turn"].append(time.perf_counter() - t)
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)] + [
+        threading.Thread(target=writer) for _ in range(writers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors
+
+
+def report(label: str, latencies, errors, duration: float):
+    print(f"\n{label}")
+    print(f"  {'operation':<16} {'ops/s':>9} {'p50 ms':>9} {'p95 ms':>9}")
+    for name, values in latencies.items():
+        if not values:
+            print(f"  {name:<16} {0:>9}")
+            continue
+        values.sort()
+        p95 = values[min(len(values) - 1, int(len(values) * 0.95))]
+        print(
+            f"  {name:<16} {len(values) / duration:>9.1f} {statistics.median(values) * 1000:>9.2f} {p95 * 1000:>9.2f}"
+        )
+    print(f"  lock errors: {errors['locked']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument(
+        "--dir", default=None, help="Where to build the databases (default: a temp dir)"
+    )
+    args = parser.parse_args()
+
+    workdir = Path(args.dir or tempfile.mkdtemp(prefix="ollie-bench-sqlite-"))
+    workdir.mkdir(parents=True, exist_ok=True)
+    default_db, tuned_db = workdir / "default.db", workdir / "tuned.db"
+    for path in (default_db, tuned_db):
+        path.unlink(missing_ok=True)
+
+    t = time.perf_counter()
+    n_sessions, end = populate(default_db, args.rows)
+    print(
+        f"Populated {args.rows} conversations in {n_sessions} sessions in {time.perf_counter() - t:.1f}s"
+    )
+    shutil.copy(default_db, tuned_db)
+
+    tuned = create_db_engine(f"sqlite:///{tuned_db}")
+    t = time.perf_counter()
+    version = migrate(tuned)
+    print(
+        f"Migrated copy to schema version {version} in {time.perf_counter() - t:.1f}s"
+    )
+
+    default = create_engine(
+        f"sqlite:///{default_db}", connect_args={"check_same_thread": False}
+    )
+    for label, engine in (
+        ("default profile (rollback journal, no indexes)", default),
+        ("production profile (WAL, pragmas, indexes)", tuned),
+    ):
+        latencies, errors = run_workload(
+            engine, n_sessions, end, args.readers, args.writers, args.duration
+        )
+        report(label, latencies, errors, args.duration)
+        engine.dispose()
+
+    if not args.dir:
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+"""
+Measure core cold-start latency.
+
+Starts `uvicorn ollie.core.app:app` and polls until the first successful
+/health, /ready and /chat, printing the wall-clock time of each relative to
+process launch, followed by the server-side startup timings from /ready.
+
+Usage: python scripts/measure-cold-start.py [--port 8010] [--message "hello"]
+"""
+import argparse
+import subprocess
+import sys
+import time
+
+import requests
+
+
+def wait_for(method, url, deadline, **kwargs):
+    while time.time() < deadline:
+        try:
+            resp = requests.request(method, url, timeout=120, **kwargs)
+            if resp.status_code == 200:
+                return resp
+        except requests.ConnectionError:
+            pass
+        time.sleep(0.1)
+    raise TimeoutError(f"{url} did not succeed before the deadline")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--port", type=int, default=8010)
+    parser.add_argument("--message", default="hello")
+    parser.add_argument("--timeout", type=float, default=600)
+    args = parser.parse_args()
+
+    base = f"http://127.0.0.1:{args.port}"
+    start = time.time()
+    deadline = start + args.timeout
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "ollie.core.app:app",
+            "--port",
+            str(args.port),
+        ],
+    )
+    try:
+        wait_for("GET", f"{base}/health", deadline)
+        print(f"first /health: {time.time() - start:.2f}s")
+
+        ready = wait_for("GET", f"{base}/ready", deadline)
+        print(f"first /ready:  {time.time() - start:.2f}s")
+
+        wait_for("POST", f"{base}/chat", deadline, json={"message": args.message})
+        print(f"first /chat:   {time.time() - start:.2f}s")
+
+        print("server-side startup timings:")
+        for key, value in sorted(ready.json()["startup"].items()):
+            print(f"  {key}: {value}")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+"""
+Compare Ollama prompt evaluation time for the old and the prefix-stable prompt layout.
+
+Plays the same multi-turn conversation against Ollama twice. The "legacy"
+layout interpolates the turn's retrieved context into the system prompt (as
+/chat did before), so every prompt differs from its first tokens. The "stable"
+layout uses ContextAssembler. Prints prompt_eval_count and prompt_eval_duration
+per turn; with a reused KV cache only the new tail of the prompt is evaluated.
+
+Usage: python scripts/measure-prompt-eval.py [--url http://localhost:11434] [--model llama3.1:8b] [--turns 6]
+"""
+import argparse
+
+import requests
+
+from ollie.llm.context import ContextAssembler
+
+QUESTIONS = [
+    "What did we plan for the garden this spring?",
+    "Which seeds did I say I still need to buy?",
+    "When did I want to start the tomatoes indoors?",
+    "Remind me what went wrong with the peppers last year.",
+    "What was the name of the nursery we talked about?",
+    "Summarize the plan in three bullet points.",
+]
+
+
+def fake_memories(turn: int):
+    """Different retrieved context per turn, as retrieval would return."""
+    return [
+        f"Memory {turn}.{i}: note about the garden, item {turn * 7 + i}, " * 4
+        for i in range(3)
+    ]
+
+
+def legacy_messages(question, history, memories):
+    context_str = "\n".join(memories)
+    system_prompt = f"""You are Ollie, a helpful AI assistant. 
+    Use the following context from past conversations to answer the user's question if relevant.
+    
+    Context:
+    {context_str}
+    """
+    return (
+        [{"role": "system", "content": system_prompt}]
+        + history
+        + [{"role": "user", "content": question}]
+    )
+
+
+def run(layout, url, model, turns, num_ctx):
+    assembler = ContextAssembler(num_ctx=num_ctx)
+    history = []
+    total = 0.0
+    print(f"\n{layout}:")
+    for turn in range(turns):
+        question = QUESTIONS[turn % len(QUESTIONS)]
+        memories = fake_memories(turn)
+        if layout == "legacy":
+            messages = legacy_messages(question, history, memories)
+        else:
+            messages = assembler.assemble(question, history, memories)
+        resp = requests.post(
+            f"{url}/api/chat",
+            json={
+                "model": model,
+                "messages": messages,
+                "stream": False,
+                "keep_alive": "30m",
+                "options": {"num_ctx": num_ctx, "num_predict": 64},
+            },
+            timeout=600,
+        )
+        resp.raise_for_status()
+        data = resp.json()
+        seconds = data.get("prompt_eval_duration", 0) / 1e9
+        total += seconds
+        print(
+            f"  turn {turn + 1}: {data.get('prompt_eval_count', 0):5d} tokens evaluated in {seconds:.3f}s"
+        )
+        history += [
+            {"role": "user", "content": question},
+            {"role": "assistant", "content": data["message"]["content"]},
+        ]
+    print(f"  total prompt eval: {total:.3f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", default="http://localhost:11434")
+    parser.add_argument("--model", default="llama3.1:8b")
+    parser.add_argument("--turns", type=int, default=6)
+    parser.add_argument("--num-ctx", type=int, default=4096)
+    args = parser.parse_args()
+
+    for layout in ("legacy", "stable"):
+        run(layout, args.url, args.model, args.turns, args.num_ctx)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+"""
+Compare fine-tuning throughput on raw per-dialogue samples and on the packed dataset.
+
+Runs two short training runs of --steps steps on the same exported JSONL file
+and model. "raw" tokenizes every dialogue on its own (chat template, no
+filtering) and pads each batch to its longest sample, as SFTTrainer did
+before. "packed" trains on ollie.training.prepare's deduplicated, packed
+sequences. Both report useful (non-padding) tokens per second and the share
+of padding, via ollie.training.throughput.
+
+Usage: python scripts/measure-training-throughput.py --model /data/models/Llama-3.1-8B --data /data/training/daily_data.jsonl [--steps 20] [--seq-len 1024] [--batch-size 4]
+"""
+import argparse
+import tempfile
+
+from transformers import (
+    AutoModelForCausalLM,
+    AutoTokenizer,
+    DataCollatorForLanguageModeling,
+    Trainer,
+    TrainingArguments,
+    default_data_collator,
+)
+
+from ollie.training.prepare import (
+    DEFAULT_CHAT_TEMPLATE,
+    load_dialogues,
+    prepare_dataset,
+    tokenize_dialogue,
+)
+from ollie.training.throughput import CountingCollator, TokenThroughputCallback
+
+
+def raw_dataset(data_file, tokenizer, seq_len):
+    """One truncated sample per dialogue, unfiltered and unpacked."""
+    from datasets import Dataset
+
+    return Dataset.from_list(
+        [
+            {"input_ids": ids[:seq_len]}
+            for ids in (
+                tokenize_dialogue(tokenizer, messages)
+                for messages in load_dialogues(data_file)
+            )
+        ]
+    )
+
+
+def run(name, model_path, tokenizer, dataset, collator, steps, batch_size, output_dir):
+    model = AutoModelForCausalLM.from_pretrained(model_path)
+    counter = CountingCollator(collator)
+    callback = TokenThroughputCallback(counter)
+    args = TrainingArguments(
+        output_dir=output_dir,
+        max_steps=steps,
+        per_device_train_batch_size=batch_size,
+        learning_rate=2e-4,
+        logging_steps=max(1, steps // 5),
+        save_strategy="no",
+        report_to=[],
+        use_cpu=True,
+    )
+    print(f"\n{name}: {len(dataset)} samples")
+    Trainer(
+        model=model,
+        args=args,
+        train_dataset=dataset,
+        data_collator=counter,
+        callbacks=[callback],
+    ).train()
+    return callback.summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--model", required=True, help="Local path of the base model")
+    parser.add_argument(
+        "--data", required=True, help="Exported JSONL (see ollie.training.export)"
+    )
+    parser.add_argument("--steps", type=int, default=20)
+    parser.add_argument("--seq-len", type=int, default=1024)
+    parser.add_argument("--batch-size", type=int, default=4)
+    args = parser.parse_args()
+
+    tokenizer = AutoTokenizer.from_pretrained(args.model)
+    if tokenizer.pad_token is None:
+        tokenizer.pad_token = tokenizer.eos_token
+    if not tokenizer.chat_template:
+        tokenizer.chat_template = DEFAULT_CHAT_TEMPLATE
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {
+            "raw": run(
+                "raw",
+                args.model,
+                tokenizer,
+                raw_dataset(args.data, tokenizer, args.seq_len),
+                DataCollatorForLanguageModeling(tokenizer, mlm=False),
+                args.steps,
+                args.batch_size,
+                f"{tmp}/raw",
+            ),
+            "packed": run(
+                "packed",
+                args.model,
+                tokenizer,
+                prepare_dataset(
+                    args.data, tokenizer, f"{tmp}/cache", seq_len=args.seq_len
+                ),
+                default_data_collator,
+                args.steps,
+                args.batch_size,
+                f"{tmp}/packed",
+            ),
+        }
+
+    print()
+    for name, summary in results.items():
+        print(
+            f"{name:>6}: {summary['tokens_per_second']:8.1f} tokens/s, {summary['padding_fraction']:.1%} padding"
+        )
+    if results["raw"]["tokens_per_second"]:
+        print(
+            f"speedup: {results['packed']['tokens_per_second'] / results['raw']['tokens_per_second']:.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,215 @@
-from fastapi import FastAPI, HTTPException, UploadFile, File, BackgroundTasks
+from fastapi import FastAPI, HTTPException, UploadFile, File, BackgroundTasks, Query, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
+from contextlib import asynccontextmanager
+import asyncio
+import hashlib
+import json
 import os
+import time
 import httpx
-import shutil
 import uuid
+import websockets
 from datetime import datetime
-from typing import List, Optional
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+from sqlalchemy import select, update
 
 from ollie.memory.retrieval import MemorySystem
-from ollie.storage.database import get_db, init_db
+from ollie.memory.async_memory import AsyncMemorySystem
+from ollie.memory.summaries import SessionSummarizer, unsummarized_session_ids
+from ollie.memory.reindex import reindex_conversations, load_reindex_state, is_reindex_running, ReindexInProgress
+from ollie.storage.archive import MEDIA_TYPES, AudioArchive, read_segment
+from ollie.storage.browse import InvalidCursor, conversation_page, session_page
+from ollie.storage.database import async_engine, get_async_db, init_db
 from ollie.storage.models import Session, Conversation
-
-app = FastAPI(title="Ollie Core")
+from ollie.core.ingest import IngestQueue
+from ollie.core.readiness import ComponentRegistry, ComponentNotReady, record_first
+from ollie.core.clients import ServiceClients, default_service_configs, ollama_service_config
+from ollie.core.semantic_cache import CacheEntry, SemanticCache
+from ollie.llm.context import ContextAssembler, default_assembler
+from ollie.llm.pool import OllamaPool
+from ollie.llm.scheduler import OllamaScheduler
+from ollie.utils.metrics import metrics
+from ollie.utils.text import SentenceSplitter, normalize_words
+from ollie.utils.uploads import file_chunks, save_stream, upload_chunks
 
 # Service URLs
 WHISPER_URL = os.getenv("WHISPER_URL", "http://whisper:8000")
 OLLAMA_URL = os.getenv("OLLAMA_URL", "http://ollama:11434")
+# Comma-separated Ollama nodes; requests are routed across them
+OLLAMA_URLS = [url.strip() for url in os.getenv("OLLAMA_URLS", OLLAMA_URL).split(",") if url.strip()]
+OLLAMA_HEALTH_INTERVAL_SECONDS = float(os.getenv("OLLAMA_HEALTH_INTERVAL_SECONDS", "15"))
 TTS_URL = os.getenv("TTS_URL", "http://tts:8000")
+WHISPER_WS_URL = os.getenv("WHISPER_WS_URL", WHISPER_URL.replace("http", "ws", 1) + "/ws/transcribe")
 DATA_DIR = os.getenv("DATA_DIR", "/data")
+# Optional query run once after the memory system loads, to warm the model and index
+WARMUP_QUERY = os.getenv("OLLIE_WARMUP_QUERY", "")
+# Threads dedicated to embedding inference and vector queries
+MEMORY_WORKERS = int(os.getenv("MEMORY_WORKERS", "2"))
+# Session summarization (feeds the first stage of hierarchical retrieval)
+SUMMARY_INTERVAL_SECONDS = float(os.getenv("SUMMARY_INTERVAL_SECONDS", "300"))
+SESSION_IDLE_MINUTES = int(os.getenv("SESSION_IDLE_MINUTES", "30"))
+# Memory partitions older than this many months move to the cold tier (0 disables)
+COLD_AFTER_MONTHS = int(os.getenv("COLD_AFTER_MONTHS", "12"))
+RECENT_PARTITIONS = int(os.getenv("RECENT_PARTITIONS", "6"))
+# Keep the model (and its KV cache) loaded between turns; num_ctx must stay fixed
+# across requests or Ollama reloads the model and drops the cache
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+OLLAMA_NUM_CTX = int(os.getenv("OLLAMA_NUM_CTX", "4096"))
+# Generations each Ollama node runs at once, and the model used (for a cooldown) when the main one fails
+OLLAMA_MAX_CONCURRENT = int(os.getenv("OLLAMA_MAX_CONCURRENT", "1"))
+OLLAMA_FALLBACK_MODEL = os.getenv("OLLAMA_FALLBACK_MODEL", "tinyllama")
+OLLAMA_FALLBACK_COOLDOWN_SECONDS = float(os.getenv("OLLAMA_FALLBACK_COOLDOWN_SECONDS", "300"))
+# Share of the final transcript a partial one must cover for its retrieval to be reused
+VOICE_SPECULATIVE_MIN_OVERLAP = float(os.getenv("VOICE_SPECULATIVE_MIN_OVERLAP", "0.8"))
+# Opt-in reuse of responses to near-identical questions over unchanged memories
+SEMANTIC_CACHE = os.getenv("OLLIE_SEMANTIC_CACHE", "").lower() in ("1", "true", "yes")
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95"))
+SEMANTIC_CACHE_TTL_SECONDS = float(os.getenv("SEMANTIC_CACHE_TTL_SECONDS", "3600"))
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "256"))
+# Write-behind transcript ingestion: items stored and embedded per batch, how long
+# the worker lingers after a wake-up to fill a batch, and attempts before giving up
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "64"))
+INGEST_LINGER_MS = float(os.getenv("INGEST_LINGER_MS", "50"))
+INGEST_MAX_ATTEMPTS = int(os.getenv("INGEST_MAX_ATTEMPTS", "5"))
+# Uploaded audio older than this many days is transcoded into the archive (0 disables);
+# "flac" is lossless, "opus" much smaller
+AUDIO_ARCHIVE_AFTER_DAYS = int(os.getenv("AUDIO_ARCHIVE_AFTER_DAYS", "7"))
+AUDIO_ARCHIVE_FORMAT = os.getenv("AUDIO_ARCHIVE_FORMAT", "flac")
+
+def load_memory_system() -> AsyncMemorySystem:
+    memory = MemorySystem(persist_path=f"{DATA_DIR}/chroma", recent_partitions=RECENT_PARTITIONS)
+    if WARMUP_QUERY:
+        with metrics.timer("startup.warmup_query"):
+            memory.search_memory(WARMUP_QUERY, n_results=1)
+    return AsyncMemorySystem(memory, max_workers=MEMORY_WORKERS)
+
+# Keep-alive connection pools to downstream services, opened in the lifespan
+http_clients = ServiceClients(default_service_configs(WHISPER_URL, TTS_URL))
+ollama_pool = OllamaPool(
+    OLLAMA_URLS,
+    lambda url: ollama_service_config(url).build_client(),
+    check_interval=OLLAMA_HEALTH_INTERVAL_SECONDS,
+    max_outstanding=OLLAMA_MAX_CONCURRENT
+)
+
+# All /api/chat calls queue here; chat goes before background summaries
+llm_scheduler = OllamaScheduler(
+    ollama_pool,
+    primary_model=os.getenv("OLLAMA_MODEL", "llama3.1:8b"),
+    fallback_model=OLLAMA_FALLBACK_MODEL,
+    max_concurrent=OLLAMA_MAX_CONCURRENT * len(OLLAMA_URLS),
+    cooldown_seconds=OLLAMA_FALLBACK_COOLDOWN_SECONDS
+)
+
+semantic_cache = SemanticCache(
+    threshold=SEMANTIC_CACHE_THRESHOLD,
+    ttl_seconds=SEMANTIC_CACHE_TTL_SECONDS,
+    max_entries=SEMANTIC_CACHE_MAX_ENTRIES
+) if SEMANTIC_CACHE else None
+
+# Transcripts are accepted into a durable queue; the worker stores and indexes them in batches
+ingest_queue = IngestQueue(
+    batch_size=INGEST_BATCH_SIZE,
+    linger_seconds=INGEST_LINGER_MS / 1000,
+    max_attempts=INGEST_MAX_ATTEMPTS
+)
+
+audio_archive = AudioArchive(f"{DATA_DIR}/audio", AUDIO_ARCHIVE_FORMAT)
+
+# Heavy components load in the background so /health answers immediately
+components = ComponentRegistry()
+components.register("database", init_db)
+components.register("memory", load_memory_system)
+components.register("context", default_assembler)
+
+async def run_session_summarizer():
+    while not components.is_ready("memory"):
+        if components.has_failed():
+            return
+        await asyncio.sleep(5)
+    summarizer = SessionSummarizer(
+        get_memory_system(),
+        scheduler=llm_scheduler,
+        model=os.getenv("OLLAMA_MODEL", "llama3.1:8b"),
+        idle_minutes=SESSION_IDLE_MINUTES
+    )
+    await summarizer.run_forever(SUMMARY_INTERVAL_SECONDS)
+
+async def run_ingest_worker():
+    while not components.is_ready():
+        if components.has_failed():
+            return
+        await asyncio.sleep(1)
+    ingest_queue.memory = get_memory_system()
+    await ingest_queue.run_forever()
+
+async def run_partition_compactor(interval_seconds: float = 24 * 3600):
+    while True:
+        await asyncio.sleep(interval_seconds)
+        if not components.is_ready("memory"):
+            continue
+        try:
+            compacted = await run_in_threadpool(
+                get_memory_system().memory_system.compact_older_than, COLD_AFTER_MONTHS
+            )
+            if compacted:
+                print(f"Moved memory partitions to cold tier: {compacted}")
+        except Exception as e:
+            print(f"Partition compaction failed: {e}")
+
+async def run_audio_archiver(interval_seconds: float = 24 * 3600):
+    while True:
+        await asyncio.sleep(interval_seconds)
+        if not components.is_ready("database"):
+            continue
+        try:
+            with metrics.timer("audio.archive.run"):
+                archived = await run_in_threadpool(audio_archive.archive_older_than, AUDIO_ARCHIVE_AFTER_DAYS)
+            for totals in archived.values():
+                metrics.incr("audio.archive.files", totals["files"])
+                metrics.incr("audio.archive.saved_bytes", totals["saved_bytes"])
+        except Exception as e:
+            print(f"Audio archiving failed: {e}")
 
-# Initialize Memory System
-memory_system = MemorySystem(persist_path=f"{DATA_DIR}/chroma")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    http_clients.start()
+    ollama_pool.start()
+    components.start()
+    tasks = [
+        asyncio.create_task(run_session_summarizer()),
+        asyncio.create_task(run_ingest_worker()),
+        asyncio.create_task(ollama_pool.run_health_checks())
+    ]
+    if COLD_AFTER_MONTHS > 0:
+        tasks.append(asyncio.create_task(run_partition_compactor()))
+    if AUDIO_ARCHIVE_AFTER_DAYS > 0:
+        tasks.append(asyncio.create_task(run_audio_archiver()))
+    yield
+    for task in tasks:
+        task.cancel()
+    if components.is_ready("memory"):
+        get_memory_system().shutdown()
+    await http_clients.close()
+    await ollama_pool.close()
+    await async_engine.dispose()
 
-# Ensure DB is initialized
-init_db()
+app = FastAPI(title="Ollie Core", lifespan=lifespan)
+
+@app.exception_handler(ComponentNotReady)
+async def component_not_ready_handler(request: Request, exc: ComponentNotReady):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": "5"}
+    )
+
+def get_memory_system() -> AsyncMemorySystem:
+    """Return the memory system, or raise ComponentNotReady while it is still loading."""
+    return components.get("memory")
 
 class ChatRequest(BaseModel):
     message: str
@@ -37,110 +223,229 @@ class SaveTranscriptionRequest(BaseModel):
     transcript: str
     session_id: Optional[int] = None
 
-async def process_audio_background(file_path: str, session_id: int):
-    """Background task to transcribe and index audio."""
-    async with httpx.AsyncClient() as client:
-        try:
-            # Call Whisper Service
-            resp = await client.post(
-                f"{WHISPER_URL}/transcribe_path", 
-                json={"path": file_path}
-            )
-            resp.raise_for_status()
-            data = resp.json()
-            
-            full_text = " ".join([seg["text"] for seg in data["segments"]])
-            
-            # Save to DB
-            with get_db() as db:
-                conv = Conversation(
-                    session_id=session_id,
-                    speaker="User",
-                    transcript=full_text,
-                    audio_path=file_path,
-                    timestamp=datetime.utcnow()
-                )
-                db.add(conv)
-                db.commit()
-                db.refresh(conv)
-                conv_id = conv.id
-                
-            # Index in Memory
-            memory_system.add_memory(
-                text=full_text,
-                metadata={
-                    "speaker": "User",
-                    "session_id": session_id,
-                    "timestamp": datetime.utcnow().isoformat(),
-                    "type": "conversation"
-                },
-                memory_id=f"conv_{conv_id}"
-            )
-            
-            print(f"Successfully processed audio: {file_path}")
-            
-        except Exception as e:
-            print(f"Error processing audio {file_path}: {e}")
+class ReindexRequest(BaseModel):
+    batch_size: int = 256
+    embedding_model: Optional[str] = None
+    restart: bool = False
 
-@app.post("/chat", response_model=ChatResponse)
-async def chat(req: ChatRequest):
-    # 1. Retrieve memory
-    context_docs = memory_system.search_memory(req.message, n_results=3)
-    context_str = "\n".join([d["content"] for d in context_docs])
-    
-    system_prompt = f"""You are Ollie, a helpful AI assistant. 
-    Use the following context from past conversations to answer the user's question if relevant.
-    
-    Context:
-    {context_str}
+class SessionItem(BaseModel):
+    id: int
+    start_time: datetime
+    end_time: Optional[datetime] = None
+    summary: Optional[str] = None
+    conversation_count: int
+
+class SessionPage(BaseModel):
+    items: List[SessionItem]
+    next_cursor: Optional[str] = None
+
+class ConversationItem(BaseModel):
+    id: int
+    session_id: int
+    timestamp: datetime
+    speaker: str
+    transcript: str
+    audio_path: Optional[str] = None
+
+class ConversationPage(BaseModel):
+    items: List[ConversationItem]
+    next_cursor: Optional[str] = None
+
+def etag_response(request: Request, page: BaseModel) -> Response:
     """
-    
-    # 2. Call LLM (Ollama)
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        # Use tinyllama for local testing if memory is constrained
-        # In production, this should be llama3.1:8b
-        model_name = os.getenv("OLLAMA_MODEL", "llama3.1:8b")
+    JSON response with a content-hash ETag; 304 without a body if the client already has it.
+
+    Clients revalidate with If-None-Match, so an unchanged page costs a query
+    but no serialization on their side and no payload on the wire.
+    """
+    body = page.model_dump_json().encode()
+    etag = f'W/"{hashlib.sha1(body).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if_none_match = [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]
+    if etag in if_none_match or "*" in if_none_match:
+        metrics.incr("api.not_modified")
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def parse_byte_range(header: str, size: int) -> Tuple[int, int]:
+    """First and last byte of a single `bytes=` Range header; ValueError if it cannot be served."""
+    unit, _, spec = header.partition("=")
+    first, _, last = spec.strip().partition("-")
+    if unit.strip() != "bytes" or "," in spec:
+        raise ValueError(f"Unsupported range: {header}")
+    if not first:
+        # Suffix range: the last N bytes
+        first, last = max(0, size - int(last)), size - 1
+    else:
+        first, last = int(first), min(int(last), size - 1) if last else size - 1
+    if first > last:
+        raise ValueError(f"Unsatisfiable range: {header}")
+    return first, last
+
+def iter_file_range(path: str, offset: int, length: int, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        f.seek(offset)
+        while length > 0:
+            chunk = f.read(min(chunk_size, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+async def record_deduplicated_ids(conv_ids: List[int], memory_ids: List[str]):
+    """
+    Point conversations at the memory they were merged into by ingest dedup.
+
+    This is only known after indexing, so it is a separate (rare) write rather
+    than part of the turn's transaction: holding SQLite's write lock across the
+    embedding call would stall every other writer.
+    """
+    changed = [
+        {"id": conv_id, "embedding_id": memory_id}
+        for conv_id, memory_id in zip(conv_ids, memory_ids)
+        if memory_id != f"conv_{conv_id}"
+    ]
+    if changed:
+        async with get_async_db() as db:
+            await db.execute(update(Conversation), changed)
+            await db.commit()
+
+async def create_session() -> int:
+    async with get_async_db() as db:
+        new_session = Session()
+        db.add(new_session)
+        await db.commit()
+        return new_session.id
+
+async def process_audio_background(file_path: str, session_id: int):
+    """Background task to transcribe audio and queue the transcript for ingestion."""
+    try:
+        # Stream the recording to the whisper service (no shared volume needed)
+        resp = await http_clients.whisper.post(
+            "/transcribe_stream",
+            content=file_chunks(file_path),
+            headers={"Content-Type": "application/octet-stream"}
+        )
+        resp.raise_for_status()
+        data = resp.json()
         
-        payload = {
-            "model": model_name,
-            "messages": [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": req.message}
-            ],
-            "stream": False
-        }
-        try:
-            resp = await client.post(f"{OLLAMA_URL}/api/chat", json=payload)
-            resp.raise_for_status()
-            llm_response = resp.json()["message"]["content"]
-        except httpx.HTTPStatusError as e:
-            if e.response.status_code == 500:
-                 # Fallback to tinyllama if OOM
-                 print("Main model failed (likely OOM), retrying with tinyllama...")
-                 payload["model"] = "tinyllama"
-                 resp = await client.post(f"{OLLAMA_URL}/api/chat", json=payload)
-                 resp.raise_for_status()
-                 llm_response = resp.json()["message"]["content"]
-            else:
-                raise HTTPException(status_code=e.response.status_code, detail=f"LLM Error: {str(e)}")
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"LLM Error: {str(e)}")
+        full_text = " ".join([seg["text"] for seg in data["segments"]])
+        
+        # Stored and indexed by the ingest worker
+        await ingest_queue.enqueue(full_text, session_id, audio_path=file_path)
 
-    # 3. Save interaction to DB (User message and AI response)
-    # Note: Ideally we pass session_id. If None, create new session.
-    session_id = req.session_id
-    with get_db() as db:
+        print(f"Successfully transcribed audio: {file_path}")
+        
+    except Exception as e:
+        print(f"Error processing audio {file_path}: {e}")
+
+async def load_session_history(session_id: Optional[int]) -> List[dict]:
+    """Earlier turns of a session as chat messages, oldest first."""
+    if not session_id:
+        return []
+    async with get_async_db() as db:
+        rows = (await db.execute(
+            select(Conversation.speaker, Conversation.transcript)
+            .where(Conversation.session_id == session_id)
+            .order_by(Conversation.timestamp, Conversation.id)
+        )).all()
+    return [
+        {"role": "assistant" if r.speaker == "Ollie" else "user", "content": r.transcript}
+        for r in rows
+    ]
+
+async def retrieve_chat_context(message: str) -> dict:
+    """Retrieve memories for a message: pick sessions by summary, then search their passages."""
+    return await get_memory_system().search_hierarchical(
+        message,
+        n_sessions=3,
+        n_results=3,
+        extra_session_ids=await unsummarized_session_ids()
+    )
+
+async def build_chat_payload(message: str, memory: dict, history: List[dict], stream: bool = False) -> dict:
+    """Build the Ollama /api/chat payload from a message, its retrieved memories and the session history."""
+    assembler: ContextAssembler = components.get("context")
+    memories = (
+        [f"Session summary: {s['content']}" for s in memory["sessions"]]
+        + [d["content"] for d in memory["passages"]]
+    )
+
+    # Use tinyllama for local testing if memory is constrained
+    # In production, this should be llama3.1:8b
+    model_name = os.getenv("OLLAMA_MODEL", "llama3.1:8b")
+
+    return {
+        "model": model_name,
+        "messages": assembler.assemble(message, history, memories),
+        "stream": stream,
+        "keep_alive": OLLAMA_KEEP_ALIVE,
+        "options": {"num_ctx": OLLAMA_NUM_CTX}
+    }
+
+def lookup_cached_response(memory: dict, model: str, history: List[dict]) -> Optional[CacheEntry]:
+    """Semantic cache lookup for a retrieved context and session history; None when disabled or on a miss."""
+    if semantic_cache is None:
+        return None
+    return semantic_cache.lookup(
+        memory["query_embedding"],
+        model,
+        get_memory_system().memory_system.generation,
+        memory["sessions"] + memory["passages"],
+        history
+    )
+
+def cache_response(memory: dict, model: str, history: List[dict], response: str) -> Optional[CacheEntry]:
+    if semantic_cache is None:
+        return None
+    return semantic_cache.store(
+        memory["query_embedding"],
+        model,
+        get_memory_system().memory_system.generation,
+        memory["sessions"] + memory["passages"],
+        response,
+        history
+    )
+
+def record_prompt_eval(data: dict):
+    """Record Ollama's prompt evaluation stats; low durations mean the KV cache was reused."""
+    if "prompt_eval_duration" in data:
+        metrics.observe("chat.prompt_eval_duration", data["prompt_eval_duration"] / 1e9)
+    if "prompt_eval_count" in data:
+        metrics.observe("chat.prompt_eval_count", data["prompt_eval_count"])
+
+async def save_chat_turn(
+    session_id: Optional[int],
+    message: str,
+    llm_response: str,
+    cache_entry: Optional[CacheEntry] = None
+) -> int:
+    """
+    Persist and index a user message and Ollie's response.
+
+    Args:
+        session_id: Session to append to (None = start a new one)
+        message: The user's message
+        llm_response: Ollie's response
+        cache_entry: Semantic cache entry that produced or stores the response;
+            the turn's memories are attributed to it
+
+    Returns:
+        The session id
+    """
+    # One transaction for the (new) session and both sides of the turn
+    async with get_async_db() as db:
         if not session_id:
             new_session = Session()
             db.add(new_session)
-            db.commit()
+            await db.flush()
             session_id = new_session.id
-            
+
         # Save User Message
         user_conv = Conversation(
             session_id=session_id,
             speaker="User",
-            transcript=req.message,
+            transcript=message,
             timestamp=datetime.utcnow()
         )
         db.add(user_conv)
@@ -153,120 +458,496 @@ async def chat(req: ChatRequest):
             timestamp=datetime.utcnow()
         )
         db.add(ai_conv)
-        db.commit()
-        
-        # Index AI response too? Maybe. Let's skip for now to avoid loop, or index it.
-        # memory_system.add_memory(...)
+        await db.flush()
+
+        user_conv.embedding_id = f"conv_{user_conv.id}"
+        ai_conv.embedding_id = f"conv_{ai_conv.id}"
+        turn = [
+            (user_conv.id, user_conv.speaker, user_conv.transcript, user_conv.timestamp),
+            (ai_conv.id, ai_conv.speaker, ai_conv.transcript, ai_conv.timestamp),
+        ]
+        await db.commit()
+
+    # Index both sides of the turn in one embedding call
+    conv_ids = [conv_id for conv_id, _, _, _ in turn]
+    memory_ids = await get_memory_system().add_memories(
+        texts=[text for _, _, text, _ in turn],
+        metadatas=[
+            {
+                "speaker": speaker,
+                "session_id": session_id,
+                "timestamp": timestamp.isoformat(),
+                "type": "conversation",
+                "source": "chat"
+            }
+            for _, speaker, _, timestamp in turn
+        ],
+        memory_ids=[f"conv_{conv_id}" for conv_id in conv_ids]
+    )
+    await record_deduplicated_ids(conv_ids, memory_ids)
+    if cache_entry is not None:
+        semantic_cache.claim(cache_entry, memory_ids)
+    return session_id
 
+@app.post("/chat", response_model=ChatResponse)
+async def chat(req: ChatRequest):
+    # 1. Retrieve memory and build the prompt
+    memory = await retrieve_chat_context(req.message)
+    history = await load_session_history(req.session_id)
+    payload = await build_chat_payload(req.message, memory, history)
+
+    cache_entry = lookup_cached_response(memory, payload["model"], history)
+    if cache_entry is not None:
+        await save_chat_turn(req.session_id, req.message, cache_entry.response, cache_entry)
+        record_first("chat")
+        return {"response": cache_entry.response}
+    
+    # 2. Call LLM (Ollama)
+    try:
+        data = await llm_scheduler.chat(payload)
+        llm_response = data["message"]["content"]
+    except httpx.HTTPStatusError as e:
+        raise HTTPException(status_code=e.response.status_code, detail=f"LLM Error: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"LLM Error: {str(e)}")
+    record_prompt_eval(data)
+    cache_entry = cache_response(memory, data.get("model", payload["model"]), history, llm_response)
+
+    # 3. Save interaction to DB (User message and AI response)
+    await save_chat_turn(req.session_id, req.message, llm_response, cache_entry)
+
+    record_first("chat")
     return {"response": llm_response}
 
+async def iter_once(text: str):
+    """Async iterator over a single, already complete response."""
+    yield text
+
+def sse_event(event: str, data: dict) -> str:
+    """Format one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+async def stream_ollama_tokens(payload: dict):
+    """Yield content tokens from a streaming Ollama /api/chat call made through the scheduler."""
+    async for chunk in llm_scheduler.stream_chat(payload):
+        token = chunk.get("message", {}).get("content", "")
+        if token:
+            yield token
+        if chunk.get("done"):
+            # The scheduler may have answered with the fallback model
+            payload["model"] = chunk.get("model", payload["model"])
+            record_prompt_eval(chunk)
+
+@app.post("/chat/stream")
+async def chat_stream(req: ChatRequest):
+    """
+    Streaming variant of /chat as server-sent events.
+
+    Emits a "token" event per generated chunk, then a single "done" event with the
+    full response and session id once the turn has been saved, or an "error" event.
+    """
+    memory = await retrieve_chat_context(req.message)
+    history = await load_session_history(req.session_id)
+    payload = await build_chat_payload(req.message, memory, history, stream=True)
+
+    async def events():
+        start = time.perf_counter()
+        parts = []
+        try:
+            cache_entry = lookup_cached_response(memory, payload["model"], history)
+            if cache_entry is not None:
+                parts.append(cache_entry.response)
+                yield sse_event("token", {"content": cache_entry.response})
+            else:
+                async for token in stream_ollama_tokens(payload):
+                    if not parts:
+                        metrics.observe("chat.time_to_first_token", time.perf_counter() - start)
+                    parts.append(token)
+                    yield sse_event("token", {"content": token})
+
+            llm_response = "".join(parts)
+            if cache_entry is None:
+                metrics.observe("chat.stream_duration", time.perf_counter() - start)
+                cache_entry = cache_response(memory, payload["model"], history, llm_response)
+            session_id = await save_chat_turn(req.session_id, req.message, llm_response, cache_entry)
+            record_first("chat")
+            yield sse_event("done", {"response": llm_response, "session_id": session_id})
+        except Exception as e:
+            yield sse_event("error", {"detail": f"LLM Error: {str(e)}"})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def speculative_match(partial: str, final: str) -> bool:
+    """Whether retrieval done for a partial transcript can stand in for the final one."""
+    partial_words, final_words = normalize_words(partial), normalize_words(final)
+    if not final_words:
+        return False
+    if partial_words == final_words:
+        return True
+    # A partial that already holds most of the final utterance retrieves the same memories
+    return (
+        final_words[:len(partial_words)] == partial_words
+        and len(partial_words) >= VOICE_SPECULATIVE_MIN_OVERLAP * len(final_words)
+    )
+
+@app.websocket("/ws/voice")
+async def voice_turn(websocket: WebSocket):
+    """
+    One pipelined voice turn: speech in, spoken answer out.
+
+    The client sends {"type": "start", "session_id": optional}, then 16 kHz mono
+    PCM16 audio as binary frames, then {"type": "end"} once the user stops
+    speaking. Audio is relayed to whisper as an utterance session, so partial
+    transcripts and the final one all cover the utterance from its start;
+    retrieval starts from the partials; the LLM answer streams, and every completed sentence
+    goes to TTS while generation continues. The client receives JSON events:
+    "transcript", "token", "audio" (followed by one binary WAV frame), "done"
+    with per-stage timings, or "error".
+    """
+    await websocket.accept()
+    send_lock = asyncio.Lock()
+    timings = {}
+    speech_end = None
+
+    async def send_json(data: dict):
+        async with send_lock:
+            await websocket.send_json(data)
+
+    def mark(stage: str):
+        # Stage latencies are measured from the end of speech
+        if stage not in timings and speech_end is not None:
+            timings[stage] = time.perf_counter() - speech_end
+            metrics.observe(f"voice.{stage}", timings[stage])
+
+    try:
+        start = await websocket.receive_json()
+        session_id = start.get("session_id")
+
+        # 1. Speech to text, with retrieval started on partial transcripts
+        speculative = {"text": "", "task": None}
+        final_text = ""
+        async with websockets.connect(f"{WHISPER_WS_URL}?utterance=1", max_size=None) as stt:
+            await stt.send(uuid.uuid4().hex)
+
+            async def relay_audio():
+                nonlocal speech_end
+                while True:
+                    message = await websocket.receive()
+                    if message["type"] == "websocket.disconnect":
+                        # Ends the transcript loop below
+                        await stt.close()
+                        raise WebSocketDisconnect()
+                    if message.get("bytes") is not None:
+                        await stt.send(message["bytes"])
+                    elif json.loads(message.get("text") or "{}").get("type") == "end":
+                        speech_end = time.perf_counter()
+                        await stt.send("end")
+                        return
+
+            relay = asyncio.create_task(relay_audio())
+            try:
+                async for raw in stt:
+                    event = json.loads(raw)
+                    if event.get("type") == "transcription_update":
+                        partial = event["full_text"]
+                        await send_json({"type": "transcript", "text": partial, "is_final": False})
+                        if speculative["task"] is not None:
+                            speculative["task"].cancel()
+                        speculative = {"text": partial, "task": asyncio.create_task(retrieve_chat_context(partial))}
+                    elif event.get("type") == "transcription_final":
+                        final_text = event["text"]
+                        break
+                await relay
+            finally:
+                relay.cancel()
+
+        mark("stt_final")
+        if not final_text.strip():
+            final_text = speculative["text"]
+        if not final_text.strip():
+            await send_json({"type": "error", "detail": "No speech detected"})
+            return
+        await send_json({"type": "transcript", "text": final_text, "is_final": True})
+
+        # 2. Retrieval: reuse the speculative result if the partial transcript was close enough
+        task = speculative["task"]
+        if task is not None and speculative_match(speculative["text"], final_text):
+            metrics.incr("voice.speculative_retrieval.hit")
+            memory = await task
+        else:
+            if task is not None:
+                task.cancel()
+                metrics.incr("voice.speculative_retrieval.miss")
+            memory = await retrieve_chat_context(final_text)
+        mark("retrieval")
+
+        # 3. LLM tokens -> sentences -> TTS, each stage running as soon as it has input
+        history = await load_session_history(session_id)
+        payload = await build_chat_payload(final_text, memory, history, stream=True)
+        sentences: asyncio.Queue = asyncio.Queue()
+
+        async def synthesize_sentences():
+            index = 0
+            while True:
+                sentence = await sentences.get()
+                if sentence is None:
+                    return
+                resp = await http_clients.tts.post("/synthesize_wav", json={"text": sentence})
+                resp.raise_for_status()
+                async with send_lock:
+                    await websocket.send_json({"type": "audio", "index": index, "text": sentence})
+                    await websocket.send_bytes(resp.content)
+                mark("first_audio")
+                index += 1
+
+        tts = asyncio.create_task(synthesize_sentences())
+        try:
+            splitter = SentenceSplitter()
+            parts = []
+            cache_entry = lookup_cached_response(memory, payload["model"], history)
+            tokens = (
+                stream_ollama_tokens(payload) if cache_entry is None
+                else iter_once(cache_entry.response)
+            )
+            async for token in tokens:
+                mark("first_token")
+                parts.append(token)
+                await send_json({"type": "token", "content": token})
+                for sentence in splitter.feed(token):
+                    mark("first_sentence")
+                    sentences.put_nowait(sentence)
+            for sentence in splitter.flush():
+                sentences.put_nowait(sentence)
+            sentences.put_nowait(None)
+            await tts
+        finally:
+            tts.cancel()
+
+        llm_response = "".join(parts)
+        if cache_entry is None:
+            cache_entry = cache_response(memory, payload["model"], history, llm_response)
+        session_id = await save_chat_turn(session_id, final_text, llm_response, cache_entry)
+        mark("total")
+        record_first("chat")
+        await send_json({"type": "done", "response": llm_response, "session_id": session_id, "timings": timings})
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        print(f"Voice turn failed: {e}")
+        try:
+            await send_json({"type": "error", "detail": str(e)})
+        except Exception:
+            pass
+    finally:
+        try:
+            await websocket.close()
+        except Exception:
+            pass
+
 @app.post("/upload_audio")
 async def upload_audio(
     background_tasks: BackgroundTasks,
     file: UploadFile = File(...), 
     session_id: int = None
 ):
-    # Create directory
+    # Written chunk by chunk off the event loop, named by content hash
     save_dir = f"{DATA_DIR}/audio/{datetime.now().strftime('%Y-%m-%d')}"
-    os.makedirs(save_dir, exist_ok=True)
-    
-    filename = f"{uuid.uuid4()}.wav"
-    file_path = os.path.join(save_dir, filename)
-    
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-        
+    file_path, digest, size = await save_stream(upload_chunks(file), save_dir, suffix=".wav")
+    metrics.observe("upload.bytes", size)
+
     # Create session if needed
     if not session_id:
-        with get_db() as db:
-            new_session = Session()
-            db.add(new_session)
-            db.commit()
-            session_id = new_session.id
+        session_id = await create_session()
 
     # Trigger background processing
     background_tasks.add_task(process_audio_background, file_path, session_id)
     
-    return {"status": "processing", "file_path": file_path, "session_id": session_id}
+    return {"status": "processing", "file_path": file_path, "session_id": session_id, "sha256": digest}
+
+@app.get("/sessions", response_model=SessionPage)
+async def get_sessions(request: Request, limit: int = Query(10, ge=1, le=200), cursor: Optional[str] = None):
+    """Sessions, newest first, with conversation counts; pass next_cursor back as cursor for the next page."""
+    try:
+        async with get_async_db() as db:
+            rows, next_cursor = await session_page(db, limit, cursor)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return etag_response(request, SessionPage(items=rows, next_cursor=next_cursor))
 
-@app.get("/sessions")
-def get_sessions(limit: int = 10):
-    with get_db() as db:
-        sessions = db.query(Session).order_by(Session.start_time.desc()).limit(limit).all()
-        return sessions
+@app.get("/sessions/{session_id}/conversations", response_model=ConversationPage)
+async def get_session_conversations(
+    request: Request,
+    session_id: int,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None
+):
+    """A session's conversations, oldest first; pass next_cursor back as cursor for the next page."""
+    try:
+        async with get_async_db() as db:
+            if await db.get(Session, session_id) is None:
+                raise HTTPException(status_code=404, detail="Session not found")
+            rows, next_cursor = await conversation_page(db, session_id, limit, cursor)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return etag_response(request, ConversationPage(items=rows, next_cursor=next_cursor))
+
+@app.get("/conversations/{conversation_id}/audio")
+async def conversation_audio(
+    request: Request,
+    conversation_id: int,
+    start: Optional[float] = Query(None, ge=0),
+    end: Optional[float] = Query(None, gt=0)
+):
+    """
+    A conversation's recording, as stored (WAV, or FLAC/Opus once archived).
+
+    Honours a byte Range header, so players can seek without downloading the
+    whole file. With start/end (seconds) only that span is returned, as WAV,
+    read by seeking in the file rather than decoding it from the beginning.
+    """
+    async with get_async_db() as db:
+        audio_path = await db.scalar(select(Conversation.audio_path).where(Conversation.id == conversation_id))
+    if not audio_path or not os.path.exists(audio_path):
+        raise HTTPException(status_code=404, detail="No audio for this conversation")
+
+    if start is not None or end is not None:
+        if start is not None and end is not None and end <= start:
+            raise HTTPException(status_code=400, detail="end must be after start")
+        try:
+            wav = await run_in_threadpool(read_segment, audio_path, start or 0.0, end)
+        except RuntimeError as e:
+            raise HTTPException(status_code=422, detail=f"Cannot decode audio: {e}")
+        return Response(content=wav, media_type="audio/wav")
+
+    media_type = MEDIA_TYPES.get(Path(audio_path).suffix, "application/octet-stream")
+    range_header = request.headers.get("range")
+    if not range_header:
+        return FileResponse(audio_path, media_type=media_type, headers={"Accept-Ranges": "bytes"})
+    size = os.path.getsize(audio_path)
+    try:
+        first, last = parse_byte_range(range_header, size)
+    except ValueError:
+        return Response(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+    return StreamingResponse(
+        iter_file_range(audio_path, first, last - first + 1),
+        status_code=206,
+        media_type=media_type,
+        headers={
+            "Accept-Ranges": "bytes",
+            "Content-Range": f"bytes {first}-{last}/{size}",
+            "Content-Length": str(last - first + 1)
+        }
+    )
+
+@app.get("/audio/archive")
+def audio_archive_stats():
+    """Storage saved by the audio archive, per day of recordings and in total."""
+    return audio_archive.stats()
 
 @app.get("/history")
-def search_history(query: str):
-    # Use memory system for semantic search
-    results = memory_system.search_memory(query)
+async def search_history(query: str, since: Optional[datetime] = None, until: Optional[datetime] = None):
+    # Use memory system for semantic search; the time range selects the partitions searched
+    results = await get_memory_system().search_memory(query, since=since, until=until)
     return results
 
+@app.get("/memory/partitions")
+async def memory_partitions():
+    return await run_in_threadpool(get_memory_system().memory_system.partition_stats)
+
+@app.post("/memory/reindex", status_code=202)
+def start_reindex(req: ReindexRequest, background_tasks: BackgroundTasks):
+    """
+    Rebuild the memory store from SQLite into a fresh generation of partitions.
+    Runs in the background threadpool; resumes an unfinished run unless restart is set.
+    """
+    memory = get_memory_system().memory_system
+    if is_reindex_running():
+        raise HTTPException(status_code=409, detail="A re-index is already running")
+
+    def run():
+        try:
+            reindex_conversations(
+                memory,
+                batch_size=req.batch_size,
+                embedding_model=req.embedding_model,
+                restart=req.restart
+            )
+        except ReindexInProgress as e:
+            print(f"Re-index skipped: {e}")
+        except Exception as e:
+            print(f"Re-index failed: {e}")
+
+    background_tasks.add_task(run)
+    return {"status": "started", "resume_from": load_reindex_state()}
+
+@app.get("/memory/reindex")
+def reindex_status():
+    state = load_reindex_state()
+    return {
+        "running": is_reindex_running(),
+        "active_collection": get_memory_system().memory_system.generation,
+        "state": state
+    }
+
 @app.get("/status")
 async def status():
-    # Check Ollama model
+    # Check Ollama model (installed models come from the pool's health checks)
     model_version = "unknown"
-    try:
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(f"{OLLAMA_URL}/api/tags")
-            if resp.status_code == 200:
-                models = resp.json().get("models", [])
-                # Look for ollie-lora
-                for m in models:
-                    if m["name"].startswith("ollie-lora"):
-                        model_version = m["name"]
-                        break
-    except:
-        pass
+    for name in sorted(ollama_pool.installed_models()):
+        # Look for ollie-lora
+        if name.startswith("ollie-lora"):
+            model_version = name
+            break
         
     return {
         "status": "online",
         "model": model_version,
+        "ollama_nodes": ollama_pool.status(),
         "training_job": "Scheduled 2 AM"
     }
 
 @app.post("/save_streaming_transcription")
 async def save_streaming_transcription(req: SaveTranscriptionRequest):
     """
-    Save a transcription from streaming session to the database and memory.
-    This endpoint is called by the frontend after a streaming session ends.
+    Queue a transcription from a streaming session for the database and memory.
+    This endpoint is called by the frontend after a streaming session ends; the
+    ingest worker stores and indexes it shortly after (see /ingest/status).
     """
-    # Create session if needed
-    session_id = req.session_id
-    if not session_id:
-        with get_db() as db:
-            new_session = Session()
-            db.add(new_session)
-            db.commit()
-            session_id = new_session.id
-    
-    # Save to DB
-    with get_db() as db:
-        conv = Conversation(
-            session_id=session_id,
-            speaker="User",
-            transcript=req.transcript,
-            timestamp=datetime.utcnow()
-        )
-        db.add(conv)
-        db.commit()
-        db.refresh(conv)
-        conv_id = conv.id
-        
-    # Index in Memory
-    memory_system.add_memory(
-        text=req.transcript,
-        metadata={
-            "speaker": "User",
-            "session_id": session_id,
-            "timestamp": datetime.utcnow().isoformat(),
-            "type": "conversation",
-            "source": "streaming"
-        },
-        memory_id=f"conv_{conv_id}"
-    )
-    
-    return {"status": "saved", "session_id": session_id, "conversation_id": conv_id}
+    item = await ingest_queue.enqueue(req.transcript, req.session_id, source="streaming")
+    return {"status": "queued", "session_id": item.session_id, "ingest_id": item.id}
+
+@app.get("/ingest/status")
+async def ingest_status():
+    """Queue counts by status, backlog age, the last batch and recent failures."""
+    return await ingest_queue.status()
+
+@app.post("/ingest/retry")
+async def ingest_retry():
+    """Requeue failed ingest items."""
+    return {"requeued": await ingest_queue.retry_failed()}
 
 @app.get("/health")
-def health():
+def health(response: Response):
+    """Liveness probe: fails only if a required component could not be loaded."""
+    if components.has_failed():
+        response.status_code = 503
+        return {"status": "failed", "components": components.status()}
+    record_first("health")
     return {"status": "ok"}
+
+@app.get("/ready")
+def ready(response: Response):
+    """Readiness probe: 200 once every required component is loaded, 503 before."""
+    is_ready = components.is_ready()
+    if not is_ready:
+        response.status_code = 503
+    startup = {k: v for k, v in metrics.snapshot()["gauges"].items() if k.startswith("startup.")}
+    return {"ready": is_ready, "components": components.status(), "startup": startup}
+
+@app.get("/metrics")
+def get_metrics():
+    return metrics.snapshot()
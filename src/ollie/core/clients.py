@@ -0,0 +1,119 @@
+"""
+Pooled HTTP clients for core's downstream services.
+
+One httpx.AsyncClient per service (whisper, TTS, and each Ollama node via
+ollie.llm.pool) is opened for the lifetime of the app, so requests reuse keep-alive connections instead of paying
+for a new TCP connection each time. Connection errors are retried by the
+transport; HTTP error responses are not, so non-idempotent POSTs are never
+replayed after the server has seen them.
+"""
+
+import os
+from typing import Dict, Optional
+
+import httpx
+
+
+class ServiceConfig:
+    def __init__(
+        self,
+        base_url: str,
+        connect_timeout: float = 5.0,
+        read_timeout: Optional[float] = 60.0,
+        max_connections: int = 8,
+        max_keepalive: int = 4,
+        retries: int = 2,
+    ):
+        """
+        Connection settings for one downstream service.
+
+        Args:
+            base_url: Service root URL
+            connect_timeout: Seconds to establish a connection
+            read_timeout: Seconds to wait for response data (None = no limit)
+            max_connections: Concurrent connections to the service
+            max_keepalive: Idle connections kept open for reuse
+            retries: Connection attempts retried on connect errors
+        """
+        self.base_url = base_url
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_connections = max_connections
+        self.max_keepalive = max_keepalive
+        self.retries = retries
+
+    def build_client(self) -> httpx.AsyncClient:
+        limits = httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive,
+            keepalive_expiry=60.0,
+        )
+        return httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=httpx.Timeout(self.read_timeout, connect=self.connect_timeout),
+            transport=httpx.AsyncHTTPTransport(limits=limits, retries=self.retries),
+        )
+
+
+class ServiceClients:
+    def __init__(self, configs: Dict[str, ServiceConfig]):
+        """
+        Registry of pooled clients, opened and closed with the app lifespan.
+
+        Args:
+            configs: Service name -> connection settings
+        """
+        self.configs = configs
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+
+    def start(self):
+        for name, config in self.configs.items():
+            if name not in self._clients:
+                self._clients[name] = config.build_client()
+
+    async def close(self):
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients = {}
+
+    def get(self, name: str) -> httpx.AsyncClient:
+        if name not in self._clients:
+            raise RuntimeError(f"HTTP client for '{name}' is not started")
+        return self._clients[name]
+
+    @property
+    def whisper(self) -> httpx.AsyncClient:
+        return self.get("whisper")
+
+    @property
+    def tts(self) -> httpx.AsyncClient:
+        return self.get("tts")
+
+
+def ollama_service_config(ollama_url: str) -> ServiceConfig:
+    """Settings for one Ollama node; generations are serialized by Ollama anyway, so a few connections suffice."""
+    return ServiceConfig(
+        ollama_url,
+        read_timeout=float(os.getenv("OLLAMA_TIMEOUT", "120")),
+        max_connections=8,
+        max_keepalive=4,
+    )
+
+
+def default_service_configs(whisper_url: str, tts_url: str) -> Dict[str, ServiceConfig]:
+    """Per-service settings; timeouts can be overridden with <SERVICE>_TIMEOUT env vars."""
+    return {
+        # Transcribing a long recording can take minutes on the Pi
+        "whisper": ServiceConfig(
+            whisper_url,
+            read_timeout=float(os.getenv("WHISPER_TIMEOUT", "300")),
+            max_connections=4,
+            max_keepalive=2,
+        ),
+        "tts": ServiceConfig(
+            tts_url,
+            read_timeout=float(os.getenv("TTS_TIMEOUT", "60")),
+            max_connections=4,
+            max_keepalive=2,
+        ),
+    }
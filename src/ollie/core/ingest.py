@@ -0,0 +1,311 @@
+"""
+Durable write-behind ingestion of transcripts.
+
+Transcripts are accepted by inserting one row into the `ingest_queue` table
+and returning; a background worker then drains the queue in batches:
+
+1. pending items get their Conversation rows, all in one transaction that also
+   marks them "stored" (so a retry never inserts a conversation twice)
+2. stored items are embedded and indexed with one bulk add_memories call
+3. done items are deleted, in the transaction that records any dedup remap of
+   embedding ids, so the queue only ever holds outstanding and failed work
+
+A failed batch is retried item by item, so one bad transcript cannot hold back
+the rest; items back off exponentially and end up "failed" after
+max_attempts, where `retry_failed` can requeue them. The queue lives in the
+main database, so it survives restarts and shares its backups.
+"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import case, delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from ollie.storage.database import AsyncSessionLocal
+from ollie.storage.models import Conversation, IngestItem, Session
+from ollie.utils.metrics import metrics
+
+PENDING = "pending"
+STORED = "stored"
+FAILED = "failed"
+
+
+class IngestQueue:
+    def __init__(
+        self,
+        memory=None,
+        sessions: async_sessionmaker = AsyncSessionLocal,
+        batch_size: int = 64,
+        linger_seconds: float = 0.05,
+        max_attempts: int = 5,
+        retry_base_seconds: float = 2.0,
+        retry_max_seconds: float = 300.0,
+    ):
+        """
+        Initialize the queue.
+
+        Args:
+            memory: AsyncMemorySystem items are indexed into (set before running the worker)
+            sessions: Async session factory of the database holding the queue
+            batch_size: Items stored and embedded per batch
+            linger_seconds: Wait after a wake-up so concurrent enqueues share a batch
+            max_attempts: Attempts before an item is marked failed
+            retry_base_seconds: Backoff after the first failure (doubles per attempt)
+            retry_max_seconds: Longest backoff
+        """
+        self.memory = memory
+        self.sessions = sessions
+        self.batch_size = batch_size
+        self.linger_seconds = linger_seconds
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self._wake = asyncio.Event()
+        self.last_batch: Dict[str, Any] = {}
+
+    async def enqueue(
+        self,
+        transcript: str,
+        session_id: Optional[int] = None,
+        speaker: str = "User",
+        audio_path: Optional[str] = None,
+        source: Optional[str] = None,
+    ) -> IngestItem:
+        """
+        Accept a transcript for ingestion, creating its session if needed.
+
+        Returns:
+            The queued item (its id and session_id are set)
+        """
+        async with self.sessions() as db:
+            if not session_id:
+                new_session = Session()
+                db.add(new_session)
+                await db.flush()
+                session_id = new_session.id
+            item = IngestItem(
+                session_id=session_id,
+                speaker=speaker,
+                transcript=transcript,
+                audio_path=audio_path,
+                source=source,
+                timestamp=datetime.utcnow(),
+            )
+            db.add(item)
+            await db.commit()
+        metrics.incr("ingest.enqueued")
+        self._wake.set()
+        return item
+
+    async def _due(self, db: AsyncSession, limit: int) -> List[IngestItem]:
+        return list(
+            await db.scalars(
+                select(IngestItem)
+                .where(
+                    IngestItem.status.in_([PENDING, STORED]),
+                    IngestItem.next_attempt <= datetime.utcnow(),
+                )
+                .order_by(IngestItem.id)
+                .limit(limit)
+            )
+        )
+
+    async def _store(self, items: List[IngestItem]):
+        """Insert conversations for pending items and mark them stored, in one transaction."""
+        pending = [item for item in items if item.status == PENDING]
+        if not pending:
+            return
+        async with self.sessions() as db:
+            conversations = [
+                Conversation(
+                    session_id=item.session_id,
+                    speaker=item.speaker,
+                    transcript=item.transcript,
+                    audio_path=item.audio_path,
+                    timestamp=item.timestamp,
+                )
+                for item in pending
+            ]
+            db.add_all(conversations)
+            await db.flush()
+            for conv in conversations:
+                conv.embedding_id = f"conv_{conv.id}"
+            await db.execute(
+                update(IngestItem),
+                [
+                    {"id": item.id, "conversation_id": conv.id, "status": STORED}
+                    for item, conv in zip(pending, conversations)
+                ],
+            )
+            await db.commit()
+        # Only once committed, so a failed batch is retried from the state actually stored
+        for item, conv in zip(pending, conversations):
+            item.conversation_id = conv.id
+            item.status = STORED
+
+    async def _index(self, items: List[IngestItem]):
+        """Embed stored items in one call, then delete them (and record any dedup remap) in one transaction."""
+        memory_ids = await self.memory.add_memories(
+            texts=[item.transcript for item in items],
+            metadatas=[
+                {
+                    "speaker": item.speaker,
+                    "session_id": item.session_id,
+                    "timestamp": item.timestamp.isoformat(),
+                    "type": "conversation",
+                    **({"source": item.source} if item.source else {}),
+                }
+                for item in items
+            ],
+            memory_ids=[f"conv_{item.conversation_id}" for item in items],
+        )
+        remapped = [
+            {"id": item.conversation_id, "embedding_id": memory_id}
+            for item, memory_id in zip(items, memory_ids)
+            if memory_id != f"conv_{item.conversation_id}"
+        ]
+        async with self.sessions() as db:
+            if remapped:
+                await db.execute(update(Conversation), remapped)
+            # The conversation row now holds the transcript; keeping the item would duplicate it
+            await db.execute(
+                delete(IngestItem).where(IngestItem.id.in_([item.id for item in items]))
+            )
+            await db.commit()
+
+    async def _process(self, items: List[IngestItem]):
+        await self._store(items)
+        await self._index(items)
+
+    async def _record_failure(self, item: IngestItem, error: Exception):
+        attempts = item.attempts + 1
+        failed = attempts >= self.max_attempts
+        delay = min(
+            self.retry_max_seconds, self.retry_base_seconds * 2 ** (attempts - 1)
+        )
+        async with self.sessions() as db:
+            await db.execute(
+                update(IngestItem)
+                .where(IngestItem.id == item.id)
+                .values(
+                    attempts=attempts,
+                    status=FAILED if failed else item.status,
+                    next_attempt=datetime.utcnow() + timedelta(seconds=delay),
+                    last_error=str(error),
+                )
+            )
+            await db.commit()
+        metrics.incr("ingest.failed" if failed else "ingest.retry")
+        print(
+            f"Ingest item {item.id} {'failed' if failed else 'will be retried'}: {error}"
+        )
+
+    async def run_once(self) -> int:
+        """Process one batch of due items. Returns how many were completed."""
+        async with self.sessions() as db:
+            items = await self._due(db, self.batch_size)
+        if not items:
+            return 0
+
+        start = time.perf_counter()
+        try:
+            await self._process(items)
+            done = len(items)
+        except Exception as e:
+            print(
+                f"Ingest batch of {len(items)} failed ({e}), retrying items one by one..."
+            )
+            done = 0
+            for item in items:
+                try:
+                    await self._process([item])
+                    done += 1
+                except Exception as item_error:
+                    await self._record_failure(item, item_error)
+
+        duration = time.perf_counter() - start
+        metrics.incr("ingest.done", done)
+        metrics.observe("ingest.batch_size", len(items))
+        metrics.observe("ingest.batch_duration", duration)
+        self.last_batch = {
+            "items": len(items),
+            "done": done,
+            "seconds": round(duration, 3),
+            "at": datetime.utcnow().isoformat(),
+        }
+        return done
+
+    async def run_forever(self, poll_seconds: float = 5.0):
+        """Drain the queue as items arrive; also polls for items whose retry is due."""
+        while True:
+            try:
+                if await self.run_once():
+                    continue
+            except Exception as e:
+                print(f"Ingest worker error: {e}")
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=poll_seconds)
+                await asyncio.sleep(self.linger_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    async def status(self) -> Dict[str, Any]:
+        async with self.sessions() as db:
+            counts = dict(
+                (
+                    await db.execute(
+                        select(IngestItem.status, func.count()).group_by(
+                            IngestItem.status
+                        )
+                    )
+                ).all()
+            )
+            oldest = await db.scalar(
+                select(func.min(IngestItem.created)).where(
+                    IngestItem.status.in_([PENDING, STORED])
+                )
+            )
+            failures = (
+                await db.execute(
+                    select(IngestItem.id, IngestItem.attempts, IngestItem.last_error)
+                    .where(IngestItem.status == FAILED)
+                    .order_by(IngestItem.id.desc())
+                    .limit(10)
+                )
+            ).all()
+        backlog = counts.get(PENDING, 0) + counts.get(STORED, 0)
+        metrics.set("ingest.backlog", backlog)
+        return {
+            "counts": {
+                status: counts.get(status, 0) for status in (PENDING, STORED, FAILED)
+            },
+            "backlog": backlog,
+            "oldest_pending_seconds": (
+                (datetime.utcnow() - oldest).total_seconds() if oldest else 0
+            ),
+            "last_batch": self.last_batch,
+            "recent_failures": [dict(row._mapping) for row in failures],
+        }
+
+    async def retry_failed(self) -> int:
+        """Requeue failed items with a fresh attempt budget. Returns how many were requeued."""
+        async with self.sessions() as db:
+            result = await db.execute(
+                update(IngestItem)
+                .where(IngestItem.status == FAILED)
+                .values(
+                    # Items that already have their conversation only need indexing
+                    status=case(
+                        (IngestItem.conversation_id.is_(None), PENDING), else_=STORED
+                    ),
+                    attempts=0,
+                    next_attempt=datetime.utcnow(),
+                )
+            )
+            await db.commit()
+        self._wake.set()
+        return result.rowcount
@@ -0,0 +1,137 @@
+"""
+Deferred initialization of heavy core components.
+
+Components (database, memory system, ...) are registered with a factory and
+loaded in a background thread after the server starts, so /health answers
+immediately and /ready reports which subsystems are warm.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from ollie.utils.metrics import metrics
+
+# Approximate process start: the moment the core modules are imported
+PROCESS_START = time.time()
+
+
+class ComponentNotReady(RuntimeError):
+    """Raised when a component is requested before it has finished loading."""
+
+    def __init__(self, name: str, state: str):
+        super().__init__(f"Component '{name}' is {state}")
+        self.name = name
+        self.state = state
+
+
+class Component:
+    PENDING = "pending"
+    LOADING = "loading"
+    READY = "ready"
+    FAILED = "failed"
+
+    def __init__(self, name: str, factory: Callable[[], Any], required: bool = True):
+        """
+        A lazily constructed component.
+
+        Args:
+            name: Subsystem name reported by /ready
+            factory: Callable that builds the component (may be slow)
+            required: Whether /ready should wait for this component
+        """
+        self.name = name
+        self.factory = factory
+        self.required = required
+        self.state = self.PENDING
+        self.instance: Any = None
+        self.error: Optional[str] = None
+        self.load_seconds: Optional[float] = None
+
+    def load(self):
+        self.state = self.LOADING
+        start = time.perf_counter()
+        try:
+            self.instance = self.factory()
+            self.state = self.READY
+        except Exception as e:
+            self.error = str(e)
+            self.state = self.FAILED
+            print(f"Failed to initialize {self.name}: {e}")
+        finally:
+            self.load_seconds = time.perf_counter() - start
+            metrics.set(
+                f"startup.{self.name}_load_seconds", round(self.load_seconds, 3)
+            )
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "required": self.required,
+            "load_seconds": self.load_seconds,
+            "error": self.error,
+        }
+
+
+class ComponentRegistry:
+    def __init__(self):
+        self._components: Dict[str, Component] = {}
+        self._thread: Optional[threading.Thread] = None
+
+    def register(self, name: str, factory: Callable[[], Any], required: bool = True):
+        """Register a component to be built by start()."""
+        self._components[name] = Component(name, factory, required)
+
+    def start(self):
+        """Load all registered components, in registration order, on a background thread."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._load_all, name="component-loader", daemon=True
+        )
+        self._thread.start()
+
+    def _load_all(self):
+        for component in self._components.values():
+            component.load()
+        elapsed = time.time() - PROCESS_START
+        metrics.set("startup.components_ready_seconds", round(elapsed, 3))
+        print(f"Core components initialized {elapsed:.1f}s after process start")
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until loading finishes. Returns False on timeout."""
+        if self._thread is None:
+            return False
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    def get(self, name: str) -> Any:
+        """Return a loaded component or raise ComponentNotReady."""
+        component = self._components[name]
+        if component.state != Component.READY:
+            raise ComponentNotReady(name, component.state)
+        return component.instance
+
+    def is_ready(self, name: Optional[str] = None) -> bool:
+        """Whether one component, or every required component, is ready."""
+        if name is not None:
+            return self._components[name].state == Component.READY
+        return all(
+            c.state == Component.READY for c in self._components.values() if c.required
+        )
+
+    def has_failed(self) -> bool:
+        """Whether any required component failed to load."""
+        return any(
+            c.state == Component.FAILED for c in self._components.values() if c.required
+        )
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        return {name: c.status() for name, c in self._components.items()}
+
+
+def record_first(event: str):
+    """Record the time from process start to the first occurrence of an event."""
+    elapsed = round(time.time() - PROCESS_START, 3)
+    if metrics.set_once(f"startup.first_{event}_seconds", elapsed):
+        print(f"Cold start: first {event} {elapsed:.1f}s after process start")
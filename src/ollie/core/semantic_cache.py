@@ -0,0 +1,213 @@
+"""
+Semantic response cache for /chat.
+
+A cached response is reused when a new question embeds close to an earlier one
+for the same model *and* retrieval still sees the same memories (same IDs and
+texts, same memory generation). Any new or changed memory in the retrieved
+context is a miss, so answers are never served for a memory set that has moved
+on.
+
+/chat indexes every turn, so the cached question and answer become memories
+themselves and will be retrieved for the repeated question, pushing others out
+of the top results. Each entry therefore remembers the memory IDs its own turns
+produced; those are ignored when comparing contexts, and the rest of the
+context must be exactly the top of the original one.
+
+Follow-ups such as "tell me more" embed alike whatever came before, so each
+entry is also keyed by a fingerprint of the session history in its prompt and
+only matches a query made after the same history.
+
+Entries expire after a TTL and the least recently used are evicted beyond a
+size limit.
+"""
+
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from ollie.utils.metrics import metrics
+
+
+def context_items(results: List[Dict[str, Any]]) -> List[Tuple[str, str]]:
+    """(memory id, content hash) of retrieved memories, in rank order."""
+    return [
+        (str(r.get("id")), hashlib.sha1(r["content"].encode()).hexdigest())
+        for r in results
+    ]
+
+
+def history_fingerprint(history: List[Dict[str, str]]) -> str:
+    """Hash of the earlier turns ({"role", "content"}) a prompt includes; stable for an empty history."""
+    digest = hashlib.sha1()
+    for message in history:
+        digest.update(f"{message['role']}\0{message['content']}\0".encode())
+    return digest.hexdigest()
+
+
+class CacheEntry:
+    def __init__(
+        self,
+        embedding: np.ndarray,
+        model: str,
+        history: str,
+        generation: str,
+        context: List[Tuple[str, str]],
+        response: str,
+    ):
+        self.embedding = embedding
+        self.model = model
+        self.history = history
+        self.generation = generation
+        self.context = context
+        self.response = response
+        self.created = time.time()
+        # Memories written by the turns this entry answered
+        self.own_ids: set = set()
+
+    def matches_context(self, generation: str, context: List[Tuple[str, str]]) -> bool:
+        if generation != self.generation:
+            return False
+        others = [item for item in context if item[0] not in self.own_ids]
+        # Own memories may only displace the lowest-ranked original memories
+        displaced = len(context) - len(others)
+        return (
+            others == self.context[: len(self.context) - displaced]
+            if displaced
+            else others == self.context
+        )
+
+
+class SemanticCache:
+    def __init__(
+        self, threshold: float = 0.95, ttl_seconds: float = 3600, max_entries: int = 256
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            threshold: Minimum cosine similarity between query embeddings for a hit
+            ttl_seconds: Lifetime of an entry
+            max_entries: Entries kept before the least recently used are evicted
+        """
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[int, CacheEntry]" = OrderedDict()
+        self._next_key = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _normalize(embedding) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _record(self, hit: bool):
+        if hit:
+            self.hits += 1
+            metrics.incr("chat.cache.hit")
+        else:
+            self.misses += 1
+            metrics.incr("chat.cache.miss")
+        metrics.set(
+            "chat.cache.hit_rate", round(self.hits / (self.hits + self.misses), 4)
+        )
+
+    def _expire(self, now: float):
+        expired = [
+            key
+            for key, entry in self._entries.items()
+            if now - entry.created >= self.ttl_seconds
+        ]
+        for key in expired:
+            del self._entries[key]
+        if expired:
+            metrics.incr("chat.cache.expired", len(expired))
+            metrics.set("chat.cache.size", len(self._entries))
+
+    def lookup(
+        self,
+        embedding,
+        model: str,
+        generation: str,
+        results: List[Dict[str, Any]],
+        history: Optional[List[Dict[str, str]]] = None,
+    ) -> Optional[CacheEntry]:
+        """
+        Find a cached response for a similar query over the same memories and session history.
+
+        Args:
+            embedding: Query embedding
+            model: Model that would generate the response
+            generation: Active memory generation
+            results: Retrieved memories (session summaries and passages), in rank order
+            history: Earlier turns of the session included in the prompt
+
+        Returns:
+            The matching entry, or None on a miss
+        """
+        self._expire(time.time())
+        query = self._normalize(embedding)
+        context = context_items(results)
+        fingerprint = history_fingerprint(history or [])
+
+        best_key, best_similarity = None, self.threshold
+        for key, entry in self._entries.items():
+            if (
+                entry.model != model
+                or entry.history != fingerprint
+                or entry.embedding.shape != query.shape
+            ):
+                continue
+            similarity = float(entry.embedding @ query)
+            if similarity >= best_similarity and entry.matches_context(
+                generation, context
+            ):
+                best_key, best_similarity = key, similarity
+
+        self._record(best_key is not None)
+        if best_key is None:
+            return None
+        self._entries.move_to_end(best_key)
+        return self._entries[best_key]
+
+    def store(
+        self,
+        embedding,
+        model: str,
+        generation: str,
+        results: List[Dict[str, Any]],
+        response: str,
+        history: Optional[List[Dict[str, str]]] = None,
+    ) -> CacheEntry:
+        """Cache a generated response for the context and session history it was generated from."""
+        entry = CacheEntry(
+            self._normalize(embedding),
+            model,
+            history_fingerprint(history or []),
+            generation,
+            context_items(results),
+            response,
+        )
+        self._entries[self._next_key] = entry
+        self._next_key += 1
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            metrics.incr("chat.cache.evicted")
+        metrics.set("chat.cache.size", len(self._entries))
+        return entry
+
+    def claim(self, entry: CacheEntry, memory_ids: Iterable[str]):
+        """Record the memories written for a turn answered by `entry`."""
+        entry.own_ids.update(memory_ids)
+
+    def clear(self):
+        self._entries.clear()
+        metrics.set("chat.cache.size", 0)
@@ -1,4 +1,6 @@
+from ollie.utils.concurrency import INTERACTIVE, BACKGROUND
 from .ollama_client import OllamaClient
+from .context import ContextAssembler, TokenCounter
+from .scheduler import OllamaScheduler
 
-__all__ = ["OllamaClient"]
-
+__all__ = ["OllamaClient", "ContextAssembler", "TokenCounter", "OllamaScheduler", "INTERACTIVE", "BACKGROUND"]
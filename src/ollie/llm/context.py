@@ -0,0 +1,163 @@
+"""
+Prompt assembly that keeps the prompt prefix stable across turns.
+
+Ollama reuses its KV cache for the longest prefix a new prompt shares with the
+previous one. The assembler therefore orders messages from most to least
+stable: a fixed system prompt, then the session history (append-only), then the
+memories retrieved for this turn, then the user message. Consecutive turns of a
+session share everything up to the end of the previous turn's history.
+"""
+
+import os
+from typing import Dict, List, Optional
+
+SYSTEM_PREFIX = """You are Ollie, a helpful AI assistant with memory of past conversations.
+Before each question you may receive a message starting with "Context from past conversations:".
+Use it to answer the user's question if relevant, and ignore it otherwise."""
+
+CONTEXT_HEADER = "Context from past conversations:"
+
+# Rough characters-per-token ratio used when no tokenizer is available
+CHARS_PER_TOKEN = 4
+# Per-message overhead of the chat template (role markers, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+class TokenCounter:
+    def __init__(self, tokenizer_name: Optional[str] = None):
+        """
+        Count tokens with the model's tokenizer, or estimate them from length.
+
+        Args:
+            tokenizer_name: Hugging Face tokenizer matching the Ollama model
+                (None = character estimate; transformers is only needed if set)
+        """
+        self.tokenizer = None
+        if tokenizer_name:
+            try:
+                from transformers import AutoTokenizer
+
+                self.tokenizer = AutoTokenizer.from_pretrained(tokenizer_name)
+            except Exception as e:
+                print(
+                    f"Tokenizer '{tokenizer_name}' unavailable, estimating token counts: {e}"
+                )
+
+    def count(self, text: str) -> int:
+        if self.tokenizer is not None:
+            return len(self.tokenizer.encode(text, add_special_tokens=False))
+        return -(-len(text) // CHARS_PER_TOKEN)
+
+    def count_message(self, message: Dict[str, str]) -> int:
+        return self.count(message["content"]) + MESSAGE_OVERHEAD_TOKENS
+
+
+class ContextAssembler:
+    def __init__(
+        self,
+        num_ctx: int = 4096,
+        reserve_tokens: int = 512,
+        memory_share: float = 0.3,
+        history_trim_step: int = 8,
+        counter: Optional[TokenCounter] = None,
+        system_prefix: str = SYSTEM_PREFIX,
+    ):
+        """
+        Initialize the assembler.
+
+        Args:
+            num_ctx: Model context window in tokens
+            reserve_tokens: Tokens left free for the response
+            memory_share: Fraction of the remaining budget retrieved memories may use
+            history_trim_step: History is cut in blocks of this many messages, so the
+                cut point (and with it the cached prefix) stays put for several turns
+            counter: Token counter (default: character estimate)
+            system_prefix: Fixed system prompt
+        """
+        self.num_ctx = num_ctx
+        self.reserve_tokens = reserve_tokens
+        self.memory_share = memory_share
+        self.history_trim_step = max(1, history_trim_step)
+        self.counter = counter or TokenCounter()
+        self.system_prefix = system_prefix
+
+    def _fit_memories(
+        self, memories: List[str], budget: int
+    ) -> Optional[Dict[str, str]]:
+        """Keep the best-ranked memories that fit into `budget` tokens."""
+        lines = []
+        used = self.counter.count(CONTEXT_HEADER) + MESSAGE_OVERHEAD_TOKENS
+        for memory in memories:
+            cost = self.counter.count(memory) + 1
+            if used + cost > budget:
+                break
+            lines.append(memory)
+            used += cost
+        if not lines:
+            return None
+        return {"role": "user", "content": "\n".join([CONTEXT_HEADER] + lines)}
+
+    def _fit_history(
+        self, history: List[Dict[str, str]], budget: int
+    ) -> List[Dict[str, str]]:
+        """Drop the oldest history in whole blocks until the rest fits into `budget` tokens."""
+        costs = [self.counter.count_message(m) for m in history]
+        total = sum(costs)
+        start = 0
+        while total > budget and start < len(history):
+            end = min(start + self.history_trim_step, len(history))
+            total -= sum(costs[start:end])
+            start = end
+        # Never open the window on an assistant reply
+        while start < len(history) and history[start]["role"] != "user":
+            start += 1
+        return history[start:]
+
+    def assemble(
+        self,
+        message: str,
+        history: Optional[List[Dict[str, str]]] = None,
+        memories: Optional[List[str]] = None,
+    ) -> List[Dict[str, str]]:
+        """
+        Build the /api/chat message list for one turn.
+
+        Args:
+            message: The user's message
+            history: Earlier turns of the session, oldest first ({"role", "content"})
+            memories: Retrieved memory texts, best first
+
+        Returns:
+            Messages: system prefix, history, retrieved context, user message
+        """
+        system = {"role": "system", "content": self.system_prefix}
+        user = {"role": "user", "content": message}
+        budget = (
+            self.num_ctx
+            - self.reserve_tokens
+            - self.counter.count_message(system)
+            - self.counter.count_message(user)
+        )
+
+        context = None
+        if memories and budget > 0:
+            context = self._fit_memories(memories, int(budget * self.memory_share))
+            if context is not None:
+                budget -= self.counter.count_message(context)
+
+        kept_history = self._fit_history(history or [], max(budget, 0))
+
+        messages = [system] + kept_history
+        if context is not None:
+            messages.append(context)
+        messages.append(user)
+        return messages
+
+
+def default_assembler() -> ContextAssembler:
+    """Assembler configured from OLLAMA_NUM_CTX, OLLIE_RESPONSE_TOKENS and OLLIE_TOKENIZER."""
+    return ContextAssembler(
+        num_ctx=int(os.getenv("OLLAMA_NUM_CTX", "4096")),
+        reserve_tokens=int(os.getenv("OLLIE_RESPONSE_TOKENS", "512")),
+        counter=TokenCounter(os.getenv("OLLIE_TOKENIZER") or None),
+    )
@@ -1,17 +1,62 @@
+import threading
+import time
 import ollama
-from typing import Generator, List, Dict, Any
+from typing import Generator, List, Dict, Optional, Union
+
+from .pool import OllamaNode, choose_node
 
 class OllamaClient:
-    def __init__(self, model: str = "llama3.1:8b", host: str = "http://localhost:11434"):
+    def __init__(
+        self,
+        model: str = "llama3.1:8b",
+        host: Union[str, List[str]] = "http://localhost:11434",
+        check_interval: float = 15.0,
+        max_outstanding: Optional[int] = None
+    ):
         """
         Initialize the Ollama client.
         
         Args:
             model: Name of the model to use
-            host: URL of the Ollama instance
+            host: URL of the Ollama instance, or a list of URLs to route between
+            check_interval: Seconds a node's health and models are cached
+            max_outstanding: Requests a node serves at once before others are used (see OllamaPool)
         """
-        self.client = ollama.Client(host=host)
+        hosts = [host] if isinstance(host, str) else list(host)
+        self.clients = [ollama.Client(host=h) for h in hosts]
+        self.client = self.clients[0]
         self.model = model
+        self.check_interval = check_interval
+        self.max_outstanding = max_outstanding
+        self._lock = threading.Lock()
+        # Same node state and routing as the async OllamaPool
+        self.nodes = [OllamaNode(h, c) for h, c in zip(hosts, self.clients)]
+        self._checked_at = [0.0] * len(self.nodes)
+
+    def _check(self, index: int):
+        """Refresh a node's health, installed and loaded models once they are check_interval old."""
+        if time.monotonic() - self._checked_at[index] < self.check_interval:
+            return
+        node = self.nodes[index]
+        try:
+            node.installed = {m["name"] for m in node.client.list().get("models", [])}
+            node.loaded = {m["name"] for m in node.client.ps().get("models", [])}
+            node.healthy = True
+            node.last_error = None
+        except Exception as e:
+            node.healthy = False
+            node.last_error = str(e)
+        self._checked_at[index] = time.monotonic()
+
+    def _pick(self) -> OllamaNode:
+        """Node for the next request (see ollie.llm.pool.choose_node), counted as outstanding."""
+        if len(self.nodes) > 1:
+            for index in range(len(self.nodes)):
+                self._check(index)
+        with self._lock:
+            node = choose_node(self.nodes, self.model, max_outstanding=self.max_outstanding)
+            node.outstanding += 1
+            return node
 
     def generate_response(
         self, 
@@ -39,20 +84,27 @@ class OllamaClient:
             
         messages.append({"role": "user", "content": prompt})
 
-        stream = self.client.chat(
-            model=self.model,
-            messages=messages,
-            stream=True,
-        )
+        node = self._pick()
+        try:
+            stream = node.client.chat(
+                model=self.model,
+                messages=messages,
+                stream=True,
+            )
 
-        for chunk in stream:
-            yield chunk['message']['content']
+            for chunk in stream:
+                yield chunk['message']['content']
+        finally:
+            with self._lock:
+                node.outstanding -= 1
 
     def check_connection(self) -> bool:
-        """Check if Ollama is reachable."""
-        try:
-            self.client.list()
-            return True
-        except Exception:
-            return False
+        """Check if at least one Ollama node is reachable."""
+        for client in self.clients:
+            try:
+                client.list()
+                return True
+            except Exception:
+                continue
+        return False
 
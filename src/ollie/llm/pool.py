@@ -0,0 +1,195 @@
+"""
+Pool of Ollama backends across the cluster.
+
+Each node is health-checked periodically with /api/tags (reachable, models
+installed) and /api/ps (models resident in memory). Requests go to the healthy
+node with the model already loaded and the least outstanding work, as long as
+it is below its cap of outstanding requests (what one Ollama instance serves
+in parallel). Once every warm node is at its cap, the least-loaded node takes
+the request even if that means loading the model there, so added nodes add
+throughput instead of queueing behind the warm one.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set
+
+import httpx
+
+from ollie.utils.metrics import metrics
+
+
+def normalize_model(name: str) -> str:
+    """Ollama reports "name:tag"; requests may omit the ":latest" tag."""
+    return name if ":" in name else f"{name}:latest"
+
+
+class OllamaNode:
+    def __init__(self, url: str, client: Any):
+        self.url = url
+        # httpx.AsyncClient in the pool; ollama.Client in the synchronous OllamaClient
+        self.client = client
+        # Optimistic until the first health check says otherwise
+        self.healthy = True
+        self.installed: Set[str] = set()
+        self.loaded: Set[str] = set()
+        self.outstanding = 0
+        self.last_error: Optional[str] = None
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "outstanding": self.outstanding,
+            "installed": sorted(self.installed),
+            "loaded": sorted(self.loaded),
+            "last_error": self.last_error,
+        }
+
+
+def choose_node(
+    nodes: List[OllamaNode],
+    model: str,
+    exclude: Optional[Set[str]] = None,
+    max_outstanding: Optional[int] = None,
+) -> OllamaNode:
+    """
+    Choose the node for a request.
+
+    Args:
+        nodes: Nodes with their last known health, models and outstanding work
+        model: Model the request runs
+        exclude: Node URLs to avoid (e.g. ones that just refused a connection)
+        max_outstanding: Requests a warm node takes before cold nodes are used (None = no cap)
+
+    Returns:
+        The least busy warm node below the cap, else the least busy node (warm on ties)
+    """
+    model = normalize_model(model)
+    candidates = [n for n in nodes if n.url not in (exclude or set())] or nodes
+    healthy = [n for n in candidates if n.healthy] or candidates
+    # Only nodes known to have the model installed, unless none reports it
+    installed = [n for n in healthy if model in n.installed] or healthy
+    warm = [
+        n
+        for n in installed
+        if model in n.loaded
+        and (max_outstanding is None or n.outstanding < max_outstanding)
+    ]
+    if warm:
+        return min(warm, key=lambda n: n.outstanding)
+    return min(installed, key=lambda n: (n.outstanding, model not in n.loaded))
+
+
+class OllamaPool:
+    def __init__(
+        self,
+        urls: List[str],
+        client_factory: Callable[[str], httpx.AsyncClient],
+        check_interval: float = 15.0,
+        max_outstanding: Optional[int] = None,
+    ):
+        """
+        Initialize the pool.
+
+        Args:
+            urls: Ollama base URLs
+            client_factory: Builds the pooled HTTP client for one URL
+            check_interval: Seconds between health checks
+            max_outstanding: Requests a node serves at once (OLLAMA_MAX_CONCURRENT);
+                beyond it, requests spill over to other nodes (None = no cap)
+        """
+        if not urls:
+            raise ValueError("OllamaPool needs at least one URL")
+        self.urls = urls
+        self.client_factory = client_factory
+        self.check_interval = check_interval
+        self.max_outstanding = max_outstanding
+        self.nodes: List[OllamaNode] = []
+
+    def start(self):
+        if not self.nodes:
+            self.nodes = [
+                OllamaNode(url, self.client_factory(url)) for url in self.urls
+            ]
+
+    async def close(self):
+        for node in self.nodes:
+            await node.client.aclose()
+        self.nodes = []
+
+    async def check_node(self, node: OllamaNode):
+        """Refresh a node's health, installed and loaded models."""
+        try:
+            tags, ps = await asyncio.gather(
+                node.client.get("/api/tags", timeout=5.0),
+                node.client.get("/api/ps", timeout=5.0),
+            )
+            tags.raise_for_status()
+            ps.raise_for_status()
+            node.installed = {m["name"] for m in tags.json().get("models", [])}
+            node.loaded = {m["name"] for m in ps.json().get("models", [])}
+            if not node.healthy:
+                print(f"Ollama node {node.url} is healthy again")
+            node.healthy = True
+            node.last_error = None
+        except Exception as e:
+            if node.healthy:
+                print(f"Ollama node {node.url} failed its health check: {e}")
+            node.healthy = False
+            node.last_error = str(e)
+
+    async def check_all(self):
+        await asyncio.gather(*(self.check_node(node) for node in self.nodes))
+        metrics.set("llm.pool.healthy_nodes", sum(node.healthy for node in self.nodes))
+
+    async def run_health_checks(self):
+        while True:
+            await self.check_all()
+            await asyncio.sleep(self.check_interval)
+
+    def pick(self, model: str, exclude: Optional[Set[str]] = None) -> OllamaNode:
+        """Choose the node for a request (see choose_node)."""
+        return choose_node(self.nodes, model, exclude, self.max_outstanding)
+
+    @asynccontextmanager
+    async def lease(
+        self, model: str, exclude: Optional[Set[str]] = None
+    ) -> AsyncIterator[OllamaNode]:
+        """
+        Route one request to a node, tracking its outstanding work.
+
+        Args:
+            model: Model the request runs
+            exclude: Node URLs to avoid (e.g. ones that just refused a connection)
+        """
+        node = self.pick(model, exclude)
+        warm = normalize_model(model) in node.loaded
+        metrics.incr("llm.pool.routed.warm" if warm else "llm.pool.routed.cold")
+        node.outstanding += 1
+        try:
+            yield node
+            if node.healthy:
+                # Ollama keeps the model loaded after serving it
+                node.loaded.add(normalize_model(model))
+        except httpx.TransportError as e:
+            self.mark_down(node, e)
+            raise
+        finally:
+            node.outstanding -= 1
+
+    def mark_down(self, node: OllamaNode, error: Exception):
+        """Take a node out of rotation until its next successful health check."""
+        node.healthy = False
+        node.last_error = str(error)
+        metrics.set("llm.pool.healthy_nodes", sum(n.healthy for n in self.nodes))
+
+    def installed_models(self) -> Set[str]:
+        return (
+            set().union(*(node.installed for node in self.nodes))
+            if self.nodes
+            else set()
+        )
+
+    def status(self) -> List[Dict[str, Any]]:
+        return [node.status() for node in self.nodes]
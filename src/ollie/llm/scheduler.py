@@ -0,0 +1,247 @@
+"""
+Request scheduler in front of Ollama.
+
+Ollama on the Pi can run one 8B generation at a time before it runs out of
+memory, so every /api/chat call goes through this scheduler:
+
+- a priority semaphore bounds concurrent generations; queued interactive
+  requests (chat) always go before background ones (session summaries)
+- a circuit breaker switches to the fallback model after the primary model
+  fails with a 500 (usually OOM) and sticks to it for a cooldown, instead of
+  paying for a failed load of the primary model on every request
+- requests are routed across the Ollama nodes of an OllamaPool, and retried
+  on another node if the chosen one refuses the connection
+- queue wait times and breaker transitions are recorded as metrics
+"""
+
+import json
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict
+
+import httpx
+
+from ollie.utils.concurrency import INTERACTIVE, PRIORITY_NAMES, PrioritySemaphore
+from ollie.utils.metrics import metrics
+from .pool import OllamaPool
+
+
+class ModelCircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        primary: str,
+        fallback: str,
+        failure_threshold: int = 1,
+        cooldown_seconds: float = 300,
+    ):
+        """
+        Route requests for the primary model to the fallback while the primary keeps failing.
+
+        Args:
+            primary: Model requests normally use
+            fallback: Smaller model used while the breaker is open
+            failure_threshold: Consecutive primary failures that open the breaker
+            cooldown_seconds: Time on the fallback before the primary is tried again
+        """
+        self.primary = primary
+        self.fallback = fallback
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+
+    def _set_state(self, state: str):
+        if state != self.state:
+            print(f"Model circuit breaker for {self.primary}: {self.state} -> {state}")
+            metrics.incr(f"llm.circuit.{state}")
+        self.state = state
+        metrics.set("llm.circuit.state", state)
+
+    def choose(self, model: str) -> str:
+        """Model to actually use for a request asking for `model`."""
+        if model != self.primary or self.state == self.CLOSED:
+            return model
+        if (
+            self.state == self.OPEN
+            and time.monotonic() - self.opened_at >= self.cooldown_seconds
+        ):
+            # Let the next request probe the primary model
+            self._set_state(self.HALF_OPEN)
+            return model
+        return self.fallback if self.state == self.OPEN else model
+
+    def record_success(self, model: str):
+        if model == self.primary:
+            self.failures = 0
+            self._set_state(self.CLOSED)
+
+    def record_failure(self, model: str):
+        if model != self.primary:
+            return
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+            self._set_state(self.OPEN)
+
+
+class OllamaScheduler:
+    def __init__(
+        self,
+        pool: OllamaPool,
+        primary_model: str,
+        fallback_model: str = "tinyllama",
+        max_concurrent: int = 1,
+        failure_threshold: int = 1,
+        cooldown_seconds: float = 300,
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            pool: Ollama nodes requests are routed to
+            primary_model: Model that falls back when it fails
+            fallback_model: Model used while the primary is failing
+            max_concurrent: Generations allowed to run at once across all nodes
+            failure_threshold: Consecutive primary failures before sticking to the fallback
+            cooldown_seconds: How long to stick to the fallback
+        """
+        self.pool = pool
+        self.slots = PrioritySemaphore(max_concurrent)
+        self.breaker = ModelCircuitBreaker(
+            primary_model, fallback_model, failure_threshold, cooldown_seconds
+        )
+
+    @asynccontextmanager
+    async def slot(self, priority: int = INTERACTIVE):
+        """Hold one generation slot, recording how long the request queued for it."""
+        name = PRIORITY_NAMES.get(priority, str(priority))
+        start = time.perf_counter()
+        await self.slots.acquire(priority)
+        metrics.observe(f"llm.queue_wait.{name}", time.perf_counter() - start)
+        metrics.set("llm.queue_depth", self.slots.waiting())
+        try:
+            yield
+        finally:
+            self.slots.release()
+
+    def _is_model_failure(self, error: Exception) -> bool:
+        return (
+            isinstance(error, httpx.HTTPStatusError)
+            and error.response.status_code == 500
+        )
+
+    async def chat(
+        self, payload: Dict[str, Any], priority: int = INTERACTIVE, **kwargs
+    ) -> Dict[str, Any]:
+        """
+        Non-streaming /api/chat call.
+
+        Args:
+            payload: Ollama /api/chat payload; "model" may be swapped for the fallback
+            priority: INTERACTIVE or BACKGROUND
+            **kwargs: Passed to httpx (e.g. timeout)
+
+        Returns:
+            Ollama's response JSON
+        """
+        async with self.slot(priority):
+            requested = payload["model"]
+            model = self.breaker.choose(requested)
+            try:
+                return await self._post(dict(payload, model=model), **kwargs)
+            except Exception as e:
+                if not self._is_model_failure(e) or model == self.breaker.fallback:
+                    raise
+                self.breaker.record_failure(model)
+                print(
+                    f"{model} failed (likely OOM), retrying with {self.breaker.fallback}..."
+                )
+                metrics.incr("llm.fallback")
+                return await self._post(
+                    dict(payload, model=self.breaker.fallback), **kwargs
+                )
+
+    async def _post(self, payload: Dict[str, Any], **kwargs) -> Dict[str, Any]:
+        tried = set()
+        while True:
+            async with self.pool.lease(payload["model"], exclude=tried) as node:
+                try:
+                    resp = await node.client.post("/api/chat", json=payload, **kwargs)
+                except httpx.ConnectError as e:
+                    self.pool.mark_down(node, e)
+                    tried.add(node.url)
+                    if len(tried) >= len(self.pool.nodes):
+                        raise
+                    print(
+                        f"Ollama node {node.url} refused the connection, trying another node..."
+                    )
+                    continue
+                resp.raise_for_status()
+                self.breaker.record_success(payload["model"])
+                return resp.json()
+
+    async def stream_chat(
+        self, payload: Dict[str, Any], priority: int = INTERACTIVE
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streaming /api/chat call yielding Ollama's JSON chunks.
+
+        Falls back to the fallback model only if the primary fails before the first chunk.
+        """
+        async with self.slot(priority):
+            requested = payload["model"]
+            model = self.breaker.choose(requested)
+            started = False
+            try:
+                async for chunk in self._stream(dict(payload, model=model)):
+                    started = True
+                    yield chunk
+                return
+            except Exception as e:
+                if (
+                    started
+                    or not self._is_model_failure(e)
+                    or model == self.breaker.fallback
+                ):
+                    raise
+                self.breaker.record_failure(model)
+            print(
+                f"{model} failed (likely OOM), retrying with {self.breaker.fallback}..."
+            )
+            metrics.incr("llm.fallback")
+            async for chunk in self._stream(dict(payload, model=self.breaker.fallback)):
+                yield chunk
+
+    async def _stream(self, payload: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        tried = set()
+        while True:
+            async with self.pool.lease(payload["model"], exclude=tried) as node:
+                # No read timeout: the gap between tokens is bounded by the model, not the network
+                timeout = httpx.Timeout(node.client.timeout.connect, read=None)
+                try:
+                    async with node.client.stream(
+                        "POST", "/api/chat", json=payload, timeout=timeout
+                    ) as resp:
+                        resp.raise_for_status()
+                        self.breaker.record_success(payload["model"])
+                        async for line in resp.aiter_lines():
+                            if not line:
+                                continue
+                            chunk = json.loads(line)
+                            yield chunk
+                            if chunk.get("done"):
+                                break
+                    return
+                except httpx.ConnectError as e:
+                    self.pool.mark_down(node, e)
+                    tried.add(node.url)
+                    if len(tried) >= len(self.pool.nodes):
+                        raise
+                    print(
+                        f"Ollama node {node.url} refused the connection, trying another node..."
+                    )
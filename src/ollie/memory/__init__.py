@@ -1,5 +1,5 @@
 from .retrieval import MemorySystem
 from .embeddings import EmbeddingService
+from .async_memory import AsyncMemorySystem
 
-__all__ = ["MemorySystem", "EmbeddingService"]
-
+__all__ = ["MemorySystem", "EmbeddingService", "AsyncMemorySystem"]
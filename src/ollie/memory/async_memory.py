@@ -0,0 +1,109 @@
+"""
+Async facade over MemorySystem.
+
+Embedding inference and ChromaDB queries are CPU-bound and synchronous. Running
+them directly inside async handlers stalls the event loop, so this wrapper runs
+them on a dedicated, bounded thread pool that the handlers can await.
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from ollie.utils.metrics import metrics
+from .retrieval import MemorySystem
+
+
+class AsyncMemorySystem:
+    def __init__(
+        self, memory_system: MemorySystem, max_workers: int = 2, max_pending: int = 32
+    ):
+        """
+        Wrap a MemorySystem for use from asyncio code.
+
+        Args:
+            memory_system: The synchronous memory system
+            max_workers: Threads running embedding/index work concurrently
+            max_pending: Calls allowed in flight (running or queued) before callers wait
+        """
+        self.memory_system = memory_system
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="memory"
+        )
+        self._pending = asyncio.Semaphore(max_pending)
+
+    async def _run(self, name: str, fn, *args, **kwargs):
+        async with self._pending:
+            loop = asyncio.get_running_loop()
+            with metrics.timer(f"memory.{name}"):
+                return await loop.run_in_executor(
+                    self._executor, functools.partial(fn, *args, **kwargs)
+                )
+
+    async def search_memory(
+        self,
+        query: str,
+        n_results: int = 5,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> List[Dict[str, Any]]:
+        """Async version of MemorySystem.search_memory."""
+        return await self._run(
+            "search",
+            self.memory_system.search_memory,
+            query,
+            n_results=n_results,
+            since=since,
+            until=until,
+        )
+
+    async def search_hierarchical(
+        self,
+        query: str,
+        n_sessions: int = 3,
+        n_results: int = 5,
+        extra_session_ids: Optional[List[int]] = None,
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Async version of MemorySystem.search_hierarchical."""
+        return await self._run(
+            "search",
+            self.memory_system.search_hierarchical,
+            query,
+            n_sessions=n_sessions,
+            n_results=n_results,
+            extra_session_ids=extra_session_ids,
+        )
+
+    async def add_memory(
+        self, text: str, metadata: Dict[str, Any], memory_id: str
+    ) -> str:
+        """Async version of MemorySystem.add_memory."""
+        return await self._run(
+            "add", self.memory_system.add_memory, text, metadata, memory_id
+        )
+
+    async def add_memories(
+        self, texts: List[str], metadatas: List[Dict[str, Any]], memory_ids: List[str]
+    ) -> List[str]:
+        """Async version of MemorySystem.add_memories."""
+        return await self._run(
+            "add", self.memory_system.add_memories, texts, metadatas, memory_ids
+        )
+
+    async def add_session_summary(
+        self, session_id: int, summary: str, metadata: Dict[str, Any]
+    ):
+        """Index one session summary."""
+        return await self._run(
+            "add",
+            self.memory_system.add_session_summaries,
+            [session_id],
+            [summary],
+            [metadata],
+        )
+
+    def shutdown(self):
+        """Stop accepting work and release the worker threads."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
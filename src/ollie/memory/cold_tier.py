@@ -0,0 +1,169 @@
+"""
+Cold storage for old memory partitions.
+
+A compacted partition is a single .npz file holding int8-quantized embeddings
+(one scale per vector) plus the documents and metadata. It takes roughly a
+quarter of the space of the float32 HNSW collection, needs no index in RAM
+while idle, and is loaded on demand and searched by brute force when a query's
+time range reaches it.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+
+class ColdPartition:
+    def __init__(
+        self,
+        ids: List[str],
+        documents: List[str],
+        metadatas: List[Dict[str, Any]],
+        codes: np.ndarray,
+        scales: np.ndarray,
+    ):
+        """
+        An int8-quantized, read-only partition.
+
+        Args:
+            ids: Memory IDs
+            documents: Memory texts
+            metadatas: Memory metadata
+            codes: int8 matrix (n, dim) of quantized embeddings
+            scales: float32 vector (n,) of per-embedding scales
+        """
+        self.ids = ids
+        self.documents = documents
+        self.metadatas = metadatas
+        self.codes = codes
+        self.scales = scales
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @staticmethod
+    def quantize(embeddings: np.ndarray):
+        """Symmetric per-vector int8 quantization."""
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        scales = np.abs(embeddings).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        codes = np.round(embeddings / scales[:, None]).astype(np.int8)
+        return codes, scales.astype(np.float32)
+
+    @classmethod
+    def from_collection(cls, collection, page_size: int = 1000) -> "ColdPartition":
+        """Read every memory of a ChromaDB collection into a cold partition."""
+        ids, documents, metadatas, embeddings = [], [], [], []
+        offset = 0
+        while True:
+            batch = collection.get(
+                include=["documents", "metadatas", "embeddings"],
+                limit=page_size,
+                offset=offset,
+            )
+            ids.extend(batch["ids"])
+            documents.extend(batch["documents"])
+            metadatas.extend(batch["metadatas"])
+            embeddings.extend(batch["embeddings"])
+            if len(batch["ids"]) < page_size:
+                break
+            offset += page_size
+
+        if not ids:
+            return cls(
+                [],
+                [],
+                [],
+                np.zeros((0, 0), dtype=np.int8),
+                np.zeros(0, dtype=np.float32),
+            )
+        codes, scales = cls.quantize(np.asarray(embeddings))
+        return cls(ids, documents, metadatas, codes, scales)
+
+    def merge(self, other: "ColdPartition") -> "ColdPartition":
+        """Combine two partitions; entries of `other` win on duplicate IDs."""
+        if not len(self):
+            return other
+        if not len(other):
+            return self
+        replaced = set(other.ids)
+        keep = [i for i, memory_id in enumerate(self.ids) if memory_id not in replaced]
+        return ColdPartition(
+            [self.ids[i] for i in keep] + other.ids,
+            [self.documents[i] for i in keep] + other.documents,
+            [self.metadatas[i] for i in keep] + other.metadatas,
+            np.concatenate([self.codes[keep], other.codes]),
+            np.concatenate([self.scales[keep], other.scales]),
+        )
+
+    def save(self, path: Path):
+        """Write the partition atomically."""
+        records = json.dumps(
+            {"ids": self.ids, "documents": self.documents, "metadatas": self.metadatas}
+        )
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(f, codes=self.codes, scales=self.scales, records=np.array(records))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "ColdPartition":
+        with np.load(path, allow_pickle=False) as data:
+            records = json.loads(str(data["records"]))
+            return cls(
+                records["ids"],
+                records["documents"],
+                records["metadatas"],
+                data["codes"],
+                data["scales"],
+            )
+
+    def query(
+        self,
+        query_embedding: List[float],
+        n_results: int,
+        where: Optional[Callable[[Dict[str, Any]], bool]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Brute-force search with squared L2 distance (same metric as the hot collections).
+
+        Args:
+            query_embedding: Query vector
+            n_results: Number of results to return
+            where: Optional predicate on metadata
+
+        Returns:
+            Results formatted like MemorySystem.search_memory
+        """
+        if not len(self):
+            return []
+
+        candidates = np.arange(len(self))
+        if where is not None:
+            candidates = np.array(
+                [i for i in candidates if where(self.metadatas[i])], dtype=np.int64
+            )
+            if not len(candidates):
+                return []
+
+        vectors = (
+            self.codes[candidates].astype(np.float32) * self.scales[candidates, None]
+        )
+        query = np.asarray(query_embedding, dtype=np.float32)
+        distances = ((vectors - query) ** 2).sum(axis=1)
+
+        top = np.argsort(distances)[:n_results]
+        return [
+            {
+                "id": self.ids[candidates[i]],
+                "content": self.documents[candidates[i]],
+                "metadata": self.metadatas[candidates[i]],
+                "distance": float(distances[i]),
+            }
+            for i in top
+        ]
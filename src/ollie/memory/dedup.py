@@ -0,0 +1,16 @@
+"""
+Near-duplicate detection for memory ingest.
+
+The SimHash fingerprints and banded index live in ollie.utils.simhash, so the
+training data preparation can use them without the memory dependencies; they
+are re-exported here.
+"""
+
+from ollie.utils.simhash import (
+    FINGERPRINT_BITS,
+    SimHashIndex,
+    hamming_distance,
+    simhash,
+)
+
+__all__ = ["FINGERPRINT_BITS", "SimHashIndex", "hamming_distance", "simhash"]
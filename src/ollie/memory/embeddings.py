@@ -1,5 +1,4 @@
 from typing import List
-from sentence_transformers import SentenceTransformer
 
 class EmbeddingService:
     def __init__(self, model_name: str = "all-MiniLM-L6-v2", device: str = "cpu"):
@@ -10,18 +9,23 @@ class EmbeddingService:
             model_name: Name of the sentence-transformers model
             device: Device to run on
         """
+        # Imported here so importing this module does not pull in torch
+        from sentence_transformers import SentenceTransformer
+
+        self.model_name = model_name
         self.model = SentenceTransformer(model_name, device=device)
 
-    def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+    def generate_embeddings(self, texts: List[str], batch_size: int = 32) -> List[List[float]]:
         """
         Generate embeddings for a list of texts.
         
         Args:
             texts: List of strings to embed
+            batch_size: Number of texts per forward pass
             
         Returns:
             List of embedding vectors
         """
-        embeddings = self.model.encode(texts, convert_to_numpy=True)
+        embeddings = self.model.encode(texts, batch_size=batch_size, convert_to_numpy=True)
         return embeddings.tolist()
 
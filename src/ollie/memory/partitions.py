@@ -0,0 +1,94 @@
+"""
+Monthly time partitions for the memory store.
+
+Memories of one generation (see reindex) are sharded into one ChromaDB
+collection per calendar month, named "<generation>_p<YYYYMM>". These helpers
+map timestamps to partition keys and decide which partitions a query touches.
+
+Timestamps are naive UTC throughout, like the rest of the storage layer;
+aware ones (e.g. a "...Z" query parameter) are converted with to_utc first.
+"""
+
+import re
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def to_utc(timestamp: datetime) -> datetime:
+    """Naive UTC equivalent of a naive (assumed UTC) or timezone-aware timestamp."""
+    if timestamp.tzinfo is not None:
+        return timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp
+
+
+def utc_epoch(timestamp: datetime) -> float:
+    """Seconds since the epoch, reading naive timestamps as UTC (not local time)."""
+    return (to_utc(timestamp) - _EPOCH).total_seconds()
+
+
+def partition_key(timestamp: datetime) -> str:
+    """Partition key ("YYYYMM") for a timestamp."""
+    return timestamp.strftime("%Y%m")
+
+
+def partition_name(generation: str, key: str) -> str:
+    """Collection name of a partition."""
+    return f"{generation}_p{key}"
+
+
+def parse_partition_name(generation: str, name: str) -> Optional[str]:
+    """Return the partition key if `name` is a partition of `generation`."""
+    match = re.fullmatch(re.escape(generation) + r"_p(\d{6})", name)
+    return match.group(1) if match else None
+
+
+def partition_bounds(key: str) -> Tuple[datetime, datetime]:
+    """[start, end) of the month a partition covers."""
+    year, month = int(key[:4]), int(key[4:])
+    start = datetime(year, month, 1)
+    end = datetime(year + month // 12, month % 12 + 1, 1)
+    return start, end
+
+
+def memory_timestamp(metadata: Dict[str, Any]) -> datetime:
+    """Timestamp a memory is partitioned by; falls back to now if missing or unparseable."""
+    value = metadata.get("timestamp")
+    if value:
+        try:
+            return to_utc(datetime.fromisoformat(value))
+        except (TypeError, ValueError):
+            pass
+    return datetime.utcnow()
+
+
+def route_partitions(
+    keys: Iterable[str],
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    recent: Optional[int] = None,
+) -> List[str]:
+    """
+    Pick the partitions a query needs to search, newest first.
+
+    Args:
+        keys: Available partition keys
+        since: Only partitions that can contain memories at or after this time
+        until: Only partitions that can contain memories at or before this time
+        recent: Without a time filter, only the newest `recent` partitions (None = all)
+
+    Returns:
+        Partition keys to query
+    """
+    ordered = sorted(set(keys), reverse=True)
+    if since is None and until is None:
+        return ordered if recent is None else ordered[:recent]
+
+    selected = []
+    for key in ordered:
+        start, end = partition_bounds(key)
+        if (since is None or since < end) and (until is None or until >= start):
+            selected.append(key)
+    return selected
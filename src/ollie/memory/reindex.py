@@ -0,0 +1,357 @@
+"""
+Resumable re-index of conversations from SQLite into the memory store.
+
+Streams Conversation rows in keyset-paginated batches, embeds each batch with a
+single model call and upserts it into a fresh generation of monthly partition
+collections. Progress is checkpointed in the Metadata table after every batch,
+so an interrupted run resumes where it stopped. Once the backfill is complete
+the new generation is swapped in atomically and rows written during the swap
+are caught up. Re-indexing also migrates memories from the legacy single
+collection into monthly partitions.
+
+Only the core server may drop the previous generation, since it is the one
+serving it. The command line therefore asks the server to re-index
+(POST /memory/reindex) and waits for it; --offline re-indexes in this process
+for when the server is down, keeping the previous generation.
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import sessionmaker
+
+from ollie.storage.database import SessionLocal, init_db
+from ollie.storage.models import Conversation, Metadata, Session
+from .embeddings import EmbeddingService
+from .retrieval import MemorySystem, DEFAULT_COLLECTION
+
+REINDEX_STATE_KEY = "reindex_state"
+# Generations replaced by an offline re-index, dropped by the next one in the server
+RETIRED_GENERATIONS_KEY = "reindex_retired_generations"
+DEFAULT_BATCH_SIZE = 256
+
+# Only one re-index may run per process at a time
+_reindex_lock = threading.Lock()
+
+
+class ReindexInProgress(RuntimeError):
+    """Raised when a re-index is requested while another one is running."""
+
+
+def is_reindex_running() -> bool:
+    """Whether a re-index is currently running in this process."""
+    return _reindex_lock.locked()
+
+
+def load_reindex_state(
+    sessions: sessionmaker = SessionLocal,
+) -> Optional[Dict[str, Any]]:
+    """Return the checkpoint of an unfinished re-index, if any."""
+    with sessions() as db:
+        row = db.get(Metadata, REINDEX_STATE_KEY)
+        return json.loads(row.value) if row else None
+
+
+def _save_state(db, state: Dict[str, Any]):
+    db.merge(Metadata(key=REINDEX_STATE_KEY, value=json.dumps(state)))
+
+
+def _clear_state(sessions: sessionmaker):
+    with sessions() as db:
+        row = db.get(Metadata, REINDEX_STATE_KEY)
+        if row:
+            db.delete(row)
+            db.commit()
+
+
+def _retired_generations(sessions: sessionmaker) -> List[str]:
+    with sessions() as db:
+        row = db.get(Metadata, RETIRED_GENERATIONS_KEY)
+        return json.loads(row.value) if row else []
+
+
+def _set_retired_generations(sessions: sessionmaker, generations: List[str]):
+    with sessions() as db:
+        db.merge(Metadata(key=RETIRED_GENERATIONS_KEY, value=json.dumps(generations)))
+        db.commit()
+
+
+def _backfill(
+    memory_system: MemorySystem,
+    embedding_service,
+    state: Dict[str, Any],
+    batch_size: int,
+    sessions: sessionmaker,
+):
+    """Index every conversation with id > state["last_id"], checkpointing per batch."""
+    while True:
+        with sessions() as db:
+            rows = db.execute(
+                select(
+                    Conversation.id,
+                    Conversation.session_id,
+                    Conversation.speaker,
+                    Conversation.transcript,
+                    Conversation.timestamp,
+                )
+                .where(Conversation.id > state["last_id"])
+                .order_by(Conversation.id)
+                .limit(batch_size)
+            ).all()
+
+        if not rows:
+            return state
+
+        indexable = [r for r in rows if r.transcript and r.transcript.strip()]
+        memory_system.add_memories(
+            texts=[r.transcript for r in indexable],
+            metadatas=[
+                {
+                    "speaker": r.speaker,
+                    "session_id": r.session_id,
+                    "timestamp": r.timestamp.isoformat(),
+                    "type": "conversation",
+                }
+                for r in indexable
+            ],
+            memory_ids=[f"conv_{r.id}" for r in indexable],
+            generation=state["collection"],
+            embedding_service=embedding_service,
+        )
+
+        # Record embedding ids and the checkpoint in one transaction
+        state["last_id"] = rows[-1].id
+        state["indexed"] += len(indexable)
+        with sessions() as db:
+            if indexable:
+                db.execute(
+                    update(Conversation),
+                    [{"id": r.id, "embedding_id": f"conv_{r.id}"} for r in indexable],
+                )
+            _save_state(db, state)
+            db.commit()
+
+        print(
+            f"Re-indexed up to conversation {state['last_id']} ({state['indexed']} total)"
+        )
+
+
+def _backfill_summaries(
+    memory_system: MemorySystem,
+    collection_name: str,
+    embedding_service,
+    batch_size: int,
+    sessions: sessionmaker,
+):
+    """Re-embed every stored session summary into the summary index of the new collection."""
+    summary_collection = memory_system.summary_collection_for(collection_name)
+    last_id = 0
+    while True:
+        with sessions() as db:
+            rows = db.execute(
+                select(
+                    Session.id, Session.summary, Session.start_time, Session.end_time
+                )
+                .where(Session.id > last_id, Session.summary.is_not(None))
+                .order_by(Session.id)
+                .limit(batch_size)
+            ).all()
+        if not rows:
+            return
+
+        memory_system.add_session_summaries(
+            session_ids=[r.id for r in rows],
+            summaries=[r.summary for r in rows],
+            metadatas=[
+                {
+                    "session_id": r.id,
+                    "start_time": r.start_time.isoformat(),
+                    "end_time": (r.end_time or r.start_time).isoformat(),
+                    "type": "session_summary",
+                }
+                for r in rows
+            ],
+            collection=summary_collection,
+            embedding_service=embedding_service,
+        )
+        last_id = rows[-1].id
+
+
+def reindex_conversations(
+    memory_system: MemorySystem,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    embedding_model: Optional[str] = None,
+    restart: bool = False,
+    drop_previous: bool = True,
+    sessions: sessionmaker = SessionLocal,
+) -> Dict[str, Any]:
+    """
+    Rebuild the memory store from the conversations table.
+
+    Args:
+        memory_system: Live memory system; its active collection is swapped at the end
+        batch_size: Conversations per keyset page and embedding call
+        embedding_model: Sentence-transformers model for the new collection
+            (defaults to the currently active model)
+        restart: Discard any unfinished checkpoint and start over
+        drop_previous: Delete the previously active generation after the swap; only
+            safe in the process that serves searches from it
+        sessions: Session factory
+
+    Returns:
+        Final re-index state (collection, embedding_model, last_id, indexed)
+
+    Raises:
+        ReindexInProgress: If another re-index is already running in this process
+    """
+    if not _reindex_lock.acquire(blocking=False):
+        raise ReindexInProgress("A re-index is already running")
+
+    try:
+        current_model = memory_system.embedding_service.model_name
+        stale = load_reindex_state(sessions)
+        state = None if restart else stale
+
+        if state is None:
+            if stale and stale["collection"] != memory_system.generation:
+                memory_system.drop_generation(stale["collection"])
+
+            state = {
+                "collection": f"{DEFAULT_COLLECTION}_{datetime.utcnow().strftime('%Y%m%d%H%M%S')}",
+                "embedding_model": embedding_model or current_model,
+                "last_id": 0,
+                "indexed": 0,
+                "started_at": datetime.utcnow().isoformat(),
+            }
+            with sessions() as db:
+                _save_state(db, state)
+                db.commit()
+        else:
+            print(
+                f"Resuming re-index into {state['collection']} after conversation {state['last_id']}"
+            )
+
+        if state["embedding_model"] == current_model:
+            embedding_service = memory_system.embedding_service
+        else:
+            embedding_service = EmbeddingService(model_name=state["embedding_model"])
+
+        state = _backfill(memory_system, embedding_service, state, batch_size, sessions)
+        _backfill_summaries(
+            memory_system, state["collection"], embedding_service, batch_size, sessions
+        )
+
+        previous = memory_system.generation
+        memory_system.activate_collection(
+            state["collection"], embedding_service, drop_previous=drop_previous
+        )
+        if drop_previous:
+            for generation in _retired_generations(sessions):
+                if generation != state["collection"]:
+                    memory_system.drop_generation(generation)
+            _set_retired_generations(sessions, [])
+        elif previous != state["collection"]:
+            _set_retired_generations(
+                sessions, _retired_generations(sessions) + [previous]
+            )
+
+        # Catch up conversations committed while the last batch and swap ran
+        state = _backfill(memory_system, embedding_service, state, batch_size, sessions)
+        _clear_state(sessions)
+
+        print(
+            f"Re-index complete: {state['indexed']} memories in {state['collection']}"
+        )
+        return state
+    finally:
+        _reindex_lock.release()
+
+
+def reindex_via_server(
+    api_url: str,
+    batch_size: int,
+    embedding_model: Optional[str],
+    restart: bool,
+    poll_seconds: float = 5,
+):
+    """Start a re-index in the core server and wait until it has finished."""
+    # Imported here so the in-process re-index does not need requests
+    import requests
+
+    resp = requests.post(
+        f"{api_url}/memory/reindex",
+        json={
+            "batch_size": batch_size,
+            "embedding_model": embedding_model,
+            "restart": restart,
+        },
+        timeout=30,
+    )
+    resp.raise_for_status()
+    print(f"Re-index started on {api_url}")
+    # The background task may not have taken the lock yet when the first status is read
+    time.sleep(poll_seconds)
+    while True:
+        status = requests.get(f"{api_url}/memory/reindex", timeout=30).json()
+        if not status["running"]:
+            break
+        if status["state"]:
+            print(
+                f"Re-indexed up to conversation {status['state']['last_id']} ({status['state']['indexed']} total)"
+            )
+        time.sleep(poll_seconds)
+    if status["state"]:
+        raise SystemExit(
+            f"Re-index stopped unfinished (see the server log): {status['state']}"
+        )
+    print(f"Re-index complete: active collection {status['active_collection']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Rebuild the Ollie memory store from SQLite."
+    )
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument(
+        "--model", default=None, help="Embedding model for the new collection"
+    )
+    parser.add_argument(
+        "--restart", action="store_true", help="Ignore any saved checkpoint"
+    )
+    parser.add_argument(
+        "--api-url",
+        default=os.getenv("OLLIE_API_URL", "http://core:8000"),
+        help="Core server to run the re-index in",
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Re-index in this process (core server stopped); the previous generation is kept",
+    )
+    args = parser.parse_args()
+
+    if not args.offline:
+        reindex_via_server(args.api_url, args.batch_size, args.model, args.restart)
+        return
+
+    data_dir = os.getenv("DATA_DIR", "/data")
+    init_db()
+    memory_system = MemorySystem(persist_path=f"{data_dir}/chroma")
+    reindex_conversations(
+        memory_system,
+        batch_size=args.batch_size,
+        embedding_model=args.model,
+        restart=args.restart,
+        drop_previous=False,
+    )
+    print("The previous generation is kept; the next re-index in the server removes it")
+
+
+if __name__ == "__main__":
+    main()
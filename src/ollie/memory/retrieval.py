@@ -1,69 +1,617 @@
-import chromadb
-from typing import List, Dict, Any
+import json
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import List, Dict, Any, Optional
 from pathlib import Path
+from ollie.utils.metrics import metrics
 from .embeddings import EmbeddingService
+from .dedup import SimHashIndex, simhash
+from .cold_tier import ColdPartition
+from .partitions import (
+    partition_key,
+    partition_name,
+    parse_partition_name,
+    memory_timestamp,
+    route_partitions,
+    to_utc,
+    utc_epoch,
+)
+
+DEFAULT_COLLECTION = "conversations"
+DEFAULT_EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+ACTIVE_POINTER_FILE = "active_collection.json"
+SUMMARY_SUFFIX = "_summaries"
+COLD_DIR = "cold"
 
 class MemorySystem:
-    def __init__(self, persist_path: str = "/data/chroma", embedding_service: EmbeddingService = None):
+    def __init__(
+        self,
+        persist_path: str = "/data/chroma",
+        embedding_service: EmbeddingService = None,
+        collection_name: Optional[str] = None,
+        dedup_max_distance: Optional[int] = 3,
+        recent_partitions: Optional[int] = 6,
+        cold_cache_size: int = 2,
+    ):
         """
         Initialize the RAG memory system.
-        
+
+        Memories are sharded into monthly partitions ("<collection_name>_p<YYYYMM>").
+        Old partitions can be compacted into an int8-quantized cold tier that is
+        loaded on demand.
+
         Args:
             persist_path: Path to store ChromaDB data
             embedding_service: Service to generate embeddings
+            collection_name: Base name (generation) of the partition collections.
+                Defaults to the one recorded by the last re-index, or "conversations".
+            dedup_max_distance: SimHash bit distance at or below which a new memory
+                counts as a near-duplicate of a stored one. None disables dedup.
+            recent_partitions: Partitions searched when a query has no time filter
+                (newest first). None searches every hot partition.
+            cold_cache_size: Cold partitions kept loaded in memory
         """
+        # Imported here so the core app can start serving before chromadb loads
+        import chromadb
+
+        self.persist_path = persist_path
         self.client = chromadb.PersistentClient(path=persist_path)
-        self.collection = self.client.get_or_create_collection(name="conversations")
-        
+        self.cold_dir = Path(persist_path) / COLD_DIR
+        self.cold_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.recent_partitions = recent_partitions
+        self.dedup_max_distance = dedup_max_distance
+        self._dedup_lock = threading.Lock()
+        self._dedup_indexes: Dict[str, SimHashIndex] = {}
+        self.cold_cache_size = cold_cache_size
+        self._cold_lock = threading.Lock()
+        self._cold_cache: "OrderedDict[str, ColdPartition]" = OrderedDict()
+
+        active = self.read_active_pointer()
+        self.generation = collection_name or active.get("collection", DEFAULT_COLLECTION)
+        self._partitions = self._load_partitions(self.generation)
+        self._cold_keys = self._load_cold_keys(self.generation)
+        # Unpartitioned collection written before partitioning; searched until re-indexed
+        self.legacy_collection = self._load_legacy(self.generation)
+        # One summary per session, used to pick sessions before searching passages
+        self.summary_collection = self.summary_collection_for(self.generation)
+
         if embedding_service is None:
-            self.embedding_service = EmbeddingService()
+            self.embedding_service = EmbeddingService(
+                model_name=active.get("embedding_model", DEFAULT_EMBEDDING_MODEL)
+            )
         else:
             self.embedding_service = embedding_service
 
+    def read_active_pointer(self) -> Dict[str, Any]:
+        """Read the active collection pointer written by the last re-index."""
+        pointer = Path(self.persist_path) / ACTIVE_POINTER_FILE
+        if not pointer.exists():
+            return {}
+        with open(pointer) as f:
+            return json.load(f)
+
+    def _load_partitions(self, generation: str) -> Dict[str, Any]:
+        partitions = {}
+        for collection in self.client.list_collections():
+            key = parse_partition_name(generation, collection.name)
+            if key:
+                partitions[key] = collection
+        return partitions
+
+    def _load_cold_keys(self, generation: str) -> set:
+        keys = set()
+        for path in self.cold_dir.glob(f"{generation}_p*.npz"):
+            key = parse_partition_name(generation, path.stem)
+            if key:
+                keys.add(key)
+        return keys
+
+    def _load_legacy(self, generation: str):
+        try:
+            collection = self.client.get_collection(name=generation)
+        except Exception:
+            return None
+        return collection if collection.count() > 0 else None
+
+    def summary_collection_for(self, generation: str):
+        """Get (or create) the session-summary collection of a generation."""
+        return self.client.get_or_create_collection(name=generation + SUMMARY_SUFFIX)
+
+    def _partition(self, generation: str, key: str):
+        """Get (or create) a hot partition collection."""
+        with self._lock:
+            if generation == self.generation and key in self._partitions:
+                return self._partitions[key]
+        collection = self.client.get_or_create_collection(name=partition_name(generation, key))
+        with self._lock:
+            if generation == self.generation:
+                self._partitions[key] = collection
+        return collection
+
+    def _cold_path(self, generation: str, key: str) -> Path:
+        return self.cold_dir / f"{partition_name(generation, key)}.npz"
+
+    def _cold_partition(self, generation: str, key: str) -> ColdPartition:
+        """Load a cold partition, keeping the most recently used ones cached."""
+        name = partition_name(generation, key)
+        with self._cold_lock:
+            if name in self._cold_cache:
+                self._cold_cache.move_to_end(name)
+                return self._cold_cache[name]
+
+        with metrics.timer("memory.cold_load"):
+            partition = ColdPartition.load(self._cold_path(generation, key))
+
+        with self._cold_lock:
+            self._cold_cache[name] = partition
+            while len(self._cold_cache) > self.cold_cache_size:
+                self._cold_cache.popitem(last=False)
+        return partition
+
+    def drop_generation(self, generation: str):
+        """Delete every collection and cold file belonging to a generation."""
+        for collection in self.client.list_collections():
+            if (
+                collection.name in (generation, generation + SUMMARY_SUFFIX)
+                or parse_partition_name(generation, collection.name)
+            ):
+                self.client.delete_collection(name=collection.name)
+        for path in self.cold_dir.glob(f"{generation}_p*.npz"):
+            path.unlink()
+
+    def activate_collection(self, name: str, embedding_service: EmbeddingService = None, drop_previous: bool = True):
+        """
+        Atomically make a generation the active one.
+
+        The pointer file is replaced with os.replace so a crash never leaves it
+        half-written, and the in-process swap happens under the memory lock so
+        concurrent searches see either the old or the new generation.
+
+        Args:
+            name: Generation to activate
+            embedding_service: Embedding service matching the generation's vectors
+            drop_previous: Delete the previously active generation after the swap
+        """
+        partitions = self._load_partitions(name)
+        cold_keys = self._load_cold_keys(name)
+        legacy = self._load_legacy(name)
+        summary_collection = self.summary_collection_for(name)
+        embedding_service = embedding_service or self.embedding_service
+        model_name = getattr(embedding_service, "model_name", DEFAULT_EMBEDDING_MODEL)
+
+        pointer = Path(self.persist_path) / ACTIVE_POINTER_FILE
+        tmp_pointer = pointer.with_suffix(".tmp")
+        with open(tmp_pointer, "w") as f:
+            json.dump({"collection": name, "embedding_model": model_name}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_pointer, pointer)
+
+        with self._lock:
+            previous = self.generation
+            self.generation = name
+            self._partitions = partitions
+            self._cold_keys = cold_keys
+            self.legacy_collection = legacy
+            self.summary_collection = summary_collection
+            self.embedding_service = embedding_service
+        with self._dedup_lock:
+            self._dedup_indexes = {}
+        with self._cold_lock:
+            self._cold_cache.clear()
+
+        if drop_previous and previous != name:
+            self.drop_generation(previous)
+
     def add_memory(self, text: str, metadata: Dict[str, Any], memory_id: str):
         """
         Add a memory to the system.
-        
+
         Args:
             text: The text content (transcript)
             metadata: Associated metadata (timestamp, speaker, session_id)
             memory_id: Unique ID for the memory
+
+        Returns:
+            ID the memory is stored under; differs from memory_id when the text
+            was merged into, or skipped as a duplicate of, an existing memory
         """
-        embeddings = self.embedding_service.generate_embeddings([text])
-        
-        self.collection.add(
-            documents=[text],
+        return self.add_memories([text], [metadata], [memory_id])[0]
+
+    def add_memories(
+        self,
+        texts: List[str],
+        metadatas: List[Dict[str, Any]],
+        memory_ids: List[str],
+        generation: Optional[str] = None,
+        embedding_service: EmbeddingService = None,
+    ) -> List[str]:
+        """
+        Embed a batch of memories in one model call and upsert them into their monthly partitions.
+
+        Writes to the active generation pass through near-duplicate suppression
+        (within the memory's partition): a near-duplicate of a stored memory is
+        skipped, unless it is longer, in which case it replaces the stored text
+        under the existing ID.
+
+        Args:
+            texts: The text contents
+            metadatas: Metadata for each text; "timestamp" picks the partition
+            memory_ids: Unique ID for each memory
+            generation: Target generation (defaults to the active one, without dedup)
+            embedding_service: Embedding service to use (defaults to the active one)
+
+        Returns:
+            ID each text is stored under, in input order
+        """
+        if not texts:
+            return []
+
+        dedup = generation is None and self.dedup_max_distance is not None
+        with self._lock:
+            generation = generation or self.generation
+            embedding_service = embedding_service or self.embedding_service
+
+        # Group by partition, adding a numeric timestamp for range filters
+        grouped: Dict[str, tuple] = {}
+        positions: Dict[str, List[int]] = {}
+        for i, (text, metadata, memory_id) in enumerate(zip(texts, metadatas, memory_ids)):
+            timestamp = memory_timestamp(metadata)
+            key = partition_key(timestamp)
+            group = grouped.setdefault(key, ([], [], []))
+            group[0].append(text)
+            group[1].append({**metadata, "ts": utc_epoch(timestamp)})
+            group[2].append(memory_id)
+            positions.setdefault(key, []).append(i)
+
+        assigned = list(memory_ids)
+        to_embed = []
+        for key, (group_texts, group_metadatas, group_ids) in grouped.items():
+            group_assigned = group_ids
+            if dedup:
+                group_texts, group_metadatas, group_ids, group_assigned = self._deduplicate(
+                    key, self._partition(generation, key), group_texts, group_metadatas, group_ids
+                )
+            for position, memory_id in zip(positions[key], group_assigned):
+                assigned[position] = memory_id
+            if group_texts:
+                to_embed.append((key, group_texts, group_metadatas, group_ids))
+
+        if to_embed:
+            embeddings = embedding_service.generate_embeddings([t for _, ts, _, _ in to_embed for t in ts])
+            offset = 0
+            for key, group_texts, group_metadatas, group_ids in to_embed:
+                self._partition(generation, key).upsert(
+                    documents=group_texts,
+                    embeddings=embeddings[offset:offset + len(group_texts)],
+                    metadatas=group_metadatas,
+                    ids=group_ids
+                )
+                offset += len(group_texts)
+
+        return assigned
+
+    def _load_dedup_index(self, collection) -> SimHashIndex:
+        index = SimHashIndex(max_distance=self.dedup_max_distance)
+        offset, page = 0, 1000
+        while True:
+            batch = collection.get(include=["documents"], limit=page, offset=offset)
+            for memory_id, document in zip(batch["ids"], batch["documents"]):
+                index.add(memory_id, simhash(document), len(document))
+            if len(batch["ids"]) < page:
+                return index
+            offset += page
+
+    def _deduplicate(self, key, collection, texts, metadatas, memory_ids):
+        """Drop or fold near-duplicates; returns the rows to upsert plus the assigned IDs."""
+        with self._dedup_lock:
+            if key not in self._dedup_indexes:
+                self._dedup_indexes[key] = self._load_dedup_index(collection)
+            index = self._dedup_indexes[key]
+
+            upserts: Dict[str, tuple] = {}
+            assigned = []
+            for text, metadata, memory_id in zip(texts, metadatas, memory_ids):
+                metrics.incr("memory.dedup.checked")
+                fingerprint = simhash(text)
+                match = index.find(fingerprint)
+
+                if match is None or match[0] == memory_id:
+                    target = memory_id
+                    metrics.incr("memory.dedup.stored")
+                elif len(text) > match[1]:
+                    # The more complete transcript replaces the stored one
+                    target = match[0]
+                    metrics.incr("memory.dedup.merged")
+                    metrics.incr("memory.dedup.vectors_prevented")
+                else:
+                    assigned.append(match[0])
+                    metrics.incr("memory.dedup.skipped")
+                    metrics.incr("memory.dedup.vectors_prevented")
+                    metrics.incr("memory.dedup.chars_prevented", len(text))
+                    continue
+
+                index.add(target, fingerprint, len(text))
+                upserts[target] = (text, metadata)
+                assigned.append(target)
+
+            metrics.set("memory.dedup.index_size", sum(len(i) for i in self._dedup_indexes.values()))
+
+        ids = list(upserts)
+        return (
+            [upserts[i][0] for i in ids],
+            [upserts[i][1] for i in ids],
+            ids,
+            assigned,
+        )
+
+    def add_session_summaries(
+        self,
+        session_ids: List[int],
+        summaries: List[str],
+        metadatas: List[Dict[str, Any]],
+        collection=None,
+        embedding_service: EmbeddingService = None,
+    ):
+        """
+        Embed and upsert session summaries into the summary index.
+
+        Args:
+            session_ids: Sessions being summarized
+            summaries: Summary text for each session
+            metadatas: Metadata for each summary (session_id, start/end time)
+            collection: Target summary collection (defaults to the active one)
+            embedding_service: Embedding service to use (defaults to the active one)
+        """
+        with self._lock:
+            collection = collection or self.summary_collection
+            embedding_service = embedding_service or self.embedding_service
+
+        embeddings = embedding_service.generate_embeddings(summaries)
+        collection.upsert(
+            documents=summaries,
             embeddings=embeddings,
-            metadatas=[metadata],
-            ids=[memory_id]
+            metadatas=metadatas,
+            ids=[f"session_{session_id}" for session_id in session_ids]
         )
 
-    def search_memory(self, query: str, n_results: int = 5) -> List[Dict[str, Any]]:
+    def search_memory(
+        self,
+        query: str,
+        n_results: int = 5,
+        session_ids: Optional[List[int]] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> List[Dict[str, Any]]:
         """
         Search for relevant memories.
-        
+
+        Only the partitions overlapping [since, until] are searched; without a
+        time filter, only the newest `recent_partitions`.
+
         Args:
             query: The search query
             n_results: Number of results to return
-            
+            session_ids: Only search passages from these sessions
+            since: Only memories at or after this time (naive times are UTC)
+            until: Only memories at or before this time (naive times are UTC)
+
         Returns:
             List of results with content and metadata
         """
-        query_embedding = self.embedding_service.generate_embeddings([query])
-        
-        results = self.collection.query(
+        with self._lock:
+            embedding_service = self.embedding_service
+
+        # Partition bounds and stored timestamps are naive UTC
+        since = to_utc(since) if since else None
+        until = to_utc(until) if until else None
+        query_embedding = embedding_service.generate_embeddings([query])
+        return self._search(query_embedding, n_results, session_ids, since, until)
+
+    def search_hierarchical(
+        self,
+        query: str,
+        n_sessions: int = 3,
+        n_results: int = 5,
+        extra_session_ids: Optional[List[int]] = None,
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Two-stage search: pick the best sessions by summary, then search their passages.
+
+        The first stage queries the (much smaller) summary index, so cost grows
+        with the number of sessions rather than the number of utterances. The
+        second stage only touches the partitions spanned by those sessions.
+
+        Args:
+            query: The search query
+            n_sessions: Number of sessions to select from the summary index
+            n_results: Number of passages to return
+            extra_session_ids: Sessions to always include, e.g. recent sessions
+                that have not been summarized yet
+
+        Returns:
+            {"sessions": matching session summaries, "passages": matching passages,
+            "query_embedding": the embedded query}. Falls back to a flat passage
+            search while no summaries exist.
+        """
+        with self._lock:
+            summary_collection = self.summary_collection
+            embedding_service = self.embedding_service
+
+        query_embedding = embedding_service.generate_embeddings([query])
+
+        if summary_collection.count() == 0:
+            return {
+                "sessions": [],
+                "passages": self._search(query_embedding, n_results),
+                "query_embedding": query_embedding[0],
+            }
+
+        sessions = self._query(summary_collection, query_embedding, n_sessions)
+        session_ids = [s["metadata"]["session_id"] for s in sessions]
+        keys = set()
+        for s in sessions:
+            keys.update(self._route(
+                datetime.fromisoformat(s["metadata"]["start_time"]),
+                datetime.fromisoformat(s["metadata"]["end_time"]),
+            ))
+
+        extra = [sid for sid in (extra_session_ids or []) if sid not in session_ids]
+        if extra:
+            # Unsummarized sessions are the recent ones
+            keys.update(self._route(recent=1))
+            session_ids += extra
+
+        passages = self._search(query_embedding, n_results, session_ids, keys=sorted(keys, reverse=True))
+        return {"sessions": sessions, "passages": passages, "query_embedding": query_embedding[0]}
+
+    def _route(self, since=None, until=None, recent=None) -> List[str]:
+        with self._lock:
+            hot, cold = set(self._partitions), set(self._cold_keys)
+        if since is None and until is None:
+            # The recency budget only covers hot partitions
+            return route_partitions(hot, recent=recent if recent is not None else self.recent_partitions)
+        return route_partitions(hot | cold, since, until)
+
+    def _search(
+        self,
+        query_embedding,
+        n_results: int,
+        session_ids: Optional[List[int]] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        keys: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        if session_ids is not None and not session_ids:
+            return []
+        if keys is None:
+            keys = self._route(since, until)
+
+        with self._lock:
+            generation = self.generation
+            partitions = dict(self._partitions)
+            cold_keys = set(self._cold_keys)
+            legacy = self.legacy_collection
+
+        since_ts = utc_epoch(since) if since else None
+        until_ts = utc_epoch(until) if until else None
+        where = self._where(session_ids, since_ts, until_ts)
+
+        def matches(metadata):
+            ts = metadata.get("ts")
+            return (
+                (session_ids is None or metadata.get("session_id") in session_ids)
+                and (since_ts is None or (ts is not None and ts >= since_ts))
+                and (until_ts is None or (ts is not None and ts <= until_ts))
+            )
+
+        results = []
+        for key in keys:
+            if key in partitions:
+                results += self._query(partitions[key], query_embedding, n_results, where)
+            if key in cold_keys:
+                cold = self._cold_partition(generation, key)
+                results += cold.query(query_embedding[0], n_results, matches)
+        if legacy is not None:
+            # Legacy memories carry no numeric timestamp; filter by session only
+            results += self._query(legacy, query_embedding, n_results, self._where(session_ids))
+
+        metrics.observe("memory.partitions_searched", len(keys))
+        results.sort(key=lambda r: r["distance"] if r["distance"] is not None else float("inf"))
+        return results[:n_results]
+
+    @staticmethod
+    def _where(session_ids=None, since_ts=None, until_ts=None):
+        clauses = []
+        if session_ids is not None:
+            clauses.append({"session_id": {"$in": list(session_ids)}})
+        if since_ts is not None:
+            clauses.append({"ts": {"$gte": since_ts}})
+        if until_ts is not None:
+            clauses.append({"ts": {"$lte": until_ts}})
+        if not clauses:
+            return None
+        return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+    def _query(self, collection, query_embedding, n_results: int, where=None):
+        results = collection.query(
             query_embeddings=query_embedding,
-            n_results=n_results
+            n_results=n_results,
+            where=where
         )
-        
+
         formatted_results = []
         if results['documents']:
             for i in range(len(results['documents'][0])):
                 formatted_results.append({
+                    "id": results['ids'][0][i],
                     "content": results['documents'][0][i],
                     "metadata": results['metadatas'][0][i],
                     "distance": results['distances'][0][i] if results['distances'] else None
                 })
-                
+
         return formatted_results
 
+    def compact_partition(self, key: str) -> int:
+        """
+        Move a hot partition of the active generation into the cold tier.
+
+        Args:
+            key: Partition key ("YYYYMM")
+
+        Returns:
+            Number of memories compacted
+        """
+        with self._lock:
+            generation = self.generation
+            collection = self._partitions.get(key)
+        if collection is None:
+            return 0
+
+        cold = ColdPartition.from_collection(collection)
+        path = self._cold_path(generation, key)
+        if path.exists():
+            # Late writes re-created the hot partition; fold them into the cold file
+            cold = ColdPartition.load(path).merge(cold)
+        cold.save(path)
+
+        with self._lock:
+            self._partitions.pop(key, None)
+            self._cold_keys.add(key)
+        with self._dedup_lock:
+            self._dedup_indexes.pop(key, None)
+        with self._cold_lock:
+            self._cold_cache.pop(partition_name(generation, key), None)
+        self.client.delete_collection(name=collection.name)
+
+        metrics.incr("memory.partitions_compacted")
+        return len(cold)
+
+    def compact_older_than(self, months: int) -> Dict[str, int]:
+        """
+        Compact every hot partition at least `months` months older than the current one.
+
+        Returns:
+            Number of memories compacted per partition key
+        """
+        now = datetime.utcnow()
+        index = now.year * 12 + now.month - 1 - months
+        cutoff = f"{index // 12:04d}{index % 12 + 1:02d}"
+        with self._lock:
+            keys = [k for k in self._partitions if k <= cutoff]
+        return {key: self.compact_partition(key) for key in sorted(keys)}
+
+    def partition_stats(self) -> Dict[str, Any]:
+        """Sizes of the hot and cold partitions of the active generation."""
+        with self._lock:
+            generation = self.generation
+            partitions = dict(self._partitions)
+            cold_keys = sorted(self._cold_keys)
+        return {
+            "generation": generation,
+            "hot": {key: c.count() for key, c in sorted(partitions.items())},
+            "cold": {key: self._cold_path(generation, key).stat().st_size for key in cold_keys},
+        }
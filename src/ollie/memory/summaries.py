@@ -0,0 +1,192 @@
+"""
+Background summarization of closed sessions.
+
+A session is considered closed once it has an end_time or has been idle for a
+while. Each closed session gets an LLM-written summary stored in
+Session.summary and indexed in the summary collection, which drives the first
+stage of MemorySystem.search_hierarchical.
+
+Summarizing sets end_time to the last summarized turn. A session that gets
+turns after its end_time is stale: it counts as unsummarized again and is
+re-summarized once idle, which also extends the summary's time range.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import exists, func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import aliased
+
+from ollie.llm.scheduler import OllamaScheduler
+from ollie.utils.concurrency import BACKGROUND
+from ollie.storage.database import AsyncSessionLocal
+from ollie.storage.models import Session, Conversation
+
+SUMMARY_PROMPT = """Summarize the following conversation in 3-5 sentences.
+Mention the people, topics, decisions and dates that someone might later ask about.
+Write in the third person and do not add anything that was not said.
+
+Conversation:
+{transcript}
+"""
+
+# Keep the prompt within a small model's context window
+MAX_TRANSCRIPT_CHARS = 12000
+
+
+def _has_later_turns():
+    """Whether a session has turns after its end_time (which its summary does not cover)."""
+    later = aliased(Conversation)
+    return (
+        exists()
+        .where(later.session_id == Session.id, later.timestamp > Session.end_time)
+        .correlate(Session)
+    )
+
+
+async def unsummarized_session_ids(
+    limit: int = 20, sessions: async_sessionmaker = AsyncSessionLocal
+) -> List[int]:
+    """Most recent sessions without an up-to-date summary (still open, not yet processed, or stale)."""
+    async with sessions() as db:
+        return list(
+            await db.scalars(
+                select(Session.id)
+                .where(Session.summary.is_(None) | _has_later_turns())
+                .order_by(Session.id.desc())
+                .limit(limit)
+            )
+        )
+
+
+class SessionSummarizer:
+    def __init__(
+        self,
+        memory,
+        scheduler: OllamaScheduler,
+        model: str,
+        idle_minutes: int = 30,
+        batch_size: int = 5,
+        sessions: async_sessionmaker = AsyncSessionLocal,
+    ):
+        """
+        Initialize the summarizer.
+
+        Args:
+            memory: AsyncMemorySystem used to index summaries
+            scheduler: Ollama scheduler; summaries run at background priority
+            model: Model used to write summaries
+            idle_minutes: Minutes without new utterances after which a session counts as closed
+            batch_size: Sessions summarized per pass
+            sessions: Async session factory of the database holding the sessions
+        """
+        self.memory = memory
+        self.scheduler = scheduler
+        self.model = model
+        self.idle_minutes = idle_minutes
+        self.batch_size = batch_size
+        self.sessions = sessions
+
+    async def find_closed_sessions(self, limit: int) -> List[int]:
+        """Return ids of closed sessions that have utterances but no summary, or a stale one."""
+        cutoff = datetime.utcnow() - timedelta(minutes=self.idle_minutes)
+        last_utterance = func.max(Conversation.timestamp)
+        end_time = func.max(Session.end_time)
+        stmt = (
+            select(Session.id)
+            .join(Conversation, Conversation.session_id == Session.id)
+            .where(Session.summary.is_(None) | _has_later_turns())
+            .group_by(Session.id)
+            # A stale session has an end_time, but is only closed again once idle
+            .having(
+                (end_time.is_not(None) & (last_utterance <= end_time))
+                | (last_utterance < cutoff)
+            )
+            .order_by(Session.id)
+            .limit(limit)
+        )
+        async with self.sessions() as db:
+            return list(await db.scalars(stmt))
+
+    async def _generate(self, transcript: str) -> str:
+        payload = {
+            "model": self.model,
+            "messages": [
+                {
+                    "role": "user",
+                    "content": SUMMARY_PROMPT.format(transcript=transcript),
+                }
+            ],
+            "stream": False,
+        }
+        data = await self.scheduler.chat(payload, priority=BACKGROUND, timeout=300.0)
+        return data["message"]["content"].strip()
+
+    async def summarize_session(self, session_id: int) -> Optional[str]:
+        """Summarize one session, persist the summary and index it."""
+        async with self.sessions() as db:
+            rows = (
+                await db.execute(
+                    select(
+                        Conversation.speaker,
+                        Conversation.transcript,
+                        Conversation.timestamp,
+                    )
+                    .where(Conversation.session_id == session_id)
+                    .order_by(Conversation.timestamp, Conversation.id)
+                )
+            ).all()
+        if not rows:
+            return None
+
+        transcript = "\n".join(f"{r.speaker}: {r.transcript}" for r in rows)
+        if len(transcript) > MAX_TRANSCRIPT_CHARS:
+            # Keep the end of long sessions; it usually carries the outcome
+            transcript = transcript[-MAX_TRANSCRIPT_CHARS:]
+
+        summary = await self._generate(transcript)
+
+        async with self.sessions() as db:
+            session = await db.get(Session, session_id)
+            session.summary = summary
+            # Cover turns added after an earlier summary, so the summary routes to their partitions
+            if session.end_time is None or session.end_time < rows[-1].timestamp:
+                session.end_time = rows[-1].timestamp
+            start_time, end_time = session.start_time, session.end_time
+            await db.commit()
+
+        await self.memory.add_session_summary(
+            session_id,
+            summary,
+            {
+                "session_id": session_id,
+                "start_time": start_time.isoformat(),
+                "end_time": end_time.isoformat(),
+                "type": "session_summary",
+            },
+        )
+        return summary
+
+    async def run_once(self) -> int:
+        """Summarize up to batch_size closed sessions. Returns how many were summarized."""
+        done = 0
+        for session_id in await self.find_closed_sessions(self.batch_size):
+            try:
+                if await self.summarize_session(session_id):
+                    done += 1
+            except Exception as e:
+                print(f"Failed to summarize session {session_id}: {e}")
+        return done
+
+    async def run_forever(self, interval_seconds: float = 300):
+        """Summarize closed sessions periodically until cancelled."""
+        while True:
+            try:
+                summarized = await self.run_once()
+                if summarized:
+                    print(f"Summarized {summarized} sessions")
+            except Exception as e:
+                print(f"Session summarizer error: {e}")
+            await asyncio.sleep(interval_seconds)
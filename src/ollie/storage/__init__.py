@@ -1,5 +1,6 @@
-from .database import init_db, get_db, SessionLocal
-from .models import Base, Session, Conversation, Metadata
+from .database import init_db, get_db, get_async_db, SessionLocal, AsyncSessionLocal
+from .models import Base, Session, Conversation, Metadata, IngestItem
+from .browse import session_page, conversation_page, InvalidCursor
 
-__all__ = ["init_db", "get_db", "SessionLocal", "Base", "Session", "Conversation", "Metadata"]
+__all__ = ["init_db", "get_db", "get_async_db", "SessionLocal", "AsyncSessionLocal", "Base", "Session", "Conversation", "Metadata", "IngestItem", "session_page", "conversation_page", "InvalidCursor"]
 
@@ -0,0 +1,262 @@
+"""
+Compressed archive tier for recorded audio.
+
+Uploads land as WAV under `audio/<YYYY-MM-DD>/`. Once a day directory is old
+enough, its files are transcoded (FLAC, lossless, or Opus) into a
+content-addressed store, `audio/archive/<ab>/<sha256>.<ext>`, keyed by the
+hash of the original file, so identical recordings are kept once. For each day:
+files are transcoded first, then conversations and queued ingest items are
+pointed at the archived copies in one transaction, and only then are the
+originals deleted, so an interrupted run is simply repeated.
+
+FLAC and Ogg Opus are seekable, so a time range of an archived file is read
+without decoding the whole file (see `read_segment`). Per-day storage savings
+are kept in the metadata table (`stats`).
+"""
+
+import hashlib
+import io
+import json
+import os
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import soundfile as sf
+from sqlalchemy import case, update
+from sqlalchemy.orm import sessionmaker
+
+from .database import SessionLocal
+from .models import Conversation, IngestItem, Metadata
+
+ARCHIVE_STATS_KEY = "audio_archive_stats"
+
+# format name -> (libsndfile container, extension)
+AUDIO_FORMATS = {
+    "flac": ("FLAC", ".flac"),
+    "opus": ("OGG", ".opus"),
+}
+# Subtypes FLAC stores losslessly; anything else (e.g. float WAV) is written as PCM_24
+FLAC_SUBTYPES = ("PCM_S8", "PCM_16", "PCM_24")
+OPUS_SAMPLE_RATES = (8000, 12000, 16000, 24000, 48000)
+MEDIA_TYPES = {".wav": "audio/wav", ".flac": "audio/flac", ".opus": "audio/ogg"}
+# Frames transcoded per read, so memory stays flat for long recordings
+BLOCK_FRAMES = 65536
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_segment(path: str, start: float = 0.0, end: Optional[float] = None) -> bytes:
+    """
+    A time range of an audio file as 16-bit WAV, seeking rather than decoding from the start.
+
+    Args:
+        path: WAV, FLAC or Opus file
+        start: Offset in seconds
+        end: End in seconds (default: end of file)
+
+    Returns:
+        WAV bytes of the range
+    """
+    with sf.SoundFile(path) as f:
+        first = min(int(start * f.samplerate), f.frames)
+        last = f.frames if end is None else min(int(end * f.samplerate), f.frames)
+        f.seek(first)
+        data = f.read(max(0, last - first), dtype="int16", always_2d=True)
+        buffer = io.BytesIO()
+        sf.write(buffer, data, f.samplerate, format="WAV", subtype="PCM_16")
+    return buffer.getvalue()
+
+
+class AudioArchive:
+    def __init__(
+        self,
+        audio_root: str,
+        audio_format: str = "flac",
+        sessions: sessionmaker = SessionLocal,
+    ):
+        """
+        Initialize the archive.
+
+        Args:
+            audio_root: Directory holding the per-day upload directories
+            audio_format: "flac" (lossless) or "opus"
+            sessions: Session factory of the database whose audio paths are updated
+        """
+        if audio_format not in AUDIO_FORMATS:
+            raise ValueError(
+                f"Unknown audio archive format {audio_format!r} (expected one of {sorted(AUDIO_FORMATS)})"
+            )
+        self.audio_root = Path(audio_root)
+        self.root = self.audio_root / "archive"
+        self.audio_format = audio_format
+        self.sessions = sessions
+
+    def archive_path(self, digest: str, audio_format: str) -> Path:
+        return self.root / digest[:2] / f"{digest}{AUDIO_FORMATS[audio_format][1]}"
+
+    def _format_for(self, info) -> Tuple[str, str]:
+        """(format name, subtype) to archive a file with the given soundfile info as."""
+        if self.audio_format == "opus" and info.samplerate in OPUS_SAMPLE_RATES:
+            return "opus", "OPUS"
+        # libsndfile's Opus encoder only takes the native Opus rates; keep the rest lossless
+        return "flac", info.subtype if info.subtype in FLAC_SUBTYPES else "PCM_24"
+
+    def transcode(self, source: Path, target: Path, audio_format: str, subtype: str):
+        """Re-encode source into target block by block (written atomically)."""
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+        container = AUDIO_FORMATS[audio_format][0]
+        try:
+            with sf.SoundFile(source) as src, sf.SoundFile(
+                tmp,
+                "w",
+                samplerate=src.samplerate,
+                channels=src.channels,
+                format=container,
+                subtype=subtype,
+            ) as dst:
+                for block in src.blocks(
+                    blocksize=BLOCK_FRAMES, dtype="float32", always_2d=True
+                ):
+                    dst.write(block)
+            os.replace(tmp, target)
+        finally:
+            tmp.unlink(missing_ok=True)
+
+    def archive_file(self, path: Path) -> Optional[Dict[str, Any]]:
+        """
+        Transcode one file into the archive, unless an identical recording is already there.
+
+        Returns:
+            source/archived paths and sizes, or None if the file is not uncompressed audio
+        """
+        try:
+            info = sf.info(str(path))
+        except Exception:
+            return None
+        if info.format != "WAV":
+            # Already compressed (or not audio); re-encoding would not save space
+            return None
+        audio_format, subtype = self._format_for(info)
+        target = self.archive_path(file_sha256(path), audio_format)
+        deduplicated = target.exists()
+        if not deduplicated:
+            self.transcode(path, target, audio_format, subtype)
+        return {
+            "source": str(path),
+            "archived": str(target),
+            "original_bytes": path.stat().st_size,
+            "archived_bytes": 0 if deduplicated else target.stat().st_size,
+            "deduplicated": deduplicated,
+        }
+
+    def _repoint(self, moved: Dict[str, str]):
+        """Point conversations and queued ingest items at the archived copies, in one transaction."""
+        with self.sessions() as db:
+            for model in (Conversation, IngestItem):
+                db.execute(
+                    update(model)
+                    .where(model.audio_path.in_(moved))
+                    .values(audio_path=case(moved, value=model.audio_path))
+                )
+            db.commit()
+
+    def aged_days(
+        self, older_than_days: int, today: Optional[date] = None
+    ) -> List[Path]:
+        """Day directories whose date is more than older_than_days ago, oldest first."""
+        # Day directories are named in local time by /upload_audio
+        cutoff = (today or date.today()) - timedelta(days=older_than_days)
+        days = []
+        for entry in self.audio_root.iterdir() if self.audio_root.is_dir() else []:
+            try:
+                day = datetime.strptime(entry.name, "%Y-%m-%d").date()
+            except ValueError:
+                continue  # the archive itself, or anything else that is not a day directory
+            if entry.is_dir() and day < cutoff:
+                days.append(entry)
+        return sorted(days)
+
+    def archive_day(self, day_dir: Path) -> Dict[str, int]:
+        """Archive every WAV of one day directory. Returns that day's counts and byte totals."""
+        results = []
+        for path in sorted(day_dir.glob("*.wav")):
+            try:
+                result = self.archive_file(path)
+            except Exception as e:
+                print(f"Could not archive {path}: {e}")
+                continue
+            if result:
+                results.append(result)
+        if results:
+            self._repoint({r["source"]: r["archived"] for r in results})
+            for r in results:
+                Path(r["source"]).unlink(missing_ok=True)
+        if not any(day_dir.iterdir()):
+            day_dir.rmdir()
+        original = sum(r["original_bytes"] for r in results)
+        archived = sum(r["archived_bytes"] for r in results)
+        return {
+            "files": len(results),
+            "deduplicated": sum(r["deduplicated"] for r in results),
+            "original_bytes": original,
+            "archived_bytes": archived,
+            "saved_bytes": original - archived,
+        }
+
+    def archive_older_than(
+        self, days: int, today: Optional[date] = None
+    ) -> Dict[str, Dict[str, int]]:
+        """
+        Archive every day directory older than `days` days and record the savings.
+
+        Returns:
+            Counts and byte totals per archived day
+        """
+        archived = {}
+        for day_dir in self.aged_days(days, today):
+            totals = self.archive_day(day_dir)
+            if totals["files"]:
+                archived[day_dir.name] = totals
+                print(
+                    f"Archived audio for {day_dir.name}: {totals['files']} files, "
+                    f"{totals['saved_bytes'] / 1e6:.1f} MB saved"
+                )
+        if archived:
+            self._record(archived)
+        return archived
+
+    def _record(self, archived: Dict[str, Dict[str, int]]):
+        with self.sessions() as db:
+            row = db.get(Metadata, ARCHIVE_STATS_KEY)
+            stats = json.loads(row.value) if row else {}
+            for day, totals in archived.items():
+                # A day can be archived in several runs (e.g. after a failure)
+                previous = stats.get(day, {})
+                stats[day] = {
+                    key: previous.get(key, 0) + value for key, value in totals.items()
+                }
+            db.merge(Metadata(key=ARCHIVE_STATS_KEY, value=json.dumps(stats)))
+            db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-day and total archive savings."""
+        with self.sessions() as db:
+            row = db.get(Metadata, ARCHIVE_STATS_KEY)
+            days = json.loads(row.value) if row else {}
+        totals = {}
+        for day in days.values():
+            for key, value in day.items():
+                totals[key] = totals.get(key, 0) + value
+        return {
+            "format": self.audio_format,
+            "days": dict(sorted(days.items())),
+            "total": totals,
+        }
@@ -0,0 +1,133 @@
+"""
+Keyset-paginated reads for browsing sessions and conversations.
+
+Pages are ordered by an indexed (time, id) pair and continue from an opaque
+cursor holding the last row's pair, so fetching page N costs the same as page
+1 (no OFFSET scan) and rows inserted meanwhile do not shift pages. Rows are
+returned as plain dicts of selected columns; relationships are never loaded.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .models import Conversation, Session
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(timestamp: datetime, row_id: int) -> str:
+    raw = json.dumps([timestamp.isoformat(), row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        timestamp, row_id = json.loads(raw)
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except Exception as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor!r}") from e
+
+
+async def session_page(
+    db: AsyncSession,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Sessions, newest first, with their conversation counts.
+
+    Args:
+        db: Async database session
+        limit: Page size
+        cursor: next_cursor of the previous page
+
+    Returns:
+        (rows, next_cursor); next_cursor is None on the last page
+    """
+    conversation_count = (
+        select(func.count(Conversation.id))
+        .where(Conversation.session_id == Session.id)
+        .correlate(Session)
+        .scalar_subquery()
+    )
+    stmt = select(
+        Session.id,
+        Session.start_time,
+        Session.end_time,
+        Session.summary,
+        conversation_count.label("conversation_count"),
+    )
+    if cursor:
+        start_time, session_id = decode_cursor(cursor)
+        stmt = stmt.where(
+            or_(
+                Session.start_time < start_time,
+                and_(Session.start_time == start_time, Session.id < session_id),
+            )
+        )
+    stmt = stmt.order_by(Session.start_time.desc(), Session.id.desc()).limit(limit + 1)
+
+    rows = [dict(row._mapping) for row in (await db.execute(stmt)).all()]
+    return _page(rows, limit, "start_time")
+
+
+async def conversation_page(
+    db: AsyncSession,
+    session_id: int,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    A session's conversations, oldest first.
+
+    Args:
+        db: Async database session
+        session_id: Session to page through
+        limit: Page size
+        cursor: next_cursor of the previous page
+
+    Returns:
+        (rows, next_cursor); next_cursor is None on the last page
+    """
+    stmt = select(
+        Conversation.id,
+        Conversation.session_id,
+        Conversation.timestamp,
+        Conversation.speaker,
+        Conversation.transcript,
+        Conversation.audio_path,
+    ).where(Conversation.session_id == session_id)
+    if cursor:
+        timestamp, conversation_id = decode_cursor(cursor)
+        stmt = stmt.where(
+            or_(
+                Conversation.timestamp > timestamp,
+                and_(
+                    Conversation.timestamp == timestamp,
+                    Conversation.id > conversation_id,
+                ),
+            )
+        )
+    stmt = stmt.order_by(Conversation.timestamp, Conversation.id).limit(limit + 1)
+
+    rows = [dict(row._mapping) for row in (await db.execute(stmt)).all()]
+    return _page(rows, limit, "timestamp")
+
+
+def _page(
+    rows: List[Dict[str, Any]], limit: int, time_column: str
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    # One extra row was fetched to tell whether another page exists
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(last[time_column], last["id"])
@@ -1,25 +1,92 @@
 import os
 from pathlib import Path
-from contextlib import contextmanager
-from sqlalchemy import create_engine
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
 from .models import Base
+from .migrations import migrate
 
 # Default path for SQLite DB, can be overridden by env var
 DEFAULT_DB_PATH = Path("/data/ollie.db")
 DB_URL = os.getenv("DATABASE_URL", f"sqlite:///{DEFAULT_DB_PATH}")
 
-engine = create_engine(DB_URL, connect_args={"check_same_thread": False})
+
+def to_async_url(url: str) -> str:
+    """The async-driver equivalent of a database URL (sqlite -> sqlite+aiosqlite)."""
+    if url.startswith("sqlite:"):
+        return "sqlite+aiosqlite:" + url[len("sqlite:"):]
+    return url
+
+
+# Used by the async request handlers; override for non-SQLite databases (e.g. postgresql+asyncpg://...)
+ASYNC_DB_URL = os.getenv("ASYNC_DATABASE_URL", to_async_url(DB_URL))
+
+# SQLite tuning, applied to every connection. WAL lets readers run alongside
+# the writer; with WAL, synchronous=NORMAL is still safe against corruption
+# and only risks the last commits on power loss.
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+# Page cache per connection (KiB) and memory-mapped I/O size (MiB)
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))
+SQLITE_MMAP_SIZE_MB = int(os.getenv("SQLITE_MMAP_SIZE_MB", "256"))
+# How long a connection waits for a lock before failing with "database is locked"
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
+
+def is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record=None):
+    """Set the production pragmas on a new SQLite connection."""
+    cursor = dbapi_connection.cursor()
+    try:
+        # Persistent in the file, but in-memory databases reject it; harmless to repeat
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+        # Negative cache_size is in KiB rather than pages
+        cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+        cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE_MB * 1024 * 1024}")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+    finally:
+        cursor.close()
+
+
+def create_db_engine(url: str = DB_URL) -> Engine:
+    """Engine for `url`, with the SQLite pragmas applied on connect."""
+    if not is_sqlite(url):
+        return create_engine(url)
+    engine = create_engine(url, connect_args={"check_same_thread": False})
+    event.listen(engine, "connect", apply_sqlite_pragmas)
+    return engine
+
+
+def create_async_db_engine(url: str = ASYNC_DB_URL) -> AsyncEngine:
+    """Async engine for `url`, with the same SQLite pragmas as the sync engine."""
+    async_engine = create_async_engine(url)
+    if is_sqlite(url):
+        event.listen(async_engine.sync_engine, "connect", apply_sqlite_pragmas)
+    return async_engine
+
+
+engine = create_db_engine(DB_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+async_engine = create_async_db_engine(ASYNC_DB_URL)
+# Objects stay usable after commit, so handlers can read generated ids without a refresh
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
 
 def init_db():
-    """Initialize the database schema."""
+    """Initialize the database schema and apply pending migrations."""
     # Ensure directory exists if using SQLite file
     if DB_URL.startswith("sqlite:///"):
         db_path = Path(DB_URL.replace("sqlite:///", ""))
         db_path.parent.mkdir(parents=True, exist_ok=True)
-    
+
     Base.metadata.create_all(bind=engine)
+    migrate(engine)
 
 @contextmanager
 def get_db():
@@ -30,3 +97,8 @@ def get_db():
     finally:
         db.close()
 
+@asynccontextmanager
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """Async counterpart of get_db, for request handlers running on the event loop."""
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,70 @@
+"""
+Schema migrations for existing SQLite databases.
+
+`create_all` only creates missing tables, so changes to existing tables
+(indexes, columns) are applied here. The schema version is stored in SQLite's
+`PRAGMA user_version` and bumped after each migration. Statements must be
+idempotent: a fresh database already gets the current schema from
+`create_all` and then runs every migration, and a migration interrupted before
+its version bump is simply run again.
+"""
+
+from typing import List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+# (version, description, statements), in order
+MIGRATIONS: List[Tuple[int, str, List[str]]] = [
+    (
+        1,
+        "Index conversation and session lookups",
+        [
+            "CREATE INDEX IF NOT EXISTS ix_conversations_session_timestamp ON conversations (session_id, timestamp)",
+            "CREATE INDEX IF NOT EXISTS ix_conversations_timestamp ON conversations (timestamp)",
+            "CREATE INDEX IF NOT EXISTS ix_sessions_start_time ON sessions (start_time)",
+            # Give the query planner statistics for the new indexes
+            "ANALYZE",
+        ],
+    ),
+    (
+        2,
+        "Drop finished ingest queue items (now deleted once indexed)",
+        ["DELETE FROM ingest_queue WHERE status = 'done'"],
+    ),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0] if MIGRATIONS else 0
+
+
+def schema_version(conn: Connection) -> int:
+    return conn.execute(text("PRAGMA user_version")).scalar() or 0
+
+
+def migrate(engine: Engine) -> int:
+    """
+    Apply pending migrations.
+
+    Args:
+        engine: Engine of the database to upgrade
+
+    Returns:
+        The schema version after migrating
+    """
+    if engine.dialect.name != "sqlite":
+        # Only SQLite tracks user_version; other databases get the schema from create_all
+        return LATEST_VERSION
+
+    with engine.connect() as conn:
+        version = schema_version(conn)
+    for target, description, statements in MIGRATIONS:
+        if target <= version:
+            continue
+        print(f"Migrating database to version {target}: {description}...")
+        with engine.begin() as conn:
+            for statement in statements:
+                conn.execute(text(statement))
+            # PRAGMA does not take bound parameters; target is an int from MIGRATIONS
+            conn.execute(text(f"PRAGMA user_version = {int(target)}"))
+        version = target
+    return version
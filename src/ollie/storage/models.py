@@ -1,6 +1,6 @@
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import String, Text, DateTime, ForeignKey, Integer
+from sqlalchemy import String, Text, DateTime, ForeignKey, Index, Integer
 from sqlalchemy.orm import Mapped, mapped_column, relationship, DeclarativeBase
 
 class Base(DeclarativeBase):
@@ -8,6 +8,8 @@ class Base(DeclarativeBase):
 
 class Session(Base):
     __tablename__ = "sessions"
+    # Indexes here must also be added by a migration (see migrations.py) for existing databases
+    __table_args__ = (Index("ix_sessions_start_time", "start_time"),)
 
     id: Mapped[int] = mapped_column(primary_key=True)
     start_time: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
@@ -18,6 +20,12 @@ class Session(Base):
 
 class Conversation(Base):
     __tablename__ = "conversations"
+    __table_args__ = (
+        # Session history in order; also serves lookups by session_id alone
+        Index("ix_conversations_session_timestamp", "session_id", "timestamp"),
+        # Time-range scans (training export)
+        Index("ix_conversations_timestamp", "timestamp"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     session_id: Mapped[int] = mapped_column(ForeignKey("sessions.id"))
@@ -35,3 +43,21 @@ class Metadata(Base):
     key: Mapped[str] = mapped_column(String(50), primary_key=True)
     value: Mapped[str] = mapped_column(Text)
 
+class IngestItem(Base):
+    """A transcript accepted for ingestion, waiting to be stored and indexed (see ollie.core.ingest)."""
+    __tablename__ = "ingest_queue"
+    __table_args__ = (Index("ix_ingest_queue_status_next_attempt", "status", "next_attempt"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    created: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    session_id: Mapped[int] = mapped_column(ForeignKey("sessions.id"))
+    timestamp: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)  # When it was said
+    speaker: Mapped[str] = mapped_column(String(50))
+    transcript: Mapped[str] = mapped_column(Text)
+    audio_path: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    source: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
+    status: Mapped[str] = mapped_column(String(20), default="pending")  # pending, stored, failed (deleted once done)
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    next_attempt: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    conversation_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
@@ -1,64 +1,171 @@
+"""
+Incremental export of conversations as chat-format JSONL for fine-tuning.
+
+Each run exports exactly the conversations not yet trained on. The high-water
+mark is the largest trained-on conversation id, kept in the metadata table: ids
+only grow, so unlike a fixed time window a missed run loses nothing and a rerun
+repeats nothing, and transcripts stored late by the ingest queue (with an
+earlier timestamp) are still picked up. Exporting does not move the mark; the
+trainer commits it (commit_watermark) once a run on the export has succeeded,
+so the rows of a failed run are exported again by the next one.
+
+Rows are read in keyset-paginated pages in (session, time) order, each page
+streamed with yield_per in its own short read transaction, and a session's
+dialogue is written as soon as its last turn has been read, so memory stays
+constant however large the backlog is.
+"""
+import itertools
 import json
 import os
-from datetime import datetime, timedelta
-from sqlalchemy import create_engine, select
+from datetime import datetime
+from operator import attrgetter
+from typing import Any, Dict, Iterable, Iterator
+
+from sqlalchemy import func, select, tuple_
 from sqlalchemy.orm import sessionmaker
-from ollie.storage.models import Conversation
-from ollie.storage.database import DB_URL
-
-def export_daily_conversations(output_file: str = "/data/training/daily_data.jsonl"):
-    """Export conversations from the last 24 hours to JSONL."""
-    
-    engine = create_engine(DB_URL)
-    Session = sessionmaker(bind=engine)
-    session = Session()
-    
-    # Filter for last 24 hours
-    since = datetime.utcnow() - timedelta(days=1)
-    
-    # Get conversations
-    # We want pairs of User -> Ollie
-    # This is tricky if they are just a stream. 
-    # We'll look for sessions and reconstruct the dialogue.
-    
-    stm = select(Conversation).where(Conversation.timestamp >= since).order_by(Conversation.timestamp)
-    conversations = session.scalars(stm).all()
-    
-    # Group by session
-    sessions = {}
-    for c in conversations:
-        if c.session_id not in sessions:
-            sessions[c.session_id] = []
-        sessions[c.session_id].append(c)
-        
-    training_data = []
-    
-    for session_id, chats in sessions.items():
-        # Create instruction/input/output format or ChatML
-        # Let's assume standard chat format: [{"role": "user", ...}, {"role": "assistant", ...}]
-        
-        # We iterate and pair them up
-        history = []
-        for i in range(len(chats)):
-            msg = chats[i]
-            role = "user" if msg.speaker == "User" else "assistant"
-            
-            # If we have a user message followed by an assistant message, that's a training pair
-            # But generally for chat fine-tuning we feed the whole history
-            
-            history.append({"role": role, "content": msg.transcript})
-            
-        if history:
-            training_data.append({"messages": history})
-            
-    # Ensure dir exists
-    os.makedirs(os.path.dirname(output_file), exist_ok=True)
-    
-    with open(output_file, "w") as f:
-        for entry in training_data:
-            f.write(json.dumps(entry) + "\n")
-            
-    print(f"Exported {len(training_data)} sessions to {output_file}")
+
+from ollie.storage.database import SessionLocal
+from ollie.storage.models import Conversation, Metadata
+
+EXPORT_WATERMARK_KEY = "training_export_watermark"
+DEFAULT_OUTPUT_FILE = "/data/training/daily_data.jsonl"
+# Rows per keyset page (one read transaction each) and per fetch within a page
+PAGE_SIZE = 5000
+YIELD_PER = 500
+
+
+def load_watermark(sessions: sessionmaker = SessionLocal) -> Dict[str, Any]:
+    """The last trained-on export: {"conversation_id", "exported_at"} (id 0 before the first)."""
+    with sessions() as db:
+        row = db.get(Metadata, EXPORT_WATERMARK_KEY)
+        return json.loads(row.value) if row else {"conversation_id": 0, "exported_at": None}
+
+
+def iter_new_conversations(
+    after_id: int,
+    up_to_id: int,
+    sessions: sessionmaker = SessionLocal,
+    page_size: int = PAGE_SIZE,
+) -> Iterator[Any]:
+    """
+    Conversations with after_id < id <= up_to_id, ordered by session, then time.
+
+    Args:
+        after_id: Watermark of the previous export
+        up_to_id: Largest id to include (fixed at the start, so the export is a consistent range)
+        sessions: Session factory
+        page_size: Rows per keyset page
+
+    Yields:
+        Rows of (id, session_id, timestamp, speaker, transcript)
+    """
+    with sessions() as db:
+        first_session = db.scalar(
+            select(func.min(Conversation.session_id))
+            .where(Conversation.id > after_id, Conversation.id <= up_to_id)
+        )
+    if first_session is None:
+        return
+
+    key = tuple_(Conversation.session_id, Conversation.timestamp, Conversation.id)
+    last = None
+    while True:
+        # Read in index order from ix_conversations_session_timestamp (SQLite appends the
+        # rowid to every index). Given a plain id range the planner prefers the primary key
+        # and sorts the whole backlog for every page, so the range is written as `id + 0`,
+        # which no index serves. SQLite seeks on the session_id bound rather than the
+        # row-value comparison, so that bound moves up with the keyset.
+        stmt = select(
+            Conversation.id,
+            Conversation.session_id,
+            Conversation.timestamp,
+            Conversation.speaker,
+            Conversation.transcript,
+        ).where(
+            Conversation.session_id >= (last[0] if last else first_session),
+            (Conversation.id + 0) > after_id,
+            (Conversation.id + 0) <= up_to_id,
+        )
+        if last is not None:
+            stmt = stmt.where(key > tuple_(*last))
+        stmt = stmt.order_by(Conversation.session_id, Conversation.timestamp, Conversation.id).limit(page_size)
+
+        count = 0
+        with sessions() as db:
+            for row in db.execute(stmt.execution_options(yield_per=YIELD_PER)):
+                count += 1
+                last = (row.session_id, row.timestamp, row.id)
+                yield row
+        if count < page_size:
+            return
+
+
+def iter_dialogues(rows: Iterable[Any]) -> Iterator[Dict[str, Any]]:
+    """Group rows (ordered by session) into {"messages": [...]} chat records, one per session."""
+    for _, turns in itertools.groupby(rows, key=attrgetter("session_id")):
+        yield {
+            "messages": [
+                {"role": "user" if turn.speaker == "User" else "assistant", "content": turn.transcript}
+                for turn in turns
+            ]
+        }
+
+
+def export_new_conversations(
+    output_file: str = DEFAULT_OUTPUT_FILE,
+    sessions: sessionmaker = SessionLocal,
+    page_size: int = PAGE_SIZE,
+) -> Dict[str, Any]:
+    """
+    Export the conversations added since the watermark to JSONL.
+
+    The file is replaced atomically. The watermark is left alone; pass the
+    returned "to_id" to commit_watermark once the export has been used.
+
+    Args:
+        output_file: JSONL file to (over)write; empty when there is nothing new
+        sessions: Session factory
+        page_size: Rows per keyset page
+
+    Returns:
+        Counts and the watermark range of this export
+    """
+    after_id = load_watermark(sessions)["conversation_id"]
+    with sessions() as db:
+        # Never move the watermark back (e.g. after the newest rows were deleted)
+        up_to_id = max(after_id, db.scalar(select(func.max(Conversation.id))) or 0)
+
+    os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+    tmp_file = f"{output_file}.tmp"
+    stats = {"conversations": 0, "sessions": 0, "from_id": after_id, "to_id": up_to_id}
+    with open(tmp_file, "w") as f:
+        for dialogue in iter_dialogues(iter_new_conversations(after_id, up_to_id, sessions, page_size)):
+            f.write(json.dumps(dialogue) + "\n")
+            stats["sessions"] += 1
+            stats["conversations"] += len(dialogue["messages"])
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, output_file)
+
+    print(
+        f"Exported {stats['conversations']} conversations in {stats['sessions']} sessions to {output_file} "
+        f"(conversation ids {after_id + 1}..{up_to_id})"
+    )
+    return stats
+
+
+def commit_watermark(conversation_id: int, sessions: sessionmaker = SessionLocal):
+    """Mark conversations up to conversation_id as trained on, so later exports skip them."""
+    with sessions() as db:
+        row = db.get(Metadata, EXPORT_WATERMARK_KEY)
+        if row and json.loads(row.value)["conversation_id"] >= conversation_id:
+            return
+        db.merge(Metadata(
+            key=EXPORT_WATERMARK_KEY,
+            value=json.dumps({"conversation_id": conversation_id, "exported_at": datetime.utcnow().isoformat()})
+        ))
+        db.commit()
+
 
 if __name__ == "__main__":
-    export_daily_conversations()
+    export_new_conversations()
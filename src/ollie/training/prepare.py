@@ -0,0 +1,240 @@
+"""
+Dataset preparation for supervised fine-tuning.
+
+Turns exported {"messages": [...]} dialogues into fixed-length token sequences
+for causal LM training:
+
+1. dialogues without an assistant reply, or with less than `min_chars` of
+   text, are dropped
+2. exact duplicates (same normalized text) and near-duplicates (SimHash within
+   `max_distance` bits, see ollie.utils.simhash) are dropped, keeping the first
+3. each dialogue is rendered with the tokenizer's chat template and tokenized
+4. the token streams, each ending in EOS, are packed back to back into
+   `seq_len` blocks, so training steps are not spent on padding; only the
+   last block is padded
+
+The packed dataset is cached with datasets' save_to_disk under a key of the
+input file, the tokenizer and every setting, so retrying a failed training run
+skips this stage.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List
+
+from ollie.utils.simhash import SimHashIndex, simhash
+
+# Label value the loss ignores (padding of the last packed block)
+IGNORE_INDEX = -100
+# Used when the tokenizer has no chat template of its own (ChatML)
+DEFAULT_CHAT_TEMPLATE = (
+    "{% for message in messages %}"
+    "{{ '<|im_start|>' + message['role'] + '\\n' + message['content'] + '<|im_end|>\\n' }}"
+    "{% endfor %}"
+)
+_WORD_RE = re.compile(r"\w+")
+
+
+def load_dialogues(path: str) -> Iterator[List[Dict[str, str]]]:
+    """The message lists of an exported JSONL file, one per line."""
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)["messages"]
+
+
+def filter_dialogues(
+    dialogues: Iterable[List[Dict[str, str]]],
+    stats: Counter,
+    min_chars: int = 32,
+    max_distance: int = 3,
+) -> Iterator[List[Dict[str, str]]]:
+    """
+    Drop trivially short dialogues and exact or near-duplicates.
+
+    Args:
+        dialogues: Message lists
+        stats: Counter the reasons for dropping (and the kept count) are added to
+        min_chars: Minimum characters of message text
+        max_distance: Largest SimHash distance treated as a near-duplicate (-1 disables)
+
+    Yields:
+        The kept message lists, with empty messages removed
+    """
+    seen = set()
+    index = SimHashIndex(max_distance) if max_distance >= 0 else None
+    for i, messages in enumerate(dialogues):
+        stats["dialogues"] += 1
+        messages = [m for m in messages if m.get("content", "").strip()]
+        text = "\n".join(m["content"] for m in messages)
+        if len(text) < min_chars or not any(m["role"] == "assistant" for m in messages):
+            stats["short"] += 1
+            continue
+        digest = hashlib.sha1(
+            " ".join(_WORD_RE.findall(text.lower())).encode()
+        ).digest()
+        if digest in seen:
+            stats["exact_duplicates"] += 1
+            continue
+        seen.add(digest)
+        if index is not None:
+            fingerprint = simhash(text)
+            if index.find(fingerprint):
+                stats["near_duplicates"] += 1
+                continue
+            index.add(str(i), fingerprint, len(text))
+        stats["kept"] += 1
+        yield messages
+
+
+def tokenize_dialogue(tokenizer, messages: List[Dict[str, str]]) -> List[int]:
+    """Render a dialogue with the chat template and tokenize it, ending in EOS."""
+    text = tokenizer.apply_chat_template(messages, tokenize=False)
+    ids = list(tokenizer(text, add_special_tokens=False)["input_ids"])
+    # EOS marks where one dialogue ends within a packed block
+    if tokenizer.eos_token_id is not None and (
+        not ids or ids[-1] != tokenizer.eos_token_id
+    ):
+        ids.append(tokenizer.eos_token_id)
+    return ids
+
+
+def pack(
+    token_streams: Iterable[List[int]], seq_len: int, pad_token_id: int
+) -> Iterator[Dict[str, List[int]]]:
+    """
+    Concatenate token streams and cut them into seq_len blocks.
+
+    Yields:
+        {"input_ids", "attention_mask", "labels"} per block; only the last is padded
+    """
+    buffer: List[int] = []
+    for ids in token_streams:
+        buffer.extend(ids)
+        start = 0
+        while len(buffer) - start >= seq_len:
+            block = buffer[start : start + seq_len]
+            start += seq_len
+            yield {
+                "input_ids": block,
+                "attention_mask": [1] * seq_len,
+                "labels": list(block),
+            }
+        del buffer[:start]
+    if buffer:
+        padding = seq_len - len(buffer)
+        yield {
+            "input_ids": buffer + [pad_token_id] * padding,
+            "attention_mask": [1] * len(buffer) + [0] * padding,
+            "labels": buffer + [IGNORE_INDEX] * padding,
+        }
+
+
+def cache_key(data_file: str, tokenizer, **settings) -> str:
+    """Hash of the input file, the tokenizer (vocabulary and chat template) and the settings."""
+    digest = hashlib.sha256()
+    with open(data_file, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    digest.update(
+        json.dumps(
+            {
+                "tokenizer": getattr(
+                    tokenizer, "name_or_path", type(tokenizer).__name__
+                ),
+                "vocab_size": len(tokenizer),
+                "chat_template": tokenizer.chat_template,
+                **settings,
+            },
+            sort_keys=True,
+        ).encode()
+    )
+    return digest.hexdigest()[:32]
+
+
+def prepare_dataset(
+    data_file: str,
+    tokenizer,
+    cache_dir: str,
+    seq_len: int = 1024,
+    min_chars: int = 32,
+    max_distance: int = 3,
+):
+    """
+    Build (or load from cache) the packed training dataset for an exported JSONL file.
+
+    Args:
+        data_file: Exported dialogues (see ollie.training.export)
+        tokenizer: Hugging Face tokenizer of the model being trained
+        cache_dir: Directory the prepared datasets are cached in
+        seq_len: Tokens per packed sequence
+        min_chars: Dialogues with less message text are dropped
+        max_distance: Largest SimHash distance treated as a near-duplicate (-1 disables)
+
+    Returns:
+        A datasets.Dataset with input_ids, attention_mask and labels columns
+    """
+    # Imported here so the filtering and packing helpers work without datasets installed
+    from datasets import Dataset, load_from_disk
+
+    if not tokenizer.chat_template:
+        print("Tokenizer has no chat template; using ChatML.")
+        tokenizer.chat_template = DEFAULT_CHAT_TEMPLATE
+    path = os.path.join(
+        cache_dir,
+        cache_key(
+            data_file,
+            tokenizer,
+            seq_len=seq_len,
+            min_chars=min_chars,
+            max_distance=max_distance,
+        ),
+    )
+    stats_file = os.path.join(path, "prepare_stats.json")
+    if os.path.exists(stats_file):
+        with open(stats_file) as f:
+            print(f"Using cached dataset {path}: {json.load(f)}")
+        return load_from_disk(path)
+
+    stats = Counter()
+    token_streams = (
+        tokenize_dialogue(tokenizer, messages)
+        for messages in filter_dialogues(
+            load_dialogues(data_file), stats, min_chars, max_distance
+        )
+    )
+
+    def counted(streams):
+        for ids in streams:
+            stats["tokens"] += len(ids)
+            yield ids
+
+    pad_token_id = (
+        tokenizer.pad_token_id
+        if tokenizer.pad_token_id is not None
+        else tokenizer.eos_token_id
+    )
+    dataset = Dataset.from_list(
+        list(pack(counted(token_streams), seq_len, pad_token_id))
+    )
+    stats["sequences"] = len(dataset)
+    stats["padding_tokens"] = len(dataset) * seq_len - stats["tokens"]
+
+    # Written under a temporary name and renamed, so a partial cache is never loaded
+    tmp_path = f"{path}.tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    dataset.save_to_disk(tmp_path)
+    with open(os.path.join(tmp_path, "prepare_stats.json"), "w") as f:
+        json.dump(stats, f)
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp_path, path)
+    # Earlier exports are not trained on again, so only the newest entry is worth keeping
+    for entry in os.listdir(cache_dir):
+        if entry != os.path.basename(path):
+            shutil.rmtree(os.path.join(cache_dir, entry), ignore_errors=True)
+    print(f"Prepared dataset {path}: {dict(stats)}")
+    return load_from_disk(path)
@@ -0,0 +1,78 @@
+"""
+Training throughput reporting.
+
+`CountingCollator` wraps the trainer's data collator and counts the tokens it
+hands out: real ones (attention_mask) and padded ones. `TokenThroughputCallback`
+turns the counts into tokens per second at every logging step and for the whole
+run, so packed and unpacked training can be compared on useful tokens rather
+than steps.
+"""
+
+import time
+
+from transformers import TrainerCallback
+
+
+class CountingCollator:
+    def __init__(self, collator):
+        """
+        Args:
+            collator: Data collator producing batches with input_ids and attention_mask tensors
+        """
+        self.collator = collator
+        self.tokens = 0
+        self.total_tokens = 0
+
+    def __call__(self, features):
+        batch = self.collator(features)
+        self.tokens += int(batch["attention_mask"].sum())
+        self.total_tokens += batch["input_ids"].numel()
+        return batch
+
+
+class TokenThroughputCallback(TrainerCallback):
+    def __init__(self, counter: CountingCollator):
+        self.counter = counter
+        self.summary = {}
+
+    def _mark(self):
+        return time.perf_counter(), self.counter.tokens, self.counter.total_tokens
+
+    def on_train_begin(self, args, state, control, **kwargs):
+        self._start = self._last = self._mark()
+
+    def on_log(self, args, state, control, logs=None, **kwargs):
+        now, tokens, total = self._mark()
+        then, tokens_before, total_before = self._last
+        self._last = (now, tokens, total)
+        if now > then and total > total_before:
+            rate = (tokens - tokens_before) / (now - then)
+            padding = 1 - (tokens - tokens_before) / (total - total_before)
+            if state.log_history:
+                state.log_history[-1].update(
+                    tokens_per_second=round(rate, 1), padding_fraction=round(padding, 3)
+                )
+            print(
+                f"step {state.global_step}: {rate:.1f} tokens/s, {padding:.1%} padding"
+            )
+
+    def on_train_end(self, args, state, control, **kwargs):
+        now, tokens, total = self._mark()
+        then, tokens_before, total_before = self._start
+        seconds = now - then
+        self.summary = {
+            "tokens": tokens - tokens_before,
+            "seconds": round(seconds, 1),
+            "tokens_per_second": (
+                round((tokens - tokens_before) / seconds, 1) if seconds else 0.0
+            ),
+            "padding_fraction": (
+                round(1 - (tokens - tokens_before) / (total - total_before), 3)
+                if total > total_before
+                else 0.0
+            ),
+        }
+        print(
+            f"Trained on {self.summary['tokens']} tokens in {self.summary['seconds']}s: "
+            f"{self.summary['tokens_per_second']} tokens/s, {self.summary['padding_fraction']:.1%} padding"
+        )
@@ -1,11 +1,11 @@
 import os
 import sys
 import torch
-from transformers import AutoModelForCausalLM, AutoTokenizer
+from transformers import AutoModelForCausalLM, AutoTokenizer, Trainer, TrainingArguments, default_data_collator
 from peft import LoraConfig, get_peft_model, TaskType
-from datasets import load_dataset
-from trl import SFTTrainer, SFTConfig
-from ollie.training.export import export_daily_conversations
+from ollie.training.export import commit_watermark, export_new_conversations
+from ollie.training.prepare import prepare_dataset
+from ollie.training.throughput import CountingCollator, TokenThroughputCallback
 import subprocess
 
 # Configuration
@@ -13,14 +13,19 @@ DATA_DIR = os.getenv("DATA_DIR", "/data")
 BASE_MODEL_PATH = os.getenv("BASE_MODEL_PATH", f"{DATA_DIR}/models/Llama-3.1-8B")
 OUTPUT_DIR = f"{DATA_DIR}/models/adapters"
 DAILY_DATA_FILE = f"{DATA_DIR}/training/daily_data.jsonl"
+DATASET_CACHE_DIR = f"{DATA_DIR}/training/cache"
+# Tokens per packed training sequence, and dataset filtering (see ollie.training.prepare)
+TRAIN_SEQ_LEN = int(os.getenv("TRAIN_SEQ_LEN", "1024"))
+TRAIN_MIN_CHARS = int(os.getenv("TRAIN_MIN_CHARS", "32"))
+TRAIN_DEDUP_MAX_DISTANCE = int(os.getenv("TRAIN_DEDUP_MAX_DISTANCE", "3"))
 
 def train():
     print("Starting training pipeline...")
     
-    # 1. Export Data
-    export_daily_conversations(DAILY_DATA_FILE)
+    # 1. Export Data (conversations not trained on yet, including those of failed runs)
+    export = export_new_conversations(DAILY_DATA_FILE)
     
-    if not os.path.exists(DAILY_DATA_FILE) or os.path.getsize(DAILY_DATA_FILE) == 0:
+    if export["conversations"] == 0:
         print("No new data found. Skipping training.")
         return
 
@@ -57,11 +62,23 @@ def train():
         model = get_peft_model(model, peft_config)
         model.print_trainable_parameters()
         
-        # Load Data
-        dataset = load_dataset("json", data_files=DAILY_DATA_FILE, split="train")
+        # Deduplicate, apply the chat template and pack into fixed-length sequences (cached)
+        dataset = prepare_dataset(
+            DAILY_DATA_FILE,
+            tokenizer,
+            DATASET_CACHE_DIR,
+            seq_len=TRAIN_SEQ_LEN,
+            min_chars=TRAIN_MIN_CHARS,
+            max_distance=TRAIN_DEDUP_MAX_DISTANCE
+        )
+        if len(dataset) == 0:
+            print("No training sequences left after filtering. Skipping training.")
+            # Nothing in this export is worth training on; do not export it again
+            commit_watermark(export["to_id"])
+            return
         
         # Training Args
-        training_args = SFTConfig(
+        training_args = TrainingArguments(
             output_dir=f"{OUTPUT_DIR}/checkpoints",
             num_train_epochs=1,
             per_device_train_batch_size=1,
@@ -72,12 +89,14 @@ def train():
             use_cpu=True # Force CPU
         )
         
-        trainer = SFTTrainer(
+        # The dataset is already tokenized and packed, so a plain Trainer suffices
+        collator = CountingCollator(default_data_collator)
+        trainer = Trainer(
             model=model,
             args=training_args,
             train_dataset=dataset,
-            dataset_text_field="messages", # Needs formatting function usually
-            peft_config=peft_config,
+            data_collator=collator,
+            callbacks=[TokenThroughputCallback(collator)],
         )
         
         print("Training...")
@@ -87,15 +106,16 @@ def train():
         adapter_path = f"{OUTPUT_DIR}/latest"
         trainer.save_model(adapter_path)
         print(f"Adapter saved to {adapter_path}")
+        # Only now are the exported conversations trained on
+        commit_watermark(export["to_id"])
         
         # Convert to GGUF
         convert_to_gguf(adapter_path)
         
     except Exception as e:
+        # The watermark was not committed, so the next run retrains on this export
         print(f"Training failed: {e}")
-        # Do not exit 1 to avoid CronJob backoff loop if it's just OOM
-        # But maybe we want to know?
-        # sys.exit(1)
+        sys.exit(1)
 
 def convert_to_gguf(adapter_path):
     print("Converting adapter to GGUF...")
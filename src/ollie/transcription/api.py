@@ -1,8 +1,10 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, UploadFile, File, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
+from typing import BinaryIO, Optional, Union
+from ollie.utils.uploads import spool
 from .whisper_service import WhisperService
 from .streaming import StreamingTranscriptionService
-import shutil
 import os
 
 app = FastAPI()
@@ -13,51 +15,49 @@ class TranscribeRequest(BaseModel):
     path: str
     language: str = None
 
+def transcribe_to_dict(audio_source: Union[str, BinaryIO], language: Optional[str] = None) -> dict:
+    """Run a transcription to completion (segments are generated lazily by faster-whisper)."""
+    segments, info = service.transcribe(audio_source, language=language)
+    result = [
+        {"start": segment.start, "end": segment.end, "text": segment.text}
+        for segment in segments
+    ]
+    return {"segments": result, "language": info.language}
+
 @app.post("/transcribe")
-async def transcribe(file: UploadFile = File(...)):
-    temp_file = f"/tmp/{file.filename}"
-    with open(temp_file, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-        
+async def transcribe(file: UploadFile = File(...), language: Optional[str] = None):
+    """Transcribe a multipart upload, decoding straight from the spooled upload (no temp file of our own)."""
+    return await run_in_threadpool(transcribe_to_dict, file.file, language)
+
+@app.post("/transcribe_stream")
+async def transcribe_stream(request: Request, language: Optional[str] = None):
+    """
+    Transcribe audio sent as the raw request body.
+
+    Core streams recordings here instead of sharing a filesystem path with this
+    pod. The body is spooled as it arrives (in memory for short clips, on disk
+    beyond) and decoded from that buffer.
+    """
+    buffer = await spool(request.stream())
     try:
-        segments, info = service.transcribe(temp_file)
+        return await run_in_threadpool(transcribe_to_dict, buffer, language)
     finally:
-        if os.path.exists(temp_file):
-            os.remove(temp_file)
-    
-    # Collect segments
-    result = []
-    for segment in segments:
-        result.append({
-            "start": segment.start,
-            "end": segment.end,
-            "text": segment.text
-        })
-        
-    return {"segments": result, "language": info.language}
+        buffer.close()
 
 @app.post("/transcribe_path")
 async def transcribe_path(req: TranscribeRequest):
     if not os.path.exists(req.path):
         raise HTTPException(status_code=404, detail="File not found")
-        
-    segments, info = service.transcribe(req.path, language=req.language)
-    
-    result = []
-    for segment in segments:
-        result.append({
-            "start": segment.start,
-            "end": segment.end,
-            "text": segment.text
-        })
-        
-    return {"segments": result, "language": info.language}
+    return await run_in_threadpool(transcribe_to_dict, req.path, req.language)
 
 @app.websocket("/ws/transcribe")
 async def websocket_transcribe(websocket: WebSocket):
     """
     WebSocket endpoint for real-time streaming transcription with rolling window.
-    Receives audio chunks and sends transcription updates.
+    Receives audio chunks and sends transcription updates. Sending the text
+    message "end" requests the final transcription before the socket closes.
+    Voice turns connect with ?utterance=1 so partials and the final transcript
+    cover the whole utterance rather than the rolling window.
     """
     await websocket.accept()
     session_id = None
@@ -66,14 +66,27 @@ async def websocket_transcribe(websocket: WebSocket):
         # Initialize streaming session - first message should be session ID
         session_id = await websocket.receive_text()
         print(f"WebSocket session started: {session_id}")
-        await streaming_service.start_session(session_id, websocket)
+        await streaming_service.start_session(
+            session_id, websocket, utterance=websocket.query_params.get("utterance") == "1"
+        )
         
         # Keep connection alive and process audio chunks
         chunk_count = 0
         while True:
             try:
-                # Receive audio chunk (binary data)
-                data = await websocket.receive_bytes()
+                # Receive audio chunk (binary data), or "end" once the speaker is done
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    print(f"WebSocket disconnected for session {session_id}")
+                    break
+                if message.get("text") == "end":
+                    # Sends the final transcription over the still-open socket
+                    await streaming_service.end_session(session_id)
+                    session_id = None
+                    break
+                data = message.get("bytes")
+                if data is None:
+                    continue
                 chunk_count += 1
                 
                 if chunk_count % 100 == 0:  # Log every 100 chunks
@@ -4,6 +4,7 @@ Processes audio chunks in real-time and provides incremental transcriptions.
 """
 import asyncio
 import io
+import os
 import numpy as np
 from typing import Dict, Optional
 from fastapi import WebSocket
@@ -11,17 +12,23 @@ from faster_whisper import WhisperModel
 import wave
 from collections import deque
 
+# Longest utterance a voice-turn session keeps for its final transcription; older audio is dropped
+MAX_UTTERANCE_SECONDS = float(os.getenv("WHISPER_MAX_UTTERANCE_SECONDS", "30"))
+
 
 class StreamingTranscriptionService:
     """
     Handles real-time streaming transcription with a rolling window approach.
     
     Maintains a buffer of recent audio and continuously transcribes it,
-    sending incremental updates to the client.
+    sending incremental updates to the client. Utterance sessions (voice turns,
+    which end with "end") instead keep the whole utterance, up to
+    MAX_UTTERANCE_SECONDS, and transcribe all of it for partials and the final.
     """
     
     def __init__(self, model_size: str = "small", device: str = "cpu", compute_type: str = "int8",
-                 window_size_seconds: float = 5.0, overlap_seconds: float = 1.0, sample_rate: int = 16000):
+                 window_size_seconds: float = 5.0, overlap_seconds: float = 1.0, sample_rate: int = 16000,
+                 max_utterance_seconds: float = MAX_UTTERANCE_SECONDS):
         """
         Initialize the streaming transcription service.
         
@@ -32,15 +39,24 @@ class StreamingTranscriptionService:
             window_size_seconds: Size of the rolling window in seconds
             overlap_seconds: Overlap between windows to avoid cutting words
             sample_rate: Audio sample rate (Whisper expects 16kHz)
+            max_utterance_seconds: Most audio an utterance session keeps
         """
         self.model = WhisperModel(model_size, device=device, compute_type=compute_type)
         self.window_size_samples = int(window_size_seconds * sample_rate)
         self.overlap_samples = int(overlap_seconds * sample_rate)
         self.sample_rate = sample_rate
+        self.max_utterance_samples = int(max_utterance_seconds * sample_rate)
         self.sessions: Dict[str, 'StreamingSession'] = {}
         
-    async def start_session(self, session_id: str, websocket: WebSocket):
-        """Start a new streaming transcription session."""
+    async def start_session(self, session_id: str, websocket: WebSocket, utterance: bool = False):
+        """
+        Start a new streaming transcription session.
+
+        Args:
+            session_id: Client-chosen session identifier
+            websocket: Socket the transcription events are sent on
+            utterance: Keep the whole utterance (voice turns) instead of only the rolling window
+        """
         if session_id in self.sessions:
             await self.end_session(session_id)
             
@@ -50,7 +66,8 @@ class StreamingTranscriptionService:
             window_size_samples=self.window_size_samples,
             overlap_samples=self.overlap_samples,
             sample_rate=self.sample_rate,
-            model=self.model
+            model=self.model,
+            max_utterance_samples=self.max_utterance_samples if utterance else None
         )
         await websocket.send_json({
             "type": "session_started",
@@ -77,7 +94,7 @@ class StreamingSession:
     """Manages a single streaming transcription session."""
     
     def __init__(self, session_id: str, websocket: WebSocket, window_size_samples: int,
-                 overlap_samples: int, sample_rate: int, model: WhisperModel):
+                 overlap_samples: int, sample_rate: int, model: WhisperModel, max_utterance_samples: Optional[int] = None):
         self.session_id = session_id
         self.websocket = websocket
         self.window_size_samples = window_size_samples
@@ -87,6 +104,9 @@ class StreamingSession:
         
         # Audio buffer (rolling window)
         self.audio_buffer = deque(maxlen=window_size_samples + overlap_samples)
+        # Utterance sessions only: the latest max_utterance_samples as PCM16 (32 KB per second)
+        self.max_utterance_samples = max_utterance_samples
+        self.utterance = bytearray() if max_utterance_samples is not None else None
         
         # Track last transcription to avoid duplicates
         self.last_transcription = ""
@@ -108,6 +128,11 @@ class StreamingSession:
             
             # Add to buffer
             self.audio_buffer.extend(audio_samples)
+            if self.utterance is not None:
+                self.utterance.extend(audio_data)
+                overflow = len(self.utterance) - 2 * self.max_utterance_samples
+                if overflow > 0:
+                    del self.utterance[:overflow]
             
             # If we have enough samples for a window, trigger transcription
             if len(self.audio_buffer) >= self.window_size_samples and not self.processing:
@@ -120,11 +145,19 @@ class StreamingSession:
             import traceback
             traceback.print_exc()
             
+    def _utterance_samples(self) -> np.ndarray:
+        """The kept utterance as float samples."""
+        return np.frombuffer(bytes(self.utterance), dtype=np.int16).astype(np.float32) / 32768.0
+
     async def _transcribe_window(self):
-        """Transcribe the current audio window."""
+        """Transcribe the current audio window (the whole utterance for utterance sessions)."""
         try:
-            # Get the current window (last window_size_samples)
-            window_samples = np.array(list(self.audio_buffer)[-self.window_size_samples:])
+            if self.utterance is not None:
+                # Partials cover the same audio as the final, so they are prefixes of it
+                window_samples = self._utterance_samples()
+            else:
+                # Get the current window (last window_size_samples)
+                window_samples = np.array(list(self.audio_buffer)[-self.window_size_samples:])
             
             # Transcribe using Whisper
             # Run in executor to avoid blocking
@@ -210,7 +243,7 @@ class StreamingSession:
         return segments_list, info
         
     async def finalize(self):
-        """Finalize the session and send final transcription."""
+        """Finalize the session and send the final transcription (of the whole utterance, if kept)."""
         if self.processing_task:
             self.processing_task.cancel()
             try:
@@ -223,12 +256,15 @@ class StreamingSession:
             try:
                 # Check if websocket is still open
                 if self.websocket.client_state.name != "DISCONNECTED":
-                    window_samples = np.array(list(self.audio_buffer))
+                    if self.utterance is not None:
+                        final_samples = self._utterance_samples()
+                    else:
+                        final_samples = np.array(list(self.audio_buffer))
                     loop = asyncio.get_event_loop()
                     segments, info = await loop.run_in_executor(
                         None,
                         self._transcribe_sync,
-                        window_samples
+                        final_samples
                     )
                     
                     final_transcript = " ".join([seg.text for seg in segments]).strip()
@@ -1,21 +1,232 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, File, Form, HTTPException, Response, UploadFile
+from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel
-from .voice_service import TTSService
+from contextlib import asynccontextmanager
+from collections import deque
+from typing import List
+import asyncio
+import json
+import time
+from .audio import pcm_frames, streaming_wav_header, to_pcm16, wav_bytes
+from .cache import AudioCache
+from .jobs import DONE, BatchJobs
+from .speakers import SpeakerStore
+from .workers import SynthesisPool
+from ollie.utils.concurrency import BACKGROUND, INTERACTIVE
+from ollie.utils.metrics import metrics
+from ollie.utils.text import split_sentences
 import os
 
-app = FastAPI()
-# Initialize with CPU for now to be safe, or env var
-service = TTSService(device="cpu")
+DATA_DIR = os.getenv("DATA_DIR", "/data")
+TTS_MODEL = os.getenv("TTS_MODEL", "tts_models/multilingual/multi-dataset/xtts_v2")
+TTS_DEVICE = os.getenv("TTS_DEVICE", "cpu")
+# Worker processes, each holding its own copy of the model (~2GB for XTTS)
+TTS_WORKERS = int(os.getenv("TTS_WORKERS", "1"))
+# Synthesized audio, keyed by text, language, speaker and model; survives restarts
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", f"{DATA_DIR}/tts_cache")
+TTS_CACHE_MAX_MB = int(os.getenv("TTS_CACHE_MAX_MB", "512"))
+# Registered voices and cached speaker conditioning latents
+TTS_VOICES_DIR = os.getenv("TTS_VOICES_DIR", f"{DATA_DIR}/voices")
+# Largest number of texts accepted in one batch
+TTS_BATCH_MAX_ITEMS = int(os.getenv("TTS_BATCH_MAX_ITEMS", "500"))
+
+speakers = SpeakerStore(TTS_VOICES_DIR)
+# The model is not thread-safe and saturates a core on its own: inference runs
+# in worker processes so the event loop stays responsive and cores are used
+pool = SynthesisPool(TTS_WORKERS, TTS_MODEL, TTS_DEVICE, TTS_VOICES_DIR)
+cache = AudioCache(TTS_CACHE_DIR, max_bytes=TTS_CACHE_MAX_MB * 1024 * 1024)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await pool.start()
+    yield
+    pool.shutdown()
+
+app = FastAPI(lifespan=lifespan)
 
 class TTSRequest(BaseModel):
     text: str
     language: str = "en"
     speaker_wav: str = None
+    # Registered voice name; takes precedence over speaker_wav
+    voice: str = None
+
+def resolve_speaker(req) -> str:
+    """Reference clip path for a request, from a registered voice or speaker_wav."""
+    if not req.voice:
+        return req.speaker_wav
+    path = speakers.reference(req.voice)
+    if path is None:
+        raise HTTPException(status_code=404, detail=f"Unknown voice: {req.voice}")
+    return path
+
+def cache_key(text: str, language: str, speaker_wav: str = None) -> str:
+    return cache.key(text, language, speaker_wav, pool.model_name)
+
+async def cached_wav(text: str, language: str, speaker_wav: str = None) -> bytes:
+    """WAV for one utterance, from the cache or synthesized and stored."""
+    key = cache_key(text, language, speaker_wav)
+    audio = cache.get(key)
+    if audio is None:
+        audio = await pool.run("synthesize_wav", text, speaker_wav, language)
+        cache.put(key, audio)
+    return audio
+
+async def render_to_cache(text: str, language: str, speaker_wav: str = None, priority: int = INTERACTIVE, on_start=None):
+    """Path of the cached WAV for one utterance, synthesizing it on a miss; returns (path, cached)."""
+    key = cache_key(text, language, speaker_wav)
+    path = cache.path_for(key)
+    if path is not None:
+        return path, True
+    audio = await pool.run("synthesize_wav", text, speaker_wav, language, priority=priority, on_start=on_start)
+    return cache.put(key, audio), False
+
+async def render_batch_item(text: str, language: str, speaker_wav: str = None, on_start=None):
+    return await render_to_cache(text, language, speaker_wav, priority=BACKGROUND, on_start=on_start)
+
+jobs = BatchJobs(render_batch_item)
 
 @app.post("/synthesize")
 async def synthesize(req: TTSRequest):
-    output_path = f"/tmp/{hash(req.text)}.wav"
-    service.synthesize(req.text, output_path, req.speaker_wav, req.language)
-    # In real app, upload to storage or return stream
-    return {"path": output_path}
+    path, cached = await render_to_cache(req.text, req.language, resolve_speaker(req))
+    return {"path": str(path), "cached": cached}
+
+@app.post("/synthesize_wav")
+async def synthesize_wav(req: TTSRequest):
+    """Synthesize and return the audio directly, for streaming pipelines (no temp files)."""
+    audio = await cached_wav(req.text, req.language, resolve_speaker(req))
+    return Response(content=audio, media_type="audio/wav")
+
+@app.post("/synthesize_stream")
+async def synthesize_stream(req: TTSRequest):
+    """
+    Stream speech sentence by sentence as one WAV.
+
+    The response starts with a WAV header of unknown length, followed by the
+    PCM of each sentence as soon as it is synthesized; the next sentences are
+    synthesized (one per worker) while earlier ones are being sent. Sentences are cached
+    individually, so common openers ("Sure, here you go.") come from disk.
+    Time to first audio is recorded as `tts.time_to_first_audio`.
+    """
+    sentences = split_sentences(req.text)
+    speaker_wav = resolve_speaker(req)
+
+    async def sentence_pcm(sentence: str) -> bytes:
+        key = cache_key(sentence, req.language, speaker_wav)
+        audio = cache.get(key)
+        if audio is not None:
+            return pcm_frames(audio)
+        pcm = to_pcm16(await pool.run("synthesize_samples", sentence, speaker_wav, req.language))
+        cache.put(key, wav_bytes(pcm, pool.sample_rate))
+        return pcm
+
+    async def audio():
+        start = time.perf_counter()
+        yield streaming_wav_header(pool.sample_rate)
+        upcoming = iter(sentences)
+        pending = deque()
+
+        def prefetch():
+            # Keep every worker busy with the next sentences, in order
+            while len(pending) < pool.workers:
+                sentence = next(upcoming, None)
+                if sentence is None:
+                    return
+                pending.append(asyncio.ensure_future(sentence_pcm(sentence)))
+
+        try:
+            for i in range(len(sentences)):
+                prefetch()
+                pcm = await pending.popleft()
+                prefetch()
+                if i == 0:
+                    metrics.observe("tts.time_to_first_audio", time.perf_counter() - start)
+                yield pcm
+            metrics.observe("tts.stream_duration", time.perf_counter() - start)
+        finally:
+            # Client went away: do not synthesize the rest
+            for task in pending:
+                task.cancel()
+
+    return StreamingResponse(audio(), media_type="audio/wav", headers={"X-Sentences": str(len(sentences))})
+
+@app.post("/voices")
+async def register_voice(name: str = Form(...), file: UploadFile = File(...)):
+    """
+    Register a reference clip for voice cloning under `name`.
+
+    Conditioning latents are computed right away (in a worker) and persisted,
+    so the first synthesis with the voice does not pay for them.
+    """
+    try:
+        voice = speakers.register(name, await file.read())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    await pool.run("prepare_speaker", voice["path"])
+    return voice
+
+@app.get("/voices")
+def list_voices():
+    return {"voices": speakers.voices()}
+
+class BatchRequest(BaseModel):
+    texts: List[str]
+    language: str = "en"
+    speaker_wav: str = None
+    voice: str = None
+    # Stream results as NDJSON as they finish instead of returning a job id
+    stream: bool = False
+
+@app.post("/batch")
+async def synthesize_batch(req: BatchRequest):
+    """
+    Render many texts into the audio cache, e.g. to pre-render common prompts.
+
+    Items run at background priority across all workers, so interactive
+    synthesis still goes first. Without `stream`, returns a job id to poll at
+    `/jobs/{job_id}`; with it, streams one JSON line per item as it finishes.
+    """
+    if not req.texts:
+        raise HTTPException(status_code=400, detail="No texts to synthesize")
+    if len(req.texts) > TTS_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {TTS_BATCH_MAX_ITEMS} texts per batch")
+    speaker_wav = resolve_speaker(req)
+    metrics.incr("tts.batch.jobs")
+    metrics.incr("tts.batch.items", len(req.texts))
+
+    if not req.stream:
+        job = jobs.submit(req.texts, req.language, speaker_wav)
+        return {"job_id": job.id, "status": job.status, "items": len(job.items)}
+
+    job = jobs.create(req.texts, req.language, speaker_wav)
+
+    async def results():
+        async for item in jobs.iter_results(job):
+            yield json.dumps(item) + "\n"
+
+    return StreamingResponse(results(), media_type="application/x-ndjson", headers={"X-Job-Id": job.id})
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.summary()
+
+@app.get("/jobs/{job_id}/items/{index}")
+def get_job_item(job_id: str, index: int):
+    job = jobs.get(job_id)
+    if job is None or not 0 <= index < len(job.items):
+        raise HTTPException(status_code=404, detail="Job item not found")
+    item = job.items[index]
+    if item["status"] != DONE or not os.path.exists(item["path"]):
+        raise HTTPException(status_code=409, detail=f"Item is {item['status']}")
+    return FileResponse(item["path"], media_type="audio/wav")
+
+@app.get("/cache")
+def get_cache():
+    return cache.stats()
 
+@app.get("/metrics")
+def get_metrics():
+    return metrics.snapshot()
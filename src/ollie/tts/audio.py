@@ -0,0 +1,51 @@
+"""
+Audio encoding helpers for the TTS service.
+"""
+
+import io
+import struct
+import wave
+
+import numpy as np
+
+
+def to_pcm16(samples) -> bytes:
+    """Float samples in [-1, 1] to 16-bit little-endian PCM."""
+    samples = np.clip(np.asarray(samples, dtype=np.float32), -1.0, 1.0)
+    return (samples * 32767).astype("<i2").tobytes()
+
+
+def wav_bytes(pcm: bytes, sample_rate: int) -> bytes:
+    """Wrap 16-bit mono PCM in a WAV container."""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(pcm)
+    return buffer.getvalue()
+
+
+def streaming_wav_header(sample_rate: int) -> bytes:
+    """
+    WAV header for a 16-bit mono stream of unknown length.
+
+    The size fields are set to the maximum, which players treat as "read until
+    the end of the stream", so PCM chunks can follow as they are synthesized.
+    """
+    byte_rate = sample_rate * 2
+    return (
+        b"RIFF"
+        + struct.pack("<I", 0xFFFFFFFF)
+        + b"WAVE"
+        + b"fmt "
+        + struct.pack("<IHHIIHH", 16, 1, 1, sample_rate, byte_rate, 2, 16)
+        + b"data"
+        + struct.pack("<I", 0xFFFFFFFF)
+    )
+
+
+def pcm_frames(wav: bytes) -> bytes:
+    """The PCM data of a WAV file, e.g. to splice a cached clip into a stream."""
+    with wave.open(io.BytesIO(wav), "rb") as wav_file:
+        return wav_file.readframes(wav_file.getnframes())
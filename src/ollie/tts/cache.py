@@ -0,0 +1,178 @@
+"""
+Persistent, content-addressed cache of synthesized audio.
+
+Each entry is a WAV file named by a SHA-256 of everything that determines the
+audio: text, language, model and the content of the speaker reference (not its
+path). Entries live under DATA_DIR so they survive restarts; file mtimes track
+recency, and the least recently used files are deleted once the cache exceeds
+its size limit.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from ollie.utils.metrics import metrics
+
+
+def file_digest(path: str, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# path -> (mtime, size, digest), to avoid rehashing a speaker reference every request
+_digests: Dict[str, Tuple[float, int, str]] = {}
+
+
+def speaker_digest(speaker_wav: Optional[str]) -> str:
+    """Content hash of a speaker reference, or "" without one."""
+    if not speaker_wav or not os.path.exists(speaker_wav):
+        return ""
+    stat = os.stat(speaker_wav)
+    cached = _digests.get(speaker_wav)
+    if cached and cached[:2] == (stat.st_mtime, stat.st_size):
+        return cached[2]
+    digest = file_digest(speaker_wav)
+    _digests[speaker_wav] = (stat.st_mtime, stat.st_size, digest)
+    return digest
+
+
+class AudioCache:
+    def __init__(self, root: str, max_bytes: int = 512 * 1024 * 1024):
+        """
+        Open (or create) a cache directory.
+
+        Args:
+            root: Directory holding the cached WAV files
+            max_bytes: Total size above which least recently used entries are evicted
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # key -> (size, last used); rebuilt from disk so the limit holds across restarts
+        self._entries: Dict[str, Tuple[int, float]] = {}
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+        for path in self.root.glob("*/*.wav"):
+            stat = path.stat()
+            self._entries[path.stem] = (stat.st_size, stat.st_mtime)
+            self._bytes += stat.st_size
+        self._update_gauges()
+
+    def _update_gauges(self):
+        metrics.set("tts.cache.bytes", self._bytes)
+        metrics.set("tts.cache.entries", len(self._entries))
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.wav"
+
+    def key(
+        self, text: str, language: str, speaker_wav: Optional[str], model: str
+    ) -> str:
+        """Stable cache key for a synthesis request."""
+        material = json.dumps(
+            {
+                "text": text,
+                "language": language,
+                "speaker": speaker_digest(speaker_wav),
+                "model": model,
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(material.encode()).hexdigest()
+
+    def _record(self, hit: bool):
+        if hit:
+            self.hits += 1
+            metrics.incr("tts.cache.hit")
+        else:
+            self.misses += 1
+            metrics.incr("tts.cache.miss")
+        metrics.set(
+            "tts.cache.hit_rate", round(self.hits / (self.hits + self.misses), 4)
+        )
+
+    def path_for(self, key: str) -> Optional[Path]:
+        """Path of a cached entry (marking it as recently used), or None on a miss."""
+        path = self._path(key)
+        with self._lock:
+            if key not in self._entries or not path.exists():
+                self._entries.pop(key, None)
+                self._record(False)
+                return None
+            size, _ = self._entries[key]
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            self._entries[key] = (size, path.stat().st_mtime)
+            self._record(True)
+        return path
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Cached WAV bytes, or None on a miss."""
+        path = self.path_for(key)
+        if path is None:
+            return None
+        try:
+            return path.read_bytes()
+        except OSError:
+            return None
+
+    def put(self, key: str, audio: bytes) -> Path:
+        """Store WAV bytes atomically and evict beyond the size limit."""
+        path = self._path(key)
+        path.parent.mkdir(exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_bytes(audio)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            previous = self._entries.get(key)
+            if previous:
+                self._bytes -= previous[0]
+            self._entries[key] = (len(audio), path.stat().st_mtime)
+            self._bytes += len(audio)
+            self._evict(keep=key)
+            self._update_gauges()
+        return path
+
+    def _evict(self, keep: str):
+        if self._bytes <= self.max_bytes:
+            return
+        for key, (size, _) in sorted(
+            self._entries.items(), key=lambda item: item[1][1]
+        ):
+            if self._bytes <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            try:
+                self._path(key).unlink()
+            except FileNotFoundError:
+                pass
+            del self._entries[key]
+            self._bytes -= size
+            metrics.incr("tts.cache.evicted")
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
@@ -0,0 +1,136 @@
+"""
+Batch synthesis jobs.
+
+A job renders many texts into the audio cache at background priority, so
+pre-rendering common prompts keeps every worker busy without delaying
+interactive requests. Jobs are kept in memory; the rendered audio itself lives
+in the persistent cache.
+"""
+
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class BatchJob:
+    def __init__(self, texts: List[str], language: str, speaker_wav: Optional[str]):
+        self.id = uuid.uuid4().hex
+        self.language = language
+        self.speaker_wav = speaker_wav
+        self.created = time.time()
+        self.finished: Optional[float] = None
+        self.items: List[Dict[str, Any]] = [
+            {
+                "index": i,
+                "text": text,
+                "status": PENDING,
+                "path": None,
+                "cached": None,
+                "error": None,
+            }
+            for i, text in enumerate(texts)
+        ]
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def status(self) -> str:
+        statuses = {item["status"] for item in self.items}
+        if statuses & {PENDING, RUNNING}:
+            return RUNNING if statuses - {PENDING} else PENDING
+        return FAILED if FAILED in statuses else DONE
+
+    def summary(self) -> Dict[str, Any]:
+        counts = {}
+        for item in self.items:
+            counts[item["status"]] = counts.get(item["status"], 0) + 1
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "counts": counts,
+            "created": self.created,
+            "finished": self.finished,
+            "items": self.items,
+        }
+
+
+# Renders one text: (text, language, speaker_wav, on_start) -> (path, cached); on_start is
+# called when synthesis gets a worker (not for cache hits)
+Renderer = Callable[[str, str, Optional[str], Callable[[], None]], Awaitable[tuple]]
+
+
+class BatchJobs:
+    def __init__(self, render: Renderer, max_jobs: int = 100):
+        """
+        Initialize the job registry.
+
+        Args:
+            render: Coroutine rendering one text into the cache
+            max_jobs: Finished jobs kept for status queries before the oldest are dropped
+        """
+        self.render = render
+        self.max_jobs = max_jobs
+        self._jobs: "OrderedDict[str, BatchJob]" = OrderedDict()
+
+    def get(self, job_id: str) -> Optional[BatchJob]:
+        return self._jobs.get(job_id)
+
+    def _prune(self):
+        finished = [
+            job_id for job_id, job in self._jobs.items() if job.finished is not None
+        ]
+        for job_id in finished[: max(0, len(self._jobs) - self.max_jobs)]:
+            del self._jobs[job_id]
+
+    async def _render_item(self, job: BatchJob, item: Dict[str, Any]) -> Dict[str, Any]:
+        # Items stay pending while they wait for a worker behind interactive requests
+        def started():
+            item["status"] = RUNNING
+
+        try:
+            path, cached = await self.render(
+                item["text"], job.language, job.speaker_wav, started
+            )
+            item.update(status=DONE, path=str(path), cached=cached)
+        except Exception as e:
+            print(f"Batch job {job.id} item {item['index']} failed: {e}")
+            item.update(status=FAILED, error=str(e))
+        return item
+
+    async def iter_results(self, job: BatchJob):
+        """Render every item of a job concurrently, yielding items as they finish."""
+        try:
+            for finished in asyncio.as_completed(
+                [self._render_item(job, item) for item in job.items]
+            ):
+                yield await finished
+        finally:
+            job.finished = time.time()
+
+    def submit(
+        self, texts: List[str], language: str = "en", speaker_wav: Optional[str] = None
+    ) -> BatchJob:
+        """Start rendering a job in the background."""
+        job = self.create(texts, language, speaker_wav)
+
+        async def run():
+            async for _ in self.iter_results(job):
+                pass
+
+        job.task = asyncio.create_task(run())
+        return job
+
+    def create(
+        self, texts: List[str], language: str = "en", speaker_wav: Optional[str] = None
+    ) -> BatchJob:
+        """Register a job without starting it (for callers that stream its results)."""
+        job = BatchJob(texts, language, speaker_wav)
+        self._jobs[job.id] = job
+        self._prune()
+        return job
@@ -0,0 +1,138 @@
+"""
+Speaker profiles for XTTS voice cloning.
+
+XTTS conditions every synthesis on latents computed from the speaker reference
+audio, which takes a large share of the time for a short reply. The store
+computes them once per reference (keyed by the file's content hash and the
+model), keeps them in memory and persists them under DATA_DIR, so they survive
+restarts. It also keeps named voices: uploaded reference clips that requests
+can refer to by name.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ollie.utils.metrics import metrics
+from .cache import speaker_digest
+
+VOICE_NAME = re.compile(r"^[\w-]{1,64}$")
+
+
+class SpeakerStore:
+    def __init__(self, root: str):
+        """
+        Open (or create) a speaker store.
+
+        Args:
+            root: Directory holding reference clips, the voice index and cached latents
+        """
+        self.root = Path(root)
+        self.references_dir = self.root / "references"
+        self.latents_dir = self.root / "latents"
+        self.references_dir.mkdir(parents=True, exist_ok=True)
+        self.latents_dir.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.root / "voices.json"
+        self._lock = threading.Lock()
+        self._latents: Dict[Tuple[str, str], Any] = {}
+        self._voices: Dict[str, Dict[str, Any]] = {}
+        if self.index_path.exists():
+            self._voices = json.loads(self.index_path.read_text())
+
+    def _save_index(self):
+        tmp_path = self.index_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(self._voices, indent=2, sort_keys=True))
+        os.replace(tmp_path, self.index_path)
+
+    def register(self, name: str, audio: bytes) -> Dict[str, Any]:
+        """
+        Store a reference clip under a voice name (replacing any previous clip).
+
+        Args:
+            name: Voice name (letters, digits, "_" and "-")
+            audio: WAV bytes of the reference clip
+
+        Returns:
+            The voice record
+        """
+        if not VOICE_NAME.match(name):
+            raise ValueError(f"Invalid voice name: {name!r}")
+        if not audio:
+            raise ValueError("Reference audio is empty")
+
+        path = self.references_dir / f"{name}.wav"
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_bytes(audio)
+        os.replace(tmp_path, path)
+
+        voice = {
+            "name": name,
+            "path": str(path),
+            "digest": speaker_digest(str(path)),
+            "bytes": len(audio),
+            "created": time.time(),
+        }
+        with self._lock:
+            self._voices[name] = voice
+            self._save_index()
+        return voice
+
+    def voices(self) -> List[Dict[str, Any]]:
+        return [self._voices[name] for name in sorted(self._voices)]
+
+    def reference(self, name: str) -> Optional[str]:
+        """Path of a registered voice's reference clip, or None if unknown."""
+        voice = self._voices.get(name)
+        return voice["path"] if voice and os.path.exists(voice["path"]) else None
+
+    def _latents_path(self, digest: str, model: str) -> Path:
+        return self.latents_dir / model.replace("/", "--") / f"{digest}.pt"
+
+    def conditioning(
+        self,
+        speaker_wav: str,
+        model: str,
+        compute: Callable[[str], Any],
+        device: str = "cpu",
+    ) -> Any:
+        """
+        Conditioning latents for a reference clip, computed at most once per clip and model.
+
+        Args:
+            speaker_wav: Path to the reference audio
+            model: TTS model name (latents are model specific)
+            compute: Computes the latents from the reference path on a miss
+            device: Device cached latents are loaded onto
+
+        Returns:
+            Whatever `compute` returns (for XTTS, the GPT conditioning latent
+            and speaker embedding)
+        """
+        # Imported here so importing this module does not pull in torch
+        import torch
+
+        digest = speaker_digest(speaker_wav)
+        key = (digest, model)
+        if key in self._latents:
+            metrics.incr("tts.speaker_latents.memory_hit")
+            return self._latents[key]
+
+        path = self._latents_path(digest, model)
+        if path.exists():
+            latents = torch.load(path, map_location=device)
+            metrics.incr("tts.speaker_latents.disk_hit")
+        else:
+            with metrics.timer("tts.speaker_latents.compute"):
+                latents = compute(speaker_wav)
+            path.parent.mkdir(exist_ok=True)
+            # Worker processes may compute the same latents at once
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            torch.save(latents, tmp_path)
+            os.replace(tmp_path, path)
+            metrics.incr("tts.speaker_latents.computed")
+        self._latents[key] = latents
+        return latents
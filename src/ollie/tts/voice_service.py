@@ -1,18 +1,34 @@
 import os
-import torch
-from TTS.api import TTS
+
+import numpy as np
+
+from ollie.utils.text import split_sentences
+from .audio import to_pcm16, wav_bytes
+from .speakers import SpeakerStore
 
 class TTSService:
-    def __init__(self, model_name: str = "tts_models/multilingual/multi-dataset/xtts_v2", device: str = "cpu"):
+    def __init__(
+        self,
+        model_name: str = "tts_models/multilingual/multi-dataset/xtts_v2",
+        device: str = "cpu",
+        speakers: SpeakerStore = None,
+    ):
         """
         Initialize the TTS service.
         
         Args:
             model_name: Name of the Coqui TTS model
             device: Device to run on (cpu, cuda)
+            speakers: Store caching speaker conditioning latents (optional)
         """
+        # Imported here so importing this module does not pull in torch and Coqui
+        import torch
+        from TTS.api import TTS
+
+        self.model_name = model_name
         self.device = device if torch.cuda.is_available() and device == "cuda" else "cpu"
         self.tts = TTS(model_name).to(self.device)
+        self.speakers = speakers
 
     def synthesize(self, text: str, output_path: str, speaker_wav: str = None, language: str = "en"):
         """
@@ -24,23 +40,74 @@ class TTSService:
             speaker_wav: Path to reference audio for cloning (optional)
             language: Language code
         """
-        if speaker_wav and os.path.exists(speaker_wav):
-            self.tts.tts_to_file(
-                text=text, 
-                file_path=output_path, 
-                speaker_wav=speaker_wav, 
-                language=language
-            )
-        else:
-            # Fallback or default generation if no clone source
-            self.tts.tts_to_file(
-                text=text, 
-                file_path=output_path,
-                language=language
-            )
-        
+        with open(output_path, "wb") as f:
+            f.write(self.synthesize_wav(text, speaker_wav, language))
         return output_path
 
+    @property
+    def sample_rate(self) -> int:
+        return self.tts.synthesizer.output_sample_rate
+
+    @property
+    def model(self):
+        """The underlying model (XTTS for the default model name)."""
+        return self.tts.synthesizer.tts_model
+
+    def supports_cached_conditioning(self) -> bool:
+        return self.speakers is not None and hasattr(self.model, "get_conditioning_latents")
+
+    def conditioning_latents(self, speaker_wav: str):
+        """XTTS (gpt_cond_latent, speaker_embedding) for a reference clip, from the speaker store."""
+        def compute(path: str):
+            return self.model.get_conditioning_latents(audio_path=[path])
+
+        return self.speakers.conditioning(speaker_wav, self.model_name, compute, self.device)
+
+    def prepare_speaker(self, speaker_wav: str) -> bool:
+        """Compute and persist a reference clip's latents ahead of the first synthesis with it."""
+        if not self.supports_cached_conditioning():
+            return False
+        self.conditioning_latents(speaker_wav)
+        return True
+
+    def synthesize_samples(self, text: str, speaker_wav: str = None, language: str = "en") -> np.ndarray:
+        """
+        Synthesize speech into float32 samples at `sample_rate`.
+
+        Args:
+            text: Text to synthesize
+            speaker_wav: Path to reference audio for cloning (optional)
+            language: Language code
+        """
+        if speaker_wav and os.path.exists(speaker_wav) and self.supports_cached_conditioning():
+            gpt_cond_latent, speaker_embedding = self.conditioning_latents(speaker_wav)
+            # Model-level inference takes one sentence at a time (tts() splits internally)
+            chunks = [
+                np.asarray(self.model.inference(sentence, language, gpt_cond_latent, speaker_embedding)["wav"], dtype=np.float32)
+                for sentence in split_sentences(text)
+            ]
+            return np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.float32)
+
+        kwargs = {"text": text, "language": language}
+        if speaker_wav and os.path.exists(speaker_wav):
+            kwargs["speaker_wav"] = speaker_wav
+        return np.asarray(self.tts.tts(**kwargs), dtype=np.float32)
+
+    def synthesize_wav(self, text: str, speaker_wav: str = None, language: str = "en") -> bytes:
+        """
+        Synthesize speech into an in-memory WAV file.
+
+        Args:
+            text: Text to synthesize
+            speaker_wav: Path to reference audio for cloning (optional)
+            language: Language code
+
+        Returns:
+            16-bit mono WAV bytes
+        """
+        samples = self.synthesize_samples(text, speaker_wav, language)
+        return wav_bytes(to_pcm16(samples), self.sample_rate)
+
     def list_speakers(self):
         """List available speakers if model supports it."""
         if hasattr(self.tts.tts, "speaker_manager") and self.tts.tts.speaker_manager:
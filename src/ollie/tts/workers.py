@@ -0,0 +1,175 @@
+"""
+Pool of TTS worker processes.
+
+XTTS inference is CPU-bound, holds the GIL for long stretches and is not
+thread-safe, so each worker is a separate process holding its own model.
+Requests queue in the service process on a priority semaphore sized to the
+number of workers: interactive synthesis always goes before queued batch work,
+and the process pool itself never builds a backlog that would jump that queue.
+
+A worker that dies (e.g. killed for running out of memory) breaks the whole
+process pool; the pool is then restarted and the call retried once.
+"""
+
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+from ollie.utils.concurrency import INTERACTIVE, PRIORITY_NAMES, PrioritySemaphore
+from ollie.utils.metrics import metrics
+
+# Model of the current worker process, built by the pool initializer
+_service = None
+
+
+def _init_worker(model_name: str, device: str, voices_dir: Optional[str]):
+    global _service
+    # Imported here so the service process does not load torch and Coqui itself
+    from .speakers import SpeakerStore
+    from .voice_service import TTSService
+
+    speakers = SpeakerStore(voices_dir) if voices_dir else None
+    _service = TTSService(model_name=model_name, device=device, speakers=speakers)
+
+
+def _describe() -> Dict[str, Any]:
+    return {
+        "model_name": _service.model_name,
+        "sample_rate": _service.sample_rate,
+        "cached_conditioning": _service.supports_cached_conditioning(),
+    }
+
+
+def _call(method: str, args: tuple) -> Any:
+    return getattr(_service, method)(*args)
+
+
+class SynthesisPool:
+    def __init__(
+        self,
+        workers: int,
+        model_name: str,
+        device: str = "cpu",
+        voices_dir: Optional[str] = None,
+    ):
+        """
+        Initialize the pool (processes start in `start`).
+
+        Args:
+            workers: Number of worker processes, each holding a model
+            model_name: Coqui TTS model
+            device: Device to run on (cpu, cuda)
+            voices_dir: SpeakerStore directory for cached speaker latents
+        """
+        self.workers = max(1, workers)
+        self.model_name = model_name
+        self.device = device
+        self.voices_dir = voices_dir
+        self.slots = PrioritySemaphore(self.workers)
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.info: Dict[str, Any] = {}
+        self._restart_lock = asyncio.Lock()
+
+    @property
+    def sample_rate(self) -> int:
+        return self.info["sample_rate"]
+
+    async def start(self):
+        """Start the worker processes and wait until every one has loaded its model."""
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            # torch is not fork-safe once it has started threads
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.model_name, self.device, self.voices_dir),
+        )
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        # The executor spawns processes on demand; one describe per worker brings them all up
+        infos = await asyncio.gather(
+            *(
+                loop.run_in_executor(self.executor, _describe)
+                for _ in range(self.workers)
+            )
+        )
+        self.info = infos[0]
+        metrics.set_once(
+            "tts.workers.startup_seconds", round(time.perf_counter() - start, 3)
+        )
+        metrics.set("tts.workers", self.workers)
+        print(f"Started {self.workers} TTS worker(s) for {self.model_name}")
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    async def _restart(self, broken: ProcessPoolExecutor):
+        """Replace a broken process pool, once however many calls saw it break."""
+        async with self._restart_lock:
+            if self.executor is not broken:
+                return
+            print("TTS worker pool is broken (a worker died); restarting the workers")
+            metrics.incr("tts.workers.restarts")
+            broken.shutdown(wait=False, cancel_futures=True)
+            await self.start()
+
+    async def run(
+        self,
+        method: str,
+        *args,
+        priority: int = INTERACTIVE,
+        on_start: Optional[Callable[[], None]] = None,
+    ) -> Any:
+        """
+        Call a TTSService method in a worker process.
+
+        Args:
+            method: TTSService method name (e.g. "synthesize_wav")
+            *args: Its arguments (must be picklable)
+            priority: INTERACTIVE or BACKGROUND
+            on_start: Called once the call has a worker slot, i.e. stops waiting in the queue
+
+        Returns:
+            The method's return value
+
+        Raises:
+            RuntimeError: If the pool has not been started (or was shut down)
+        """
+        name = PRIORITY_NAMES.get(priority, str(priority))
+        for attempt in range(2):
+            queued = time.perf_counter()
+            await self.slots.acquire(priority)
+            executor = self.executor
+            if executor is None:
+                # run_in_executor(None) would run on a thread, where there is no model
+                self.slots.release()
+                raise RuntimeError("synthesis pool not started")
+            started = time.perf_counter()
+            metrics.observe(f"tts.queue_wait.{name}", started - queued)
+            metrics.set("tts.queue_depth", self.slots.waiting())
+            if on_start is not None and attempt == 0:
+                on_start()
+
+            def finished(_, started=started):
+                metrics.observe("tts.inference", time.perf_counter() - started)
+                self.slots.release()
+
+            try:
+                try:
+                    future = asyncio.get_running_loop().run_in_executor(
+                        executor, _call, method, args
+                    )
+                except BaseException:
+                    self.slots.release()
+                    raise
+                # The worker keeps going if the caller is cancelled, so its slot is only freed when it finishes
+                future.add_done_callback(finished)
+                return await asyncio.shield(future)
+            except BrokenProcessPool:
+                if attempt:
+                    raise
+                await self._restart(executor)
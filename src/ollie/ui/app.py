@@ -1,5 +1,6 @@
 import streamlit as st
 import requests
+import json
 import os
 from datetime import datetime
 
@@ -11,6 +12,66 @@ if os.getenv("OLLIE_ENV") == "dev":
 
 st.set_page_config(page_title="Ollie", page_icon="🧠", layout="wide")
 
+def stream_chat(message, placeholder):
+    """
+    Stream a reply from /chat/stream into a placeholder and return the full text.
+
+    The session id from the first reply is kept in session state and sent with
+    every later message, so the conversation continues one session (and its history).
+    """
+    full_response = ""
+    event = None
+    request = {"message": message, "session_id": st.session_state.get("chat_session_id")}
+    with requests.post(f"{API_URL}/chat/stream", json=request, stream=True, timeout=300) as response:
+        response.raise_for_status()
+        for line in response.iter_lines(decode_unicode=True):
+            if line.startswith("event: "):
+                event = line[len("event: "):]
+            elif line.startswith("data: "):
+                data = json.loads(line[len("data: "):])
+                if event == "token":
+                    full_response += data["content"]
+                    placeholder.write(full_response + "▌")
+                elif event == "done":
+                    full_response = data["response"]
+                    st.session_state.chat_session_id = data["session_id"]
+                elif event == "error":
+                    raise RuntimeError(data["detail"])
+    placeholder.write(full_response)
+    return full_response
+
+def get_page(path, params=None):
+    """
+    GET a paginated API page, revalidating with the ETag from the last fetch.
+
+    Streamlit reruns the whole script on every interaction; unchanged pages
+    come back as 304 and are served from session state instead of re-downloaded.
+    """
+    cache = st.session_state.setdefault("page_cache", {})
+    key = (path, tuple(sorted((params or {}).items())))
+    headers = {"If-None-Match": cache[key][0]} if key in cache else {}
+    resp = requests.get(f"{API_URL}{path}", params=params, headers=headers, timeout=10)
+    if resp.status_code == 304:
+        return cache[key][1]
+    resp.raise_for_status()
+    page = resp.json()
+    if "ETag" in resp.headers:
+        cache[key] = (resp.headers["ETag"], page)
+    return page
+
+def load_pages(path, state_key, page_size):
+    """Fetch every page loaded so far (the first, plus one per "Load more"); returns (items, next_cursor)."""
+    cursors = st.session_state.setdefault(state_key, [None])
+    items, next_cursor = [], None
+    for cursor in cursors:
+        params = {"limit": page_size}
+        if cursor:
+            params["cursor"] = cursor
+        page = get_page(path, params)
+        items.extend(page["items"])
+        next_cursor = page["next_cursor"]
+    return items, next_cursor
+
 st.title("Ollie 🧠")
 
 # Sidebar for navigation
@@ -198,23 +259,12 @@ if page == "Chat":
         try:
             with st.chat_message("assistant"):
                 message_placeholder = st.empty()
-                full_response = ""
                 
-                # Streaming response from API
-                # response = requests.post(f"{API_URL}/chat", json={"message": prompt}, stream=True)
-                # for chunk in response...
-                
-                # Placeholder until streaming is fully implemented in app.py
-                resp = requests.post(f"{API_URL}/chat", json={"message": prompt})
-                if resp.status_code == 200:
-                    data = resp.json()
-                    full_response = data["response"]
-                    message_placeholder.write(full_response)
-                    assistant_msg_id = f"msg_{st.session_state.message_counter}"
-                    st.session_state.message_counter += 1
-                    st.session_state.messages.append({"role": "assistant", "content": full_response, "id": assistant_msg_id})
-                else:
-                     st.error(f"Error: {resp.status_code} - {resp.text}")
+                # Streaming response from API: tokens are rendered as they arrive
+                full_response = stream_chat(prompt, message_placeholder)
+                assistant_msg_id = f"msg_{st.session_state.message_counter}"
+                st.session_state.message_counter += 1
+                st.session_state.messages.append({"role": "assistant", "content": full_response, "id": assistant_msg_id})
                 
         except Exception as e:
             st.error(f"Error communicating with Ollie Core: {e}")
@@ -329,12 +379,24 @@ elif page == "History":
             
     st.subheader("Recent Sessions")
     try:
-        resp = requests.get(f"{API_URL}/sessions")
-        if resp.status_code == 200:
-            sessions = resp.json()
-            for s in sessions:
-                st.write(f"Session {s['id']} - {s['start_time']}")
-    except:
+        sessions, next_cursor = load_pages("/sessions", "session_cursors", page_size=10)
+        for s in sessions:
+            with st.expander(f"Session {s['id']} - {s['start_time']} ({s['conversation_count']} messages)"):
+                if s.get("summary"):
+                    st.caption(s["summary"])
+                if s["conversation_count"] and st.checkbox("Show messages", key=f"show_session_{s['id']}"):
+                    conversations, more = load_pages(
+                        f"/sessions/{s['id']}/conversations", f"conversation_cursors_{s['id']}", page_size=50
+                    )
+                    for c in conversations:
+                        st.write(f"**{c['speaker']}** ({c['timestamp']}): {c['transcript']}")
+                    if more and st.button("Load more messages", key=f"more_session_{s['id']}"):
+                        st.session_state[f"conversation_cursors_{s['id']}"].append(more)
+                        st.rerun()
+        if next_cursor and st.button("Load more sessions"):
+            st.session_state["session_cursors"].append(next_cursor)
+            st.rerun()
+    except Exception:
         st.write("Could not load sessions.")
 
 elif page == "Settings":
@@ -0,0 +1,3 @@
+from .metrics import metrics, MetricsRegistry
+
+__all__ = ["metrics", "MetricsRegistry"]
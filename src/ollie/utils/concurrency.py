@@ -0,0 +1,59 @@
+"""
+Concurrency primitives shared by the services.
+"""
+
+import asyncio
+import heapq
+import itertools
+from typing import Optional
+
+INTERACTIVE = 0
+BACKGROUND = 1
+
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BACKGROUND: "background"}
+
+
+class PrioritySemaphore:
+    def __init__(self, value: int):
+        """
+        Semaphore that hands free slots to the lowest priority value first (FIFO within a priority).
+
+        Args:
+            value: Number of concurrent holders
+        """
+        self._value = value
+        self._waiters = []
+        self._seq = itertools.count()
+
+    def waiting(self, priority: Optional[int] = None) -> int:
+        return sum(
+            1
+            for p, _, f in self._waiters
+            if not f.done() and (priority is None or p == priority)
+        )
+
+    async def acquire(self, priority: int = INTERACTIVE):
+        if self._value > 0 and not self._waiters:
+            self._value -= 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        entry = (priority, next(self._seq), future)
+        heapq.heappush(self._waiters, entry)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just as we were cancelled; pass it on
+                self.release()
+            elif entry in self._waiters:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+            raise
+
+    def release(self):
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self._value += 1
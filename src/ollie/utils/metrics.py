@@ -0,0 +1,111 @@
+"""
+Minimal in-process metrics registry.
+
+Counters, gauges and latency summaries kept in memory and exposed as JSON by
+each service's /metrics endpoint. Thread-safe, since several code paths run in
+worker threads.
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Dict
+
+
+class _Summary:
+    """Running latency summary with percentiles over a bounded sample window."""
+
+    def __init__(self, window: int = 1024):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+        self.samples = deque(maxlen=window)
+
+    def observe(self, value: float):
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        self.last = value
+        self.samples.append(value)
+
+    def snapshot(self) -> Dict[str, float]:
+        ordered = sorted(self.samples)
+
+        def pct(p: float) -> float:
+            if not ordered:
+                return 0.0
+            return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+        return {
+            "count": self.count,
+            "avg": self.total / self.count if self.count else 0.0,
+            "p50": pct(0.50),
+            "p95": pct(0.95),
+            "max": self.max,
+            "last": self.last,
+        }
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = {}
+        self._gauges: Dict[str, Any] = {}
+        self._summaries: Dict[str, _Summary] = {}
+
+    def incr(self, name: str, value: float = 1):
+        """Increment a counter."""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def set(self, name: str, value: Any):
+        """Set a gauge to a value."""
+        with self._lock:
+            self._gauges[name] = value
+
+    def set_once(self, name: str, value: Any) -> bool:
+        """Set a gauge only if it has never been set. Returns True if it was set."""
+        with self._lock:
+            if name in self._gauges:
+                return False
+            self._gauges[name] = value
+            return True
+
+    def observe(self, name: str, value: float):
+        """Record a sample (usually seconds) in a latency summary."""
+        with self._lock:
+            summary = self._summaries.get(name)
+            if summary is None:
+                summary = self._summaries[name] = _Summary()
+            summary.observe(value)
+
+    @contextmanager
+    def timer(self, name: str):
+        """Time the enclosed block and record it under `name`."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def get(self, name: str, default: Any = 0) -> Any:
+        """Read a counter or gauge."""
+        with self._lock:
+            if name in self._counters:
+                return self._counters[name]
+            return self._gauges.get(name, default)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return all metrics as a JSON-serializable dict."""
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "gauges": dict(self._gauges),
+                "latency": {k: v.snapshot() for k, v in self._summaries.items()},
+            }
+
+
+# Process-wide registry
+metrics = MetricsRegistry()
@@ -0,0 +1,135 @@
+"""
+Near-duplicate detection, used at memory ingest and in training data preparation.
+
+Texts are fingerprinted with a 64-bit SimHash over word shingles. Two texts are
+near-duplicates when their fingerprints differ in at most `max_distance` bits.
+The index splits fingerprints into `max_distance + 1` bands: by the pigeonhole
+principle two near-duplicates share at least one band exactly, so a lookup only
+compares against the few entries bucketed under the query's bands instead of
+the whole collection.
+"""
+
+import hashlib
+import re
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+FINGERPRINT_BITS = 64
+_WORD_RE = re.compile(r"\w+")
+
+
+def _hash64(token: str) -> int:
+    return int.from_bytes(
+        hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "big"
+    )
+
+
+def simhash(text: str, shingle_size: int = 3) -> int:
+    """
+    Compute a 64-bit SimHash of a text.
+
+    Args:
+        text: Text to fingerprint
+        shingle_size: Number of consecutive words per feature
+
+    Returns:
+        Fingerprint as an int
+    """
+    words = _WORD_RE.findall(text.lower())
+    if len(words) >= shingle_size:
+        features = [
+            " ".join(words[i : i + shingle_size])
+            for i in range(len(words) - shingle_size + 1)
+        ]
+    else:
+        features = words
+
+    weights = [0] * FINGERPRINT_BITS
+    for feature in features:
+        h = _hash64(feature)
+        for bit in range(FINGERPRINT_BITS):
+            weights[bit] += 1 if (h >> bit) & 1 else -1
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class SimHashIndex:
+    def __init__(self, max_distance: int = 3):
+        """
+        Banded index of SimHash fingerprints.
+
+        Args:
+            max_distance: Largest Hamming distance still considered a near-duplicate
+        """
+        self.max_distance = max_distance
+        self.num_bands = max_distance + 1
+        self.band_bits = FINGERPRINT_BITS // self.num_bands
+        self._bands: List[Dict[int, Set[str]]] = [
+            defaultdict(set) for _ in range(self.num_bands)
+        ]
+        self._entries: Dict[str, Tuple[int, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _band_keys(self, fingerprint: int) -> List[int]:
+        mask = (1 << self.band_bits) - 1
+        keys = []
+        for band in range(self.num_bands):
+            shift = band * self.band_bits
+            # The last band takes any bits left over by the integer division
+            width_mask = (
+                mask
+                if band < self.num_bands - 1
+                else (1 << (FINGERPRINT_BITS - shift)) - 1
+            )
+            keys.append((fingerprint >> shift) & width_mask)
+        return keys
+
+    def add(self, entry_id: str, fingerprint: int, length: int):
+        """Index a fingerprint under an id, replacing any previous entry for that id."""
+        self.remove(entry_id)
+        self._entries[entry_id] = (fingerprint, length)
+        for band, key in enumerate(self._band_keys(fingerprint)):
+            self._bands[band][key].add(entry_id)
+
+    def remove(self, entry_id: str):
+        entry = self._entries.pop(entry_id, None)
+        if entry is None:
+            return
+        for band, key in enumerate(self._band_keys(entry[0])):
+            bucket = self._bands[band].get(key)
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self._bands[band][key]
+
+    def find(self, fingerprint: int) -> Optional[Tuple[str, int]]:
+        """
+        Find the closest indexed near-duplicate.
+
+        Returns:
+            (entry_id, text_length) of the best match, or None
+        """
+        best = None
+        best_distance = self.max_distance + 1
+        seen = set()
+        for band, key in enumerate(self._band_keys(fingerprint)):
+            for entry_id in self._bands[band].get(key, ()):
+                if entry_id in seen:
+                    continue
+                seen.add(entry_id)
+                distance = hamming_distance(fingerprint, self._entries[entry_id][0])
+                if distance < best_distance:
+                    best, best_distance = entry_id, distance
+        if best is None:
+            return None
+        return best, self._entries[best][1]
@@ -0,0 +1,78 @@
+"""
+Incremental text helpers for streaming pipelines.
+"""
+
+import re
+from typing import List
+
+# Sentence end: terminal punctuation (optionally followed by closing quotes or
+# brackets) and whitespace, or a line break
+_SENTENCE_END = re.compile(r"""([.!?…]+["')\]]*)\s+|\n+""")
+# Abbreviations that end in a period without ending the sentence
+_ABBREVIATIONS = {
+    "mr",
+    "mrs",
+    "ms",
+    "dr",
+    "prof",
+    "sr",
+    "jr",
+    "st",
+    "vs",
+    "etc",
+    "e.g",
+    "i.e",
+    "approx",
+}
+
+
+class SentenceSplitter:
+    def __init__(self, min_chars: int = 20):
+        """
+        Split streamed text into sentences as soon as each one is complete.
+
+        Args:
+            min_chars: Sentences shorter than this are merged with the next one,
+                so TTS is not called for fragments like "Sure."
+        """
+        self.min_chars = min_chars
+        self._buffer = ""
+
+    def _is_abbreviation(self, text: str) -> bool:
+        words = text.rstrip(".").rsplit(None, 1)
+        return bool(words) and words[-1].lower() in _ABBREVIATIONS
+
+    def feed(self, text: str) -> List[str]:
+        """Add streamed text; returns the sentences completed by it."""
+        self._buffer += text
+        sentences = []
+        start = 0
+        for match in _SENTENCE_END.finditer(self._buffer):
+            candidate = self._buffer[start : match.end()].strip()
+            if match.group(1) and self._is_abbreviation(
+                self._buffer[start : match.start() + 1]
+            ):
+                continue
+            if len(candidate) < self.min_chars:
+                continue
+            sentences.append(candidate)
+            start = match.end()
+        self._buffer = self._buffer[start:]
+        return sentences
+
+    def flush(self) -> List[str]:
+        """Return whatever text remains once the stream has ended."""
+        rest = self._buffer.strip()
+        self._buffer = ""
+        return [rest] if rest else []
+
+
+def split_sentences(text: str, min_chars: int = 20) -> List[str]:
+    """Split complete text into sentences the same way SentenceSplitter splits a stream."""
+    splitter = SentenceSplitter(min_chars)
+    return splitter.feed(text + " ") + splitter.flush()
+
+
+def normalize_words(text: str) -> List[str]:
+    """Lowercased words without punctuation, for comparing transcripts."""
+    return re.findall(r"[\w']+", text.lower())
@@ -0,0 +1,90 @@
+"""
+Chunked handling of uploaded audio without blocking the event loop.
+
+Chunks are written (and hashed) in a worker thread as they arrive, so a large
+upload neither stalls other requests nor needs to fit in memory.
+"""
+
+import asyncio
+import hashlib
+import os
+import tempfile
+import uuid
+from typing import AsyncIterator, Tuple
+
+CHUNK_SIZE = 1024 * 1024
+# Bodies up to this size stay in memory when spooled; larger ones roll over to a temp file
+SPOOL_MAX_MEMORY = 8 * 1024 * 1024
+
+
+async def upload_chunks(upload, chunk_size: int = CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """Chunks of a FastAPI UploadFile (read without blocking the event loop)."""
+    while chunk := await upload.read(chunk_size):
+        yield chunk
+
+
+async def file_chunks(path: str, chunk_size: int = CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """Chunks of a file on disk, e.g. as a streamed request body."""
+    with open(path, "rb") as f:
+        while chunk := await asyncio.to_thread(f.read, chunk_size):
+            yield chunk
+
+
+def _write_hashed(f, digest, chunk: bytes):
+    digest.update(chunk)
+    f.write(chunk)
+
+
+async def save_stream(
+    chunks: AsyncIterator[bytes], directory: str, suffix: str = ""
+) -> Tuple[str, str, int]:
+    """
+    Write a stream to a content-addressed file, hashing it on the way.
+
+    The file is named after its SHA-256, so uploading the same recording twice
+    stores it once.
+
+    Args:
+        chunks: The content
+        directory: Directory the file is stored in (created if needed)
+        suffix: File extension, e.g. ".wav"
+
+    Returns:
+        (path, sha256 hex digest, size in bytes)
+    """
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = os.path.join(directory, f".{uuid.uuid4()}.part")
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(tmp_path, "wb") as f:
+            async for chunk in chunks:
+                await asyncio.to_thread(_write_hashed, f, digest, chunk)
+                size += len(chunk)
+        path = os.path.join(directory, f"{digest.hexdigest()}{suffix}")
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return path, digest.hexdigest(), size
+
+
+async def spool(
+    chunks: AsyncIterator[bytes], max_memory: int = SPOOL_MAX_MEMORY
+) -> tempfile.SpooledTemporaryFile:
+    """
+    Buffer a stream for a decoder that needs a seekable file.
+
+    Returns:
+        The content, rewound; in memory up to max_memory bytes, on disk beyond (the caller closes it)
+    """
+    buffer = tempfile.SpooledTemporaryFile(max_size=max_memory)
+    try:
+        async for chunk in chunks:
+            # Once rolled over, writes go to disk
+            await asyncio.to_thread(buffer.write, chunk)
+        buffer.seek(0)
+    except BaseException:
+        buffer.close()
+        raise
+    return buffer
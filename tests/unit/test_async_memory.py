@@ -0,0 +1,91 @@
+import asyncio
+import threading
+import time
+
+from ollie.memory.async_memory import AsyncMemorySystem
+
+SEARCH_SECONDS = 0.2
+
+
+class SlowMemorySystem:
+    """Stands in for MemorySystem: each search blocks like model inference would."""
+
+    def __init__(self):
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def search_memory(self, query, n_results=5, **filters):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(SEARCH_SECONDS)
+        with self._lock:
+            self.active -= 1
+        return [{"content": query, "metadata": {}, "distance": 0.0}]
+
+
+async def _max_heartbeat_gap(work):
+    """Run `work` alongside a 10ms heartbeat and return the longest gap between beats."""
+    gaps = []
+    done = asyncio.Event()
+
+    async def heartbeat():
+        last = time.perf_counter()
+        while not done.is_set():
+            await asyncio.sleep(0.01)
+            now = time.perf_counter()
+            gaps.append(now - last)
+            last = now
+
+    beat = asyncio.create_task(heartbeat())
+    await asyncio.sleep(0)
+    try:
+        await work()
+    finally:
+        done.set()
+        await beat
+    return max(gaps)
+
+
+def test_blocking_search_stalls_event_loop():
+    memory = SlowMemorySystem()
+
+    async def work():
+        # What `async def chat` used to do: call the sync API inline
+        for _ in range(3):
+            memory.search_memory("hello")
+
+    gap = asyncio.run(_max_heartbeat_gap(work))
+    assert gap >= SEARCH_SECONDS
+
+
+def test_async_search_keeps_event_loop_responsive():
+    memory = AsyncMemorySystem(SlowMemorySystem(), max_workers=2)
+
+    async def work():
+        await asyncio.gather(*(memory.search_memory("hello") for _ in range(3)))
+
+    gap = asyncio.run(_max_heartbeat_gap(work))
+    memory.shutdown()
+    assert gap < SEARCH_SECONDS / 2
+
+
+def test_concurrent_searches_are_bounded_by_worker_pool():
+    slow = SlowMemorySystem()
+    memory = AsyncMemorySystem(slow, max_workers=2)
+
+    async def run():
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            *(memory.search_memory(f"q{i}") for i in range(4))
+        )
+        return time.perf_counter() - start, results
+
+    elapsed, results = asyncio.run(run())
+    memory.shutdown()
+
+    assert [r[0]["content"] for r in results] == ["q0", "q1", "q2", "q3"]
+    assert slow.max_active == 2
+    # Two rounds of two parallel searches, not four sequential ones
+    assert elapsed < 4 * SEARCH_SECONDS
@@ -0,0 +1,77 @@
+import io
+from datetime import date
+
+import numpy as np
+import soundfile as sf
+from sqlalchemy import select
+from sqlalchemy.orm import sessionmaker
+
+from ollie.storage.archive import AudioArchive, read_segment
+from ollie.storage.database import create_db_engine
+from ollie.storage.models import Base, Conversation, Session
+
+
+def write_wav(path, seconds=2.0, sample_rate=16000, freq=440.0):
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    path.parent.mkdir(parents=True, exist_ok=True)
+    sf.write(path, 0.3 * np.sin(2 * np.pi * freq * t), sample_rate, subtype="PCM_16")
+    return path
+
+
+def make_archive(tmp_path, audio_format="flac"):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'ollie.db'}")
+    Base.metadata.create_all(bind=engine)
+    return AudioArchive(
+        str(tmp_path / "audio"), audio_format, sessionmaker(bind=engine)
+    )
+
+
+def test_aged_days_are_archived_deduplicated_and_repointed(tmp_path):
+    archive = make_archive(tmp_path)
+    old_day = tmp_path / "audio" / "2024-01-01"
+    first = write_wav(old_day / "a.wav")
+    duplicate = old_day / "b.wav"
+    duplicate.write_bytes(first.read_bytes())
+    other = write_wav(old_day / "c.wav", freq=220.0)
+    recent = write_wav(tmp_path / "audio" / "2024-01-09" / "d.wav")
+    original_samples, _ = sf.read(first, dtype="int16")
+    with archive.sessions() as db:
+        db.add(Session(id=1))
+        db.add_all(
+            [
+                Conversation(
+                    session_id=1, speaker="User", transcript=p.name, audio_path=str(p)
+                )
+                for p in (first, duplicate, other, recent)
+            ]
+        )
+        db.commit()
+
+    archived = archive.archive_older_than(7, today=date(2024, 1, 10))
+
+    totals = archived["2024-01-01"]
+    assert totals["files"] == 3 and totals["deduplicated"] == 1
+    assert 0 < totals["archived_bytes"] < totals["original_bytes"]
+    assert not old_day.exists() and recent.exists()
+    with archive.sessions() as db:
+        paths = dict(
+            db.execute(select(Conversation.transcript, Conversation.audio_path)).all()
+        )
+    assert paths["a.wav"] == paths["b.wav"] != paths["c.wav"]
+    assert paths["a.wav"].endswith(".flac") and paths["d.wav"] == str(recent)
+    # Lossless round trip
+    assert np.array_equal(sf.read(paths["a.wav"], dtype="int16")[0], original_samples)
+    assert archive.stats()["total"]["saved_bytes"] == totals["saved_bytes"]
+
+
+def test_read_segment_seeks_into_archived_file(tmp_path):
+    archive = make_archive(tmp_path)
+    source = write_wav(tmp_path / "audio" / "2024-01-01" / "a.wav", seconds=3.0)
+    samples, _ = sf.read(source, dtype="int16")
+    archived = archive.archive_file(source)["archived"]
+
+    segment, sample_rate = sf.read(
+        io.BytesIO(read_segment(archived, 1.0, 1.5)), dtype="int16"
+    )
+    assert sample_rate == 16000
+    assert np.array_equal(segment, samples[16000:24000])
@@ -0,0 +1,93 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from ollie.storage.browse import (
+    InvalidCursor,
+    conversation_page,
+    decode_cursor,
+    session_page,
+)
+from ollie.storage.database import (
+    create_async_db_engine,
+    create_db_engine,
+    to_async_url,
+)
+from ollie.storage.models import Base, Conversation, Session
+
+
+def browse(tmp_path, scenario):
+    url = f"sqlite:///{tmp_path / 'ollie.db'}"
+    Base.metadata.create_all(bind=create_db_engine(url))
+    start = datetime(2025, 11, 24, 10, 0)
+
+    async def run():
+        engine = create_async_db_engine(to_async_url(url))
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+        async with sessions() as db:
+            # Sessions 3 and 4 share a start time, so pages must break ties by id
+            for i, offset in enumerate([0, 1, 2, 2, 3]):
+                db.add(Session(id=i + 1, start_time=start + timedelta(hours=offset)))
+            for i in range(7):
+                db.add(
+                    Conversation(
+                        session_id=1,
+                        speaker="User",
+                        transcript=f"m{i}",
+                        timestamp=start + timedelta(seconds=i // 2),
+                    )
+                )
+            db.add(
+                Conversation(
+                    session_id=3, speaker="User", transcript="other", timestamp=start
+                )
+            )
+            await db.commit()
+        async with sessions() as db:
+            result = await scenario(db)
+        await engine.dispose()
+        return result
+
+    return asyncio.run(run())
+
+
+def test_session_pages_cover_every_session_once(tmp_path):
+    async def scenario(db):
+        pages, cursor = [], None
+        while True:
+            rows, cursor = await session_page(db, limit=2, cursor=cursor)
+            pages.append(rows)
+            if cursor is None:
+                return pages
+
+    pages = browse(tmp_path, scenario)
+    assert [[row["id"] for row in page] for page in pages] == [[5, 4], [3, 2], [1]]
+    counts = {row["id"]: row["conversation_count"] for page in pages for row in page}
+    assert counts == {1: 7, 2: 0, 3: 1, 4: 0, 5: 0}
+    assert set(pages[0][0]) == {
+        "id",
+        "start_time",
+        "end_time",
+        "summary",
+        "conversation_count",
+    }
+
+
+def test_conversation_pages_are_ordered_and_scoped_to_the_session(tmp_path):
+    async def scenario(db):
+        first, cursor = await conversation_page(db, session_id=1, limit=4)
+        rest, last_cursor = await conversation_page(
+            db, session_id=1, limit=4, cursor=cursor
+        )
+        return first, rest, last_cursor
+
+    first, rest, last_cursor = browse(tmp_path, scenario)
+    assert [row["transcript"] for row in first + rest] == [f"m{i}" for i in range(7)]
+    assert last_cursor is None
+
+
+def test_invalid_cursor():
+    with pytest.raises(InvalidCursor):
+        decode_cursor("not-a-cursor")
@@ -0,0 +1,123 @@
+import json
+from contextlib import asynccontextmanager
+from importlib import import_module
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import Session
+
+from ollie.core.readiness import ComponentRegistry
+from ollie.llm.context import default_assembler
+from ollie.storage.database import (
+    create_async_db_engine,
+    create_db_engine,
+    to_async_url,
+)
+from ollie.storage.models import Base, Conversation
+
+# The module, not the FastAPI instance ollie.core re-exports as "app"
+core = import_module("ollie.core.app")
+
+
+class FakeMemory:
+    async def search_hierarchical(self, query, **kwargs):
+        return {"sessions": [], "passages": [], "query_embedding": [0.0]}
+
+    async def add_memories(self, texts, metadatas, memory_ids):
+        return memory_ids
+
+
+class FakeScheduler:
+    """Streams Ollama /api/chat chunks; fails after the first token if asked to."""
+
+    def __init__(self, tokens, fail=False):
+        self.tokens = tokens
+        self.fail = fail
+
+    async def stream_chat(self, payload):
+        for token in self.tokens:
+            yield {"message": {"content": token}, "done": False}
+            if self.fail:
+                raise RuntimeError("node went away")
+        yield {"done": True, "model": payload["model"]}
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    url = f"sqlite:///{tmp_path / 'ollie.db'}"
+    Base.metadata.create_all(bind=create_db_engine(url))
+    sessions = async_sessionmaker(
+        create_async_db_engine(to_async_url(url)), expire_on_commit=False
+    )
+
+    @asynccontextmanager
+    async def get_async_db():
+        async with sessions() as db:
+            yield db
+
+    async def unsummarized_session_ids():
+        return []
+
+    components = ComponentRegistry()
+    components.register("memory", FakeMemory)
+    components.register("context", default_assembler)
+    components.start()
+    components.wait()
+    monkeypatch.setattr(core, "components", components)
+    monkeypatch.setattr(core, "get_async_db", get_async_db)
+    monkeypatch.setattr(core, "unsummarized_session_ids", unsummarized_session_ids)
+    monkeypatch.setattr(core, "semantic_cache", None)
+    # Without a context manager the lifespan (real components, HTTP pools) never runs
+    return TestClient(core.app), create_db_engine(url)
+
+
+def read_events(response):
+    events = []
+    for block in response.text.strip().split("\n\n"):
+        event, data = block.split("\n")
+        events.append((event[len("event: ") :], json.loads(data[len("data: ") :])))
+    return events
+
+
+def test_tokens_stream_before_done_and_the_turn_is_saved(client, monkeypatch):
+    http, engine = client
+    monkeypatch.setattr(core, "llm_scheduler", FakeScheduler(["Hel", "lo"]))
+
+    response = http.post("/chat/stream", json={"message": "hi"})
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = read_events(response)
+    assert events[:2] == [("token", {"content": "Hel"}), ("token", {"content": "lo"})]
+    assert events[2][0] == "done" and events[2][1]["response"] == "Hello"
+    assert len(events) == 3
+
+    # The returned session id continues the conversation
+    session_id = events[2][1]["session_id"]
+    again = read_events(
+        http.post("/chat/stream", json={"message": "more", "session_id": session_id})
+    )
+    assert again[-1][1]["session_id"] == session_id
+    with Session(engine) as db:
+        turns = db.execute(
+            select(
+                Conversation.session_id, Conversation.speaker, Conversation.transcript
+            )
+        ).all()
+    assert [tuple(turn) for turn in turns] == [
+        (session_id, "User", "hi"),
+        (session_id, "Ollie", "Hello"),
+        (session_id, "User", "more"),
+        (session_id, "Ollie", "Hello"),
+    ]
+
+
+def test_llm_failure_ends_the_stream_with_an_error_event(client, monkeypatch):
+    http, engine = client
+    monkeypatch.setattr(core, "llm_scheduler", FakeScheduler(["Hel"], fail=True))
+
+    events = read_events(http.post("/chat/stream", json={"message": "hi"}))
+    assert [event for event, _ in events] == ["token", "error"]
+    assert events[1][1]["detail"] == "LLM Error: node went away"
+    with Session(engine) as db:
+        assert db.scalars(select(Conversation)).all() == []
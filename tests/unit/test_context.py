@@ -0,0 +1,69 @@
+from ollie.llm.context import SYSTEM_PREFIX, ContextAssembler
+
+
+def _history(turns):
+    history = []
+    for i in range(turns):
+        history.append({"role": "user", "content": f"question {i} " + "word " * 20})
+        history.append({"role": "assistant", "content": f"answer {i} " + "word " * 20})
+    return history
+
+
+def _shared_prefix(a, b):
+    n = 0
+    while n < min(len(a), len(b)) and a[n] == b[n]:
+        n += 1
+    return n
+
+
+def test_layout_is_system_history_context_message():
+    messages = ContextAssembler().assemble(
+        "hi", _history(1), ["memory one", "memory two"]
+    )
+
+    assert messages[0] == {"role": "system", "content": SYSTEM_PREFIX}
+    assert [m["content"].split()[0] for m in messages[1:3]] == ["question", "answer"]
+    assert (
+        "memory one" in messages[3]["content"]
+        and "memory two" in messages[3]["content"]
+    )
+    assert messages[-1] == {"role": "user", "content": "hi"}
+
+
+def test_consecutive_turns_share_prefix_despite_new_memories():
+    assembler = ContextAssembler()
+    history = _history(3)
+    first = assembler.assemble("next question", history, ["memory A"])
+    second = assembler.assemble(
+        "another question",
+        history + [first[-1], {"role": "assistant", "content": "reply"}],
+        ["memory B"],
+    )
+
+    # System prompt and the whole earlier history are reused
+    assert _shared_prefix(first, second) == 1 + len(history)
+
+
+def test_history_is_trimmed_in_blocks_to_the_budget():
+    assembler = ContextAssembler(num_ctx=600, reserve_tokens=100, history_trim_step=4)
+    history = _history(20)
+    messages = assembler.assemble("hi", history, [])
+    kept = messages[1:-1]
+
+    assert 0 < len(kept) < len(history)
+    assert (len(history) - len(kept)) % 4 == 0
+    assert kept[0]["role"] == "user"
+    assert sum(assembler.counter.count_message(m) for m in messages) <= 600 - 100
+
+    # One more turn does not move the cut point unless it has to
+    longer = assembler.assemble("hi", history + _history(1)[:1], [])
+    assert longer[1] == messages[1]
+
+
+def test_memories_are_limited_to_their_share():
+    assembler = ContextAssembler(num_ctx=400, reserve_tokens=100, memory_share=0.3)
+    memories = [f"memory {i} " + "text " * 30 for i in range(10)]
+    context = assembler.assemble("hi", [], memories)[1]
+
+    assert context["content"].count("memory ") < 10
+    assert "memory 0" in context["content"]
@@ -0,0 +1,49 @@
+import asyncio
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from ollie.storage.database import (
+    create_async_db_engine,
+    create_db_engine,
+    to_async_url,
+)
+from ollie.storage.models import Base, Conversation, Session
+
+
+def test_to_async_url():
+    assert (
+        to_async_url("sqlite:////data/ollie.db") == "sqlite+aiosqlite:////data/ollie.db"
+    )
+    assert (
+        to_async_url("postgresql+asyncpg://db/ollie") == "postgresql+asyncpg://db/ollie"
+    )
+
+
+def test_async_engine_writes_a_turn_in_one_transaction(tmp_path):
+    url = f"sqlite:///{tmp_path / 'ollie.db'}"
+    Base.metadata.create_all(bind=create_db_engine(url))
+
+    async def scenario():
+        engine = create_async_db_engine(to_async_url(url))
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+        async with sessions() as db:
+            session = Session()
+            db.add(session)
+            await db.flush()
+            conv = Conversation(session_id=session.id, speaker="User", transcript="hi")
+            db.add(conv)
+            await db.flush()
+            conv.embedding_id = f"conv_{conv.id}"
+            await db.commit()
+        async with sessions() as db:
+            journal_mode = (await db.execute(text("PRAGMA journal_mode"))).scalar()
+            stored = (await db.scalars(select(Conversation))).one()
+        await engine.dispose()
+        return journal_mode, stored, session.id
+
+    journal_mode, stored, session_id = asyncio.run(scenario())
+    assert journal_mode == "wal"
+    assert (
+        stored.session_id == session_id and stored.embedding_id == f"conv_{stored.id}"
+    )
@@ -0,0 +1,43 @@
+from ollie.memory.dedup import SimHashIndex, hamming_distance, simhash
+
+TEXT = "so I told Maria that we would meet at the cafe on Friday to go over the budget for the trip"
+
+
+def test_simhash_is_stable_and_case_insensitive():
+    assert simhash(TEXT) == simhash(TEXT)
+    assert simhash(TEXT) == simhash(TEXT.upper())
+
+
+def test_unrelated_texts_are_far_apart():
+    other = (
+        "the dog chased the neighbour's cat across the garden until it climbed a tree"
+    )
+    assert hamming_distance(simhash(TEXT), simhash(other)) > 3
+
+
+def test_index_finds_near_duplicates_and_forgets_removed_entries():
+    index = SimHashIndex(max_distance=3)
+    index.add("conv_1", simhash(TEXT), len(TEXT))
+
+    assert index.find(simhash(TEXT + ".")) == ("conv_1", len(TEXT))
+    assert (
+        index.find(simhash("completely unrelated words about gardening and tomatoes"))
+        is None
+    )
+
+    index.remove("conv_1")
+    assert index.find(simhash(TEXT)) is None
+    assert len(index) == 0
+
+
+def test_index_matches_any_fingerprint_within_max_distance():
+    index = SimHashIndex(max_distance=3)
+    fingerprint = simhash(TEXT)
+    index.add("conv_1", fingerprint, len(TEXT))
+
+    # Flip three bits spread over different bands
+    assert index.find(fingerprint ^ (1 << 0) ^ (1 << 20) ^ (1 << 40))[0] == "conv_1"
+    # Four flipped bits exceed the threshold
+    assert (
+        index.find(fingerprint ^ (1 << 0) ^ (1 << 20) ^ (1 << 40) ^ (1 << 60)) is None
+    )
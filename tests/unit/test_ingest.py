@@ -0,0 +1,100 @@
+import asyncio
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from ollie.core.ingest import FAILED, IngestQueue
+from ollie.storage.database import (
+    create_async_db_engine,
+    create_db_engine,
+    to_async_url,
+)
+from ollie.storage.models import Base, Conversation, IngestItem
+
+
+class FakeMemory:
+    def __init__(self, fail_on=None):
+        self.calls = []
+        self.fail_on = fail_on
+
+    async def add_memories(self, texts, metadatas, memory_ids):
+        if self.fail_on and self.fail_on in texts:
+            raise RuntimeError("embedding failed")
+        self.calls.append(list(texts))
+        # Merge "again" into the first memory, as ingest dedup would
+        return [
+            "conv_1" if text == "again" else memory_id
+            for text, memory_id in zip(texts, memory_ids)
+        ]
+
+
+def run_with_queue(tmp_path, memory, scenario, **kwargs):
+    url = f"sqlite:///{tmp_path / 'ollie.db'}"
+    Base.metadata.create_all(bind=create_db_engine(url))
+
+    async def wrapper():
+        engine = create_async_db_engine(to_async_url(url))
+        queue = IngestQueue(
+            memory, async_sessionmaker(engine, expire_on_commit=False), **kwargs
+        )
+        try:
+            return await scenario(queue)
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(wrapper())
+
+
+def test_batch_is_stored_and_indexed_together(tmp_path):
+    memory = FakeMemory()
+
+    async def scenario(queue):
+        first = await queue.enqueue("hello", source="streaming")
+        for transcript in ("how are you", "again"):
+            await queue.enqueue(transcript, first.session_id)
+        done = await queue.run_once()
+        async with queue.sessions() as db:
+            conversations = (
+                await db.scalars(select(Conversation).order_by(Conversation.id))
+            ).all()
+            queued = (await db.scalars(select(IngestItem))).all()
+        return done, conversations, queued, await queue.status()
+
+    done, conversations, queued, status = run_with_queue(tmp_path, memory, scenario)
+    assert done == 3
+    assert memory.calls == [["hello", "how are you", "again"]]
+    assert [c.transcript for c in conversations] == ["hello", "how are you", "again"]
+    assert len({c.session_id for c in conversations}) == 1
+    assert [c.embedding_id for c in conversations] == ["conv_1", "conv_2", "conv_1"]
+    # Indexed items are deleted; the conversations table holds their transcripts
+    assert queued == []
+    assert status["backlog"] == 0 and sum(status["counts"].values()) == 0
+
+
+def test_failing_item_backs_off_without_blocking_the_batch(tmp_path):
+    memory = FakeMemory(fail_on="bad")
+
+    async def scenario(queue):
+        for transcript in ("good", "bad", "fine"):
+            await queue.enqueue(transcript)
+        first = await queue.run_once()
+        second = await queue.run_once()
+        status = await queue.status()
+        memory.fail_on = None
+        requeued = await queue.retry_failed()
+        third = await queue.run_once()
+        async with queue.sessions() as db:
+            conversations = (await db.scalars(select(Conversation))).all()
+            queued = (await db.scalars(select(IngestItem))).all()
+        return first, second, status, requeued, third, conversations, queued
+
+    first, second, status, requeued, third, conversations, queued = run_with_queue(
+        tmp_path, memory, scenario, max_attempts=2, retry_base_seconds=0
+    )
+    assert first == 2 and second == 0
+    assert status["counts"][FAILED] == 1
+    assert status["recent_failures"][0]["last_error"] == "embedding failed"
+    assert requeued == 1 and third == 1
+    # The failed item's conversation was stored once and only indexed on retry
+    assert sorted(c.transcript for c in conversations) == ["bad", "fine", "good"]
+    assert queued == []
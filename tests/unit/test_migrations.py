@@ -0,0 +1,55 @@
+import sqlite3
+
+from sqlalchemy import inspect, text
+
+from ollie.storage.database import create_db_engine
+from ollie.storage.migrations import LATEST_VERSION, migrate
+from ollie.storage.models import Base
+
+LEGACY_SCHEMA = """
+CREATE TABLE sessions (id INTEGER PRIMARY KEY, start_time DATETIME, end_time DATETIME, summary TEXT);
+CREATE TABLE conversations (
+    id INTEGER PRIMARY KEY, session_id INTEGER REFERENCES sessions(id), timestamp DATETIME,
+    speaker VARCHAR(50), transcript TEXT, audio_path VARCHAR(255), embedding_id VARCHAR(100)
+);
+CREATE TABLE metadata (key VARCHAR(50) PRIMARY KEY, value TEXT);
+INSERT INTO sessions (id, start_time) VALUES (1, '2025-11-24 10:00:00');
+INSERT INTO conversations (session_id, timestamp, speaker, transcript) VALUES (1, '2025-11-24 10:00:01', 'User', 'hi');
+"""
+
+
+def index_names(engine, table):
+    return {index["name"] for index in inspect(engine).get_indexes(table)}
+
+
+def test_legacy_database_is_upgraded_in_place(tmp_path):
+    db_path = tmp_path / "ollie.db"
+    with sqlite3.connect(db_path) as conn:
+        conn.executescript(LEGACY_SCHEMA)
+
+    engine = create_db_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(bind=engine)
+    assert migrate(engine) == LATEST_VERSION
+
+    assert {
+        "ix_conversations_session_timestamp",
+        "ix_conversations_timestamp",
+    } <= index_names(engine, "conversations")
+    assert "ix_sessions_start_time" in index_names(engine, "sessions")
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA user_version")).scalar() == LATEST_VERSION
+        assert conn.execute(text("SELECT count(*) FROM conversations")).scalar() == 1
+    # Already current: nothing to do
+    assert migrate(engine) == LATEST_VERSION
+
+
+def test_fresh_database_gets_indexes_and_pragmas(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+    Base.metadata.create_all(bind=engine)
+    migrate(engine)
+
+    assert "ix_conversations_session_timestamp" in index_names(engine, "conversations")
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 5000
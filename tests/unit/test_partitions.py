@@ -0,0 +1,44 @@
+from datetime import datetime, timedelta, timezone
+
+from ollie.memory.partitions import (
+    memory_timestamp,
+    partition_bounds,
+    partition_key,
+    route_partitions,
+    to_utc,
+    utc_epoch,
+)
+
+KEYS = ["202511", "202512", "202601", "202602", "202603"]
+
+
+def test_partition_bounds_roll_over_the_year():
+    assert partition_key(datetime(2025, 12, 31, 23, 59)) == "202512"
+    assert partition_bounds("202512") == (datetime(2025, 12, 1), datetime(2026, 1, 1))
+
+
+def test_without_time_filter_only_recent_partitions_are_searched():
+    assert route_partitions(KEYS, recent=2) == ["202603", "202602"]
+    assert route_partitions(KEYS) == sorted(KEYS, reverse=True)
+
+
+def test_time_filter_selects_overlapping_partitions():
+    assert route_partitions(
+        KEYS, since=datetime(2025, 12, 20), until=datetime(2026, 1, 5)
+    ) == ["202601", "202512"]
+    assert route_partitions(KEYS, since=datetime(2026, 2, 1)) == ["202603", "202602"]
+    assert route_partitions(KEYS, until=datetime(2025, 11, 30)) == ["202511"]
+
+
+def test_timezone_aware_bounds_are_routed_as_utc():
+    since = datetime(2026, 2, 1, 0, 30, tzinfo=timezone(timedelta(hours=1)))
+    assert to_utc(since) == datetime(2026, 1, 31, 23, 30)
+    assert route_partitions(KEYS, since=to_utc(since)) == ["202603", "202602", "202601"]
+    assert (
+        utc_epoch(since)
+        == utc_epoch(datetime(2026, 1, 31, 23, 30))
+        == since.timestamp()
+    )
+    assert memory_timestamp({"timestamp": "2026-02-01T00:30:00+01:00"}) == datetime(
+        2026, 1, 31, 23, 30
+    )
@@ -0,0 +1,115 @@
+import asyncio
+import json
+
+import httpx
+
+from ollie.llm.pool import OllamaPool
+from ollie.llm.scheduler import OllamaScheduler
+
+
+def _pool(nodes):
+    """Pool over fake nodes: url -> {"installed", "loaded", "down"}; records chat calls per url."""
+    calls = []
+
+    def client_factory(url):
+        def handler(request):
+            node = nodes[url]
+            if node.get("down"):
+                raise httpx.ConnectError("connection refused", request=request)
+            if request.url.path == "/api/tags":
+                return httpx.Response(
+                    200, json={"models": [{"name": m} for m in node["installed"]]}
+                )
+            if request.url.path == "/api/ps":
+                return httpx.Response(
+                    200, json={"models": [{"name": m} for m in node["loaded"]]}
+                )
+            calls.append(url)
+            model = json.loads(request.content)["model"]
+            return httpx.Response(
+                200, json={"model": model, "message": {"content": url}}
+            )
+
+        return httpx.AsyncClient(base_url=url, transport=httpx.MockTransport(handler))
+
+    pool = OllamaPool(list(nodes), client_factory)
+    pool.start()
+    return pool, calls
+
+
+def test_routes_to_warm_node_then_least_outstanding():
+    pool, _ = _pool(
+        {
+            "http://a": {"installed": ["llama3.1:8b"], "loaded": []},
+            "http://b": {"installed": ["llama3.1:8b"], "loaded": ["llama3.1:8b"]},
+            "http://c": {"installed": ["llama3.1:8b"], "loaded": ["llama3.1:8b"]},
+        }
+    )
+    asyncio.run(pool.check_all())
+
+    assert pool.pick("llama3.1:8b").url == "http://b"
+    pool.nodes[1].outstanding = 2
+    assert pool.pick("llama3.1:8b").url == "http://c"
+    # A cold node is only used once every warm node is excluded
+    assert pool.pick("llama3.1:8b", exclude={"http://b", "http://c"}).url == "http://a"
+
+
+def test_warm_nodes_at_their_cap_spill_over_to_cold_nodes():
+    pool, _ = _pool(
+        {
+            "http://a": {"installed": ["llama3.1:8b"], "loaded": ["llama3.1:8b"]},
+            "http://b": {"installed": ["llama3.1:8b"], "loaded": []},
+            "http://c": {"installed": ["llama3.1:8b"], "loaded": []},
+        }
+    )
+    pool.max_outstanding = 2
+    asyncio.run(pool.check_all())
+
+    routed = []
+    for _ in range(6):
+        node = pool.pick("llama3.1:8b")
+        node.outstanding += 1
+        routed.append(node.url)
+    # The warm node fills up to its cap, then the load spreads over the cold ones
+    assert routed[:2] == ["http://a", "http://a"]
+    assert sorted(routed[2:]) == ["http://b", "http://b", "http://c", "http://c"]
+    assert [node.outstanding for node in pool.nodes] == [2, 2, 2]
+
+
+def test_skips_unhealthy_nodes_and_nodes_without_the_model():
+    pool, _ = _pool(
+        {
+            "http://a": {
+                "installed": ["llama3.1:8b"],
+                "loaded": ["llama3.1:8b"],
+                "down": True,
+            },
+            "http://b": {"installed": ["tinyllama:latest"], "loaded": []},
+            "http://c": {"installed": ["llama3.1:8b"], "loaded": []},
+        }
+    )
+    asyncio.run(pool.check_all())
+
+    assert not pool.nodes[0].healthy
+    assert pool.pick("llama3.1:8b").url == "http://c"
+    assert pool.pick("tinyllama").url == "http://b"
+
+
+def test_scheduler_fails_over_to_another_node():
+    nodes = {
+        "http://a": {"installed": ["llama3.1:8b"], "loaded": ["llama3.1:8b"]},
+        "http://b": {"installed": ["llama3.1:8b"], "loaded": []},
+    }
+    pool, calls = _pool(nodes)
+    scheduler = OllamaScheduler(pool, primary_model="llama3.1:8b", max_concurrent=2)
+
+    async def run():
+        await pool.check_all()
+        nodes["http://a"]["down"] = True
+        return await scheduler.chat({"model": "llama3.1:8b", "messages": []})
+
+    result = asyncio.run(run())
+    assert result["message"]["content"] == "http://b"
+    assert not pool.nodes[0].healthy
+    # b has the model loaded now
+    assert "llama3.1:8b" in pool.nodes[1].loaded
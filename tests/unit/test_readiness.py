@@ -0,0 +1,66 @@
+import threading
+from importlib import import_module
+
+from fastapi.testclient import TestClient
+
+from ollie.core.readiness import ComponentRegistry
+
+# The module, not the FastAPI instance ollie.core re-exports as "app"
+core = import_module("ollie.core.app")
+
+
+def test_ready_waits_for_slow_components_while_health_answers(monkeypatch):
+    release = threading.Event()
+    components = ComponentRegistry()
+    components.register("database", lambda: "db")
+    components.register("memory", lambda: release.wait(5) and "memory")
+    components.register("warmup", lambda: release.wait(5), required=False)
+    monkeypatch.setattr(core, "components", components)
+    client = TestClient(core.app)
+
+    components.start()
+    try:
+        assert client.get("/health").json() == {"status": "ok"}
+        response = client.get("/ready")
+        assert response.status_code == 503
+        assert response.json()["ready"] is False
+        assert response.json()["components"]["memory"]["state"] in (
+            "pending",
+            "loading",
+        )
+        # Endpoints needing a component still loading answer 503 with Retry-After
+        history = client.get("/history", params={"query": "hi"})
+        assert history.status_code == 503 and history.headers["Retry-After"] == "5"
+    finally:
+        release.set()
+    assert components.wait(5)
+
+    response = client.get("/ready")
+    assert response.status_code == 200
+    assert {
+        name: status["state"] for name, status in response.json()["components"].items()
+    } == {"database": "ready", "memory": "ready", "warmup": "ready"}
+
+
+def test_failed_component_is_reported(monkeypatch):
+    def broken():
+        raise RuntimeError("chroma directory is not writable")
+
+    components = ComponentRegistry()
+    components.register("database", lambda: "db")
+    components.register("memory", broken)
+    monkeypatch.setattr(core, "components", components)
+    client = TestClient(core.app)
+
+    components.start()
+    assert components.wait(5)
+
+    response = client.get("/ready")
+    assert response.status_code == 503
+    memory = response.json()["components"]["memory"]
+    assert memory["state"] == "failed"
+    assert memory["error"] == "chroma directory is not writable"
+    assert response.json()["components"]["database"]["state"] == "ready"
+    # A required component that cannot load fails liveness too, so the pod restarts
+    health = client.get("/health")
+    assert health.status_code == 503 and health.json()["status"] == "failed"
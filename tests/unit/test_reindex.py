@@ -0,0 +1,139 @@
+import json
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import sessionmaker
+
+from ollie.memory.reindex import (
+    RETIRED_GENERATIONS_KEY,
+    load_reindex_state,
+    reindex_conversations,
+)
+from ollie.storage.database import create_db_engine
+from ollie.storage.models import Base, Conversation, Metadata, Session
+
+
+class FakeMemory:
+    """Records what a re-index writes to each generation."""
+
+    def __init__(self, generation="memories", fail_on_call=None, on_activate=None):
+        self.generation = generation
+        self.embedding_service = SimpleNamespace(model_name="fake-model")
+        self.indexed = {}
+        self.dropped = []
+        self.calls = 0
+        self.fail_on_call = fail_on_call
+        self.on_activate = on_activate
+
+    def add_memories(self, texts, metadatas, memory_ids, generation, embedding_service):
+        self.calls += 1
+        if self.calls == self.fail_on_call:
+            raise RuntimeError("embedding failed")
+        self.indexed.setdefault(generation, []).extend(memory_ids)
+
+    def summary_collection_for(self, generation):
+        return f"{generation}_summaries"
+
+    def add_session_summaries(self, **kwargs):
+        pass
+
+    def activate_collection(self, name, embedding_service, drop_previous=True):
+        previous, self.generation = self.generation, name
+        if self.on_activate:
+            self.on_activate()
+        if drop_previous:
+            self.drop_generation(previous)
+
+    def drop_generation(self, generation):
+        self.dropped.append(generation)
+
+
+def make_sessions(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'ollie.db'}")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)
+
+
+def add_turns(sessions, texts):
+    with sessions() as db:
+        if db.get(Session, 1) is None:
+            db.add(Session(id=1))
+        for i, text in enumerate(texts):
+            db.add(
+                Conversation(
+                    session_id=1,
+                    speaker="User",
+                    transcript=text,
+                    timestamp=datetime(2024, 1, 1) + timedelta(seconds=i),
+                )
+            )
+        db.commit()
+
+
+def embedding_ids(sessions):
+    with sessions() as db:
+        return db.scalars(
+            select(Conversation.embedding_id).order_by(Conversation.id)
+        ).all()
+
+
+def load_retired(sessions):
+    with sessions() as db:
+        row = db.get(Metadata, RETIRED_GENERATIONS_KEY)
+        return json.loads(row.value)
+
+
+def test_interrupted_reindex_resumes_from_checkpoint(tmp_path):
+    sessions = make_sessions(tmp_path)
+    add_turns(sessions, ["one", "two", "", "four", "five"])
+    memory = FakeMemory(fail_on_call=2)
+
+    with pytest.raises(RuntimeError):
+        reindex_conversations(memory, batch_size=2, sessions=sessions)
+    checkpoint = load_reindex_state(sessions)
+    assert checkpoint["last_id"] == 2 and checkpoint["indexed"] == 2
+    assert embedding_ids(sessions) == ["conv_1", "conv_2", None, None, None]
+    assert memory.generation == "memories"
+
+    state = reindex_conversations(memory, batch_size=2, sessions=sessions)
+    assert state["collection"] == checkpoint["collection"]
+    # Resumed after conversation 2; the blank turn is skipped but checkpointed past
+    assert memory.indexed[state["collection"]] == [
+        "conv_1",
+        "conv_2",
+        "conv_4",
+        "conv_5",
+    ]
+    assert state["indexed"] == 4
+    assert embedding_ids(sessions) == ["conv_1", "conv_2", None, "conv_4", "conv_5"]
+    assert memory.generation == state["collection"]
+    assert load_reindex_state(sessions) is None
+
+
+def test_rows_written_during_the_swap_are_caught_up(tmp_path):
+    sessions = make_sessions(tmp_path)
+    add_turns(sessions, ["one", "two"])
+    memory = FakeMemory(on_activate=lambda: add_turns(sessions, ["during swap"]))
+
+    state = reindex_conversations(memory, batch_size=10, sessions=sessions)
+    assert memory.generation == state["collection"]
+    assert memory.indexed[state["collection"]] == ["conv_1", "conv_2", "conv_3"]
+    assert embedding_ids(sessions) == ["conv_1", "conv_2", "conv_3"]
+    assert memory.dropped == ["memories"]
+
+
+def test_offline_reindex_retires_previous_generation_for_the_server(tmp_path):
+    sessions = make_sessions(tmp_path)
+    add_turns(sessions, ["one"])
+    memory = FakeMemory(generation="memories_old")
+
+    offline = reindex_conversations(memory, sessions=sessions, drop_previous=False)
+    assert memory.generation == offline["collection"]
+    assert memory.dropped == []
+    assert load_retired(sessions) == ["memories_old"]
+
+    reindex_conversations(memory, sessions=sessions)
+    assert "memories_old" in memory.dropped
+    assert load_retired(sessions) == []
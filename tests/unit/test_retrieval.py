@@ -0,0 +1,86 @@
+import numpy as np
+
+from ollie.memory.retrieval import MemorySystem
+
+VOCABULARY = ["coffee", "paris", "dentist", "tuesday", "guitar"]
+
+
+class FakeEmbeddings:
+    """Bag-of-words vectors over a tiny vocabulary."""
+
+    model_name = "fake"
+
+    def generate_embeddings(self, texts):
+        vectors = []
+        for text in texts:
+            vector = np.array([float(w in text.lower()) for w in VOCABULARY]) + 0.01
+            vectors.append((vector / np.linalg.norm(vector)).tolist())
+        return vectors
+
+
+def add_passages(memory, passages):
+    memory.add_memories(
+        texts=[text for _, text in passages],
+        metadatas=[
+            {
+                "speaker": "User",
+                "session_id": session_id,
+                "timestamp": f"2026-01-0{session_id}T10:00:00",
+                "type": "conversation",
+            }
+            for session_id, _ in passages
+        ],
+        memory_ids=[f"conv_{i}" for i in range(len(passages))],
+    )
+
+
+def session_ids(passages):
+    return {p["metadata"]["session_id"] for p in passages}
+
+
+def test_hierarchical_search_only_returns_turns_of_selected_sessions(tmp_path):
+    memory = MemorySystem(
+        persist_path=str(tmp_path / "chroma"),
+        embedding_service=FakeEmbeddings(),
+        dedup_max_distance=None,
+    )
+    add_passages(
+        memory,
+        [
+            (1, "coffee in paris"),
+            (1, "the paris trip"),
+            (2, "dentist on tuesday"),
+            (3, "more coffee please"),
+        ],
+    )
+
+    # No summaries yet: flat search over every session
+    flat = memory.search_hierarchical("coffee", n_sessions=1, n_results=4)
+    assert flat["sessions"] == []
+    assert session_ids(flat["passages"]) == {1, 2, 3}
+
+    memory.add_session_summaries(
+        session_ids=[1, 2],
+        summaries=["A coffee trip to paris", "Booked the dentist for tuesday"],
+        metadatas=[
+            {
+                "session_id": session_id,
+                "start_time": f"2026-01-0{session_id}T09:00:00",
+                "end_time": f"2026-01-0{session_id}T11:00:00",
+                "type": "session_summary",
+            }
+            for session_id in (1, 2)
+        ],
+    )
+
+    # Session 3 also mentions coffee, but only the selected session is searched
+    result = memory.search_hierarchical("coffee", n_sessions=1, n_results=4)
+    assert [s["metadata"]["session_id"] for s in result["sessions"]] == [1]
+    assert session_ids(result["passages"]) == {1}
+    assert len(result["passages"]) == 2
+
+    # Unsummarized sessions passed in are searched as well
+    result = memory.search_hierarchical(
+        "coffee", n_sessions=1, n_results=4, extra_session_ids=[3]
+    )
+    assert session_ids(result["passages"]) == {1, 3}
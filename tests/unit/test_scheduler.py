@@ -0,0 +1,112 @@
+import asyncio
+import json
+
+import httpx
+
+from ollie.llm.pool import OllamaPool
+from ollie.llm.scheduler import OllamaScheduler
+from ollie.utils.concurrency import BACKGROUND, INTERACTIVE, PrioritySemaphore
+
+
+def test_waiting_interactive_requests_go_before_background():
+    async def run():
+        slots = PrioritySemaphore(1)
+        order = []
+
+        async def worker(name, priority):
+            await slots.acquire(priority)
+            order.append(name)
+            await asyncio.sleep(0.01)
+            slots.release()
+
+        await slots.acquire()
+        tasks = [
+            asyncio.create_task(worker("summary-1", BACKGROUND)),
+            asyncio.create_task(worker("summary-2", BACKGROUND)),
+            asyncio.create_task(worker("chat", INTERACTIVE)),
+        ]
+        await asyncio.sleep(0.01)
+        slots.release()
+        await asyncio.gather(*tasks)
+        return order
+
+    assert asyncio.run(run()) == ["chat", "summary-1", "summary-2"]
+
+
+def test_cancelled_waiter_does_not_leak_a_slot():
+    async def run():
+        slots = PrioritySemaphore(1)
+        await slots.acquire()
+        waiter = asyncio.create_task(slots.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        slots.release()
+        await asyncio.wait_for(slots.acquire(), timeout=1)
+
+    asyncio.run(run())
+
+
+def _scheduler(failing_models, cooldown_seconds=300):
+    calls = []
+
+    def handler(request):
+        model = json.loads(request.content)["model"]
+        calls.append(model)
+        if model in failing_models:
+            return httpx.Response(500, json={"error": "out of memory"})
+        return httpx.Response(
+            200, json={"model": model, "message": {"content": f"from {model}"}}
+        )
+
+    pool = OllamaPool(
+        ["http://ollama"],
+        lambda url: httpx.AsyncClient(
+            base_url=url, transport=httpx.MockTransport(handler)
+        ),
+    )
+    pool.start()
+    scheduler = OllamaScheduler(
+        pool,
+        primary_model="big",
+        fallback_model="small",
+        cooldown_seconds=cooldown_seconds,
+    )
+    return scheduler, calls
+
+
+def test_fallback_sticks_until_cooldown():
+    scheduler, calls = _scheduler(failing_models={"big"})
+
+    async def run():
+        first = await scheduler.chat({"model": "big", "messages": []})
+        second = await scheduler.chat({"model": "big", "messages": []})
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first["message"]["content"] == "from small"
+    assert second["message"]["content"] == "from small"
+    # The primary model is not retried on the second request
+    assert calls == ["big", "small", "small"]
+
+
+def test_primary_is_probed_again_after_cooldown():
+    scheduler, calls = _scheduler(failing_models={"big"}, cooldown_seconds=0)
+
+    async def run():
+        await scheduler.chat({"model": "big", "messages": []})
+        return await scheduler.chat({"model": "big", "messages": []})
+
+    asyncio.run(run())
+    assert calls == ["big", "small", "big", "small"]
+    assert scheduler.breaker.state == scheduler.breaker.OPEN
+
+
+def test_successful_probe_closes_the_breaker():
+    scheduler, calls = _scheduler(failing_models=set())
+    scheduler.breaker.record_failure("big")
+    scheduler.breaker.opened_at -= 301
+
+    result = asyncio.run(scheduler.chat({"model": "big", "messages": []}))
+    assert result["message"]["content"] == "from big"
+    assert scheduler.breaker.state == scheduler.breaker.CLOSED
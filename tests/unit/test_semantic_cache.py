@@ -0,0 +1,100 @@
+import time
+
+from ollie.core.semantic_cache import SemanticCache
+
+MEMORIES = [
+    {"id": "conv_1", "content": "I planted tomatoes on Sunday"},
+    {"id": "conv_2", "content": "The peppers did badly last year"},
+    {"id": "conv_3", "content": "Buy basil seeds"},
+]
+
+
+def test_similar_query_over_same_memories_hits():
+    cache = SemanticCache(threshold=0.95)
+    cache.store([1.0, 0.0, 0.1], "llama", "gen", MEMORIES, "You planted tomatoes.")
+
+    entry = cache.lookup([1.0, 0.01, 0.1], "llama", "gen", MEMORIES)
+    assert entry is not None and entry.response == "You planted tomatoes."
+    assert cache.hits == 1
+
+
+def test_dissimilar_query_or_other_model_misses():
+    cache = SemanticCache(threshold=0.95)
+    cache.store([1.0, 0.0, 0.0], "llama", "gen", MEMORIES, "answer")
+
+    assert cache.lookup([0.0, 1.0, 0.0], "llama", "gen", MEMORIES) is None
+    assert cache.lookup([1.0, 0.0, 0.0], "tinyllama", "gen", MEMORIES) is None
+    assert cache.lookup([1.0, 0.0, 0.0], "llama", "gen2", MEMORIES) is None
+    assert cache.misses == 3
+
+
+def test_other_session_history_misses():
+    cache = SemanticCache()
+    garden = [
+        {"role": "user", "content": "What did I plant?"},
+        {"role": "assistant", "content": "Tomatoes."},
+    ]
+    car = [
+        {"role": "user", "content": "When is the car due?"},
+        {"role": "assistant", "content": "In May."},
+    ]
+    cache.store(
+        [1.0, 0.0], "llama", "gen", MEMORIES, "Tomatoes need sun.", history=garden
+    )
+
+    # "Tell me more" embeds the same whichever conversation it follows
+    assert cache.lookup([1.0, 0.0], "llama", "gen", MEMORIES, history=car) is None
+    assert cache.lookup([1.0, 0.0], "llama", "gen", MEMORIES) is None
+    assert (
+        cache.lookup(
+            [1.0, 0.0], "llama", "gen", MEMORIES, history=list(garden)
+        ).response
+        == "Tomatoes need sun."
+    )
+
+
+def test_changed_memories_miss():
+    cache = SemanticCache()
+    cache.store([1.0, 0.0], "llama", "gen", MEMORIES, "answer")
+
+    edited = [dict(MEMORIES[0], content="I planted tomatoes on Monday")] + MEMORIES[1:]
+    new_memory = [{"id": "conv_9", "content": "Tomatoes died"}] + MEMORIES[:2]
+    assert cache.lookup([1.0, 0.0], "llama", "gen", edited) is None
+    assert cache.lookup([1.0, 0.0], "llama", "gen", new_memory) is None
+
+
+def test_own_turn_memories_are_ignored():
+    cache = SemanticCache()
+    entry = cache.store([1.0, 0.0], "llama", "gen", MEMORIES, "answer")
+    cache.claim(entry, ["conv_10", "conv_11"])
+
+    # The indexed question and answer now rank first and push out the tail
+    retrieved = [
+        {"id": "conv_10", "content": "what did I plant?"},
+        {"id": "conv_11", "content": "answer"},
+        MEMORIES[0],
+    ]
+    assert cache.lookup([1.0, 0.0], "llama", "gen", retrieved) is entry
+    # ...but not if they displaced anything other than the lowest-ranked memories
+    retrieved = [
+        {"id": "conv_10", "content": "what did I plant?"},
+        MEMORIES[1],
+        MEMORIES[2],
+    ]
+    assert cache.lookup([1.0, 0.0], "llama", "gen", retrieved) is None
+
+
+def test_ttl_and_lru_eviction():
+    cache = SemanticCache(ttl_seconds=0.05, max_entries=2)
+    cache.store([1.0, 0.0, 0.0], "llama", "gen", MEMORIES, "a")
+    cache.store([0.0, 1.0, 0.0], "llama", "gen", MEMORIES, "b")
+    assert cache.lookup([1.0, 0.0, 0.0], "llama", "gen", MEMORIES).response == "a"
+
+    # "b" is now least recently used
+    cache.store([0.0, 0.0, 1.0], "llama", "gen", MEMORIES, "c")
+    assert len(cache) == 2
+    assert cache.lookup([0.0, 1.0, 0.0], "llama", "gen", MEMORIES) is None
+
+    time.sleep(0.06)
+    assert cache.lookup([1.0, 0.0, 0.0], "llama", "gen", MEMORIES) is None
+    assert len(cache) == 0
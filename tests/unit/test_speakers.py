@@ -0,0 +1,45 @@
+import pytest
+import torch
+
+from ollie.tts.speakers import SpeakerStore
+
+
+def test_register_and_list_voices(tmp_path):
+    store = SpeakerStore(str(tmp_path))
+    voice = store.register("rafa", b"RIFF reference")
+
+    assert store.reference("rafa") == voice["path"]
+    assert store.reference("unknown") is None
+    # The index survives restarts
+    assert [v["name"] for v in SpeakerStore(str(tmp_path)).voices()] == ["rafa"]
+
+    with pytest.raises(ValueError):
+        store.register("../escape", b"RIFF")
+
+
+def test_conditioning_is_computed_once_per_clip_and_persisted(tmp_path):
+    reference = tmp_path / "ref.wav"
+    reference.write_bytes(b"RIFF reference")
+    calls = []
+
+    def compute(path):
+        calls.append(path)
+        return torch.ones(1, 4), torch.zeros(1, 2)
+
+    store = SpeakerStore(str(tmp_path / "voices"))
+    first = store.conditioning(str(reference), "xtts", compute)
+    store.conditioning(str(reference), "xtts", compute)
+    assert len(calls) == 1
+
+    # A new process loads the latents from disk instead of recomputing them
+    gpt_cond_latent, speaker_embedding = SpeakerStore(
+        str(tmp_path / "voices")
+    ).conditioning(str(reference), "xtts", compute)
+    assert len(calls) == 1
+    assert torch.equal(gpt_cond_latent, first[0]) and torch.equal(
+        speaker_embedding, first[1]
+    )
+
+    # Latents are model specific
+    store.conditioning(str(reference), "other/model", compute)
+    assert len(calls) == 2
@@ -0,0 +1,92 @@
+import asyncio
+import wave
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+pytest.importorskip("faster_whisper")
+
+from ollie.core.app import speculative_match  # noqa: E402
+from ollie.transcription.streaming import StreamingSession  # noqa: E402
+
+SAMPLE_RATE = 16000
+
+
+class FakeModel:
+    """Transcribes every second of audio as one word: w0 w1 w2 ..."""
+
+    def transcribe(self, wav_buffer, **kwargs):
+        with wave.open(wav_buffer, "rb") as wav_file:
+            seconds = wav_file.getnframes() // SAMPLE_RATE
+        return [SimpleNamespace(text=words(seconds))], None
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.client_state = SimpleNamespace(name="CONNECTED")
+        self.sent = []
+
+    async def send_json(self, data):
+        self.sent.append(data)
+
+
+def words(seconds):
+    return " ".join(f"w{i}" for i in range(seconds))
+
+
+def make_session(max_utterance_samples=None):
+    return StreamingSession(
+        session_id="s",
+        websocket=FakeWebSocket(),
+        window_size_samples=5 * SAMPLE_RATE,
+        overlap_samples=SAMPLE_RATE,
+        sample_rate=SAMPLE_RATE,
+        model=FakeModel(),
+        max_utterance_samples=max_utterance_samples,
+    )
+
+
+async def speak(session, seconds):
+    second = np.zeros(SAMPLE_RATE, dtype=np.int16).tobytes()
+    for _ in range(seconds):
+        await session.add_audio_chunk(second)
+        if session.processing_task:
+            await session.processing_task
+
+
+def test_utterance_longer_than_window_is_transcribed_whole():
+    session = make_session(max_utterance_samples=30 * SAMPLE_RATE)
+
+    async def scenario():
+        await speak(session, 9)
+        await session.finalize()
+
+    asyncio.run(scenario())
+    partials = [e["full_text"] for e in session.websocket.sent if not e["is_final"]]
+    final = session.websocket.sent[-1]
+    assert final["type"] == "transcription_final"
+    assert final["text"] == words(9)
+    # Partials cover the utterance from its start, not the last 5 s window...
+    assert partials == [words(n) for n in range(5, 10)]
+    # ...so retrieval started on one of them is kept for the final transcript
+    assert speculative_match(partials[-2], final["text"])
+
+
+def test_utterance_is_capped():
+    session = make_session(max_utterance_samples=6 * SAMPLE_RATE)
+    asyncio.run(speak(session, 9))
+    assert len(session.utterance) == 2 * 6 * SAMPLE_RATE
+
+
+def test_rolling_window_session_keeps_no_utterance():
+    session = make_session()
+
+    async def scenario():
+        await speak(session, 9)
+        await session.finalize()
+
+    asyncio.run(scenario())
+    assert session.utterance is None
+    # The final transcript covers the rolling window (5 s plus 1 s of overlap)
+    assert session.websocket.sent[-1]["text"] == words(6)
@@ -0,0 +1,128 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from ollie.memory.summaries import SessionSummarizer, unsummarized_session_ids
+from ollie.storage.database import (
+    create_async_db_engine,
+    create_db_engine,
+    to_async_url,
+)
+from ollie.storage.models import Base, Conversation, Session
+
+
+class FakeScheduler:
+    async def chat(self, payload, priority, timeout):
+        return {"message": {"content": "  They talked.  "}}
+
+
+class FakeMemory:
+    def __init__(self):
+        self.summaries = []
+
+    async def add_session_summary(self, session_id, summary, metadata):
+        self.summaries.append((session_id, summary, metadata))
+
+
+def run_with_sessions(tmp_path, scenario):
+    url = f"sqlite:///{tmp_path / 'ollie.db'}"
+    Base.metadata.create_all(bind=create_db_engine(url))
+
+    async def wrapper():
+        engine = create_async_db_engine(to_async_url(url))
+        try:
+            return await scenario(async_sessionmaker(engine, expire_on_commit=False))
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(wrapper())
+
+
+async def add_session(sessions, session_id, turns, summary=None, end_time=None):
+    async with sessions() as db:
+        db.add(
+            Session(
+                id=session_id,
+                start_time=turns[0],
+                end_time=end_time,
+                summary=summary,
+            )
+        )
+        for i, timestamp in enumerate(turns):
+            db.add(
+                Conversation(
+                    session_id=session_id,
+                    speaker="User",
+                    transcript=f"turn {i}",
+                    timestamp=timestamp,
+                )
+            )
+        await db.commit()
+
+
+def test_closed_open_and_stale_sessions(tmp_path):
+    now = datetime.utcnow()
+    idle, active = now - timedelta(hours=2), now - timedelta(minutes=1)
+    memory = FakeMemory()
+
+    async def scenario(sessions):
+        # Closed: no summary, idle
+        await add_session(sessions, 1, [idle])
+        # Open: no summary, recent turns
+        await add_session(sessions, 2, [active])
+        # Stale and idle: a turn after the summarized end_time
+        await add_session(
+            sessions,
+            3,
+            [idle - timedelta(hours=1), idle],
+            "old",
+            idle - timedelta(hours=1),
+        )
+        # Stale but still active: not summarized again yet
+        await add_session(sessions, 4, [idle, active], "old", idle)
+        # Up to date
+        await add_session(sessions, 5, [idle], "done", idle)
+        # Ended explicitly, so closed before the idle timeout
+        await add_session(sessions, 6, [active], end_time=active)
+
+        summarizer = SessionSummarizer(
+            memory, FakeScheduler(), model="m", idle_minutes=30, sessions=sessions
+        )
+        closed = await summarizer.find_closed_sessions(limit=10)
+        unsummarized = await unsummarized_session_ids(sessions=sessions)
+
+        assert await summarizer.summarize_session(3) == "They talked."
+        async with sessions() as db:
+            stale = await db.get(Session, 3)
+        return (
+            closed,
+            unsummarized,
+            stale,
+            await summarizer.find_closed_sessions(limit=10),
+            await unsummarized_session_ids(sessions=sessions),
+        )
+
+    closed, unsummarized, stale, closed_after, unsummarized_after = run_with_sessions(
+        tmp_path, scenario
+    )
+    assert closed == [1, 3, 6]
+    assert unsummarized == [6, 4, 3, 2, 1]
+
+    # Re-summarizing extends the summary to the later turn
+    assert stale.summary == "They talked."
+    assert stale.end_time == idle
+    assert memory.summaries == [
+        (
+            3,
+            "They talked.",
+            {
+                "session_id": 3,
+                "start_time": (idle - timedelta(hours=1)).isoformat(),
+                "end_time": idle.isoformat(),
+                "type": "session_summary",
+            },
+        )
+    ]
+    assert closed_after == [1, 6]
+    assert unsummarized_after == [6, 4, 2, 1]
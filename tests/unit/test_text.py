@@ -0,0 +1,45 @@
+from ollie.utils.text import SentenceSplitter, normalize_words, split_sentences
+
+
+def _stream(splitter, text):
+    sentences = []
+    for word in text.split(" "):
+        sentences += splitter.feed(word + " ")
+    return sentences + splitter.flush()
+
+
+def test_sentences_are_emitted_as_soon_as_complete():
+    splitter = SentenceSplitter(min_chars=1)
+    assert splitter.feed("The seeds arrived") == []
+    assert splitter.feed(" on Monday. They") == ["The seeds arrived on Monday."]
+    assert splitter.feed(" look fine!\n") == ["They look fine!"]
+    assert splitter.flush() == []
+
+
+def test_abbreviations_and_short_fragments_are_not_split():
+    splitter = SentenceSplitter(min_chars=20)
+    text = 'Sure. I talked to Dr. Smith about the garden. He said "plant in May!" Then we had tea'
+    assert _stream(splitter, text) == [
+        "Sure. I talked to Dr. Smith about the garden.",
+        'He said "plant in May!"',
+        "Then we had tea",
+    ]
+
+
+def test_normalize_words():
+    assert normalize_words("What did I say, about gardens?") == [
+        "what",
+        "did",
+        "i",
+        "say",
+        "about",
+        "gardens",
+    ]
+
+
+def test_split_sentences_matches_streaming_split():
+    text = "Good morning. The tomatoes need water today. Do not forget the basil!"
+    assert split_sentences(text) == [
+        "Good morning. The tomatoes need water today.",
+        "Do not forget the basil!",
+    ]
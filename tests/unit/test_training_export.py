@@ -0,0 +1,70 @@
+import json
+from datetime import datetime, timedelta
+
+from sqlalchemy.orm import sessionmaker
+
+from ollie.storage.database import create_db_engine
+from ollie.storage.models import Base, Conversation, Session
+from ollie.training.export import (
+    commit_watermark,
+    export_new_conversations,
+    load_watermark,
+)
+
+
+def add_turns(sessions, session_id, texts, start):
+    with sessions() as db:
+        if db.get(Session, session_id) is None:
+            db.add(Session(id=session_id))
+        for i, text in enumerate(texts):
+            db.add(
+                Conversation(
+                    session_id=session_id,
+                    speaker="User" if i % 2 == 0 else "Ollie",
+                    transcript=text,
+                    timestamp=start + timedelta(seconds=i),
+                )
+            )
+        db.commit()
+
+
+def read_jsonl(path):
+    with open(path) as f:
+        return [[m["content"] for m in json.loads(line)["messages"]] for line in f]
+
+
+def test_each_run_exports_only_new_conversations(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'ollie.db'}")
+    Base.metadata.create_all(bind=engine)
+    sessions = sessionmaker(bind=engine)
+    output = str(tmp_path / "training" / "data.jsonl")
+    start = datetime(2024, 1, 1)
+    add_turns(sessions, 1, ["hi", "hello", "how are you", "fine"], start)
+    add_turns(sessions, 2, ["remind me", "sure"], start + timedelta(hours=1))
+
+    # A page size smaller than a session exercises the keyset continuation
+    first = export_new_conversations(output, sessions, page_size=3)
+    assert first["conversations"] == 6 and first["sessions"] == 2
+    assert read_jsonl(output) == [
+        ["hi", "hello", "how are you", "fine"],
+        ["remind me", "sure"],
+    ]
+
+    # Until the export is committed (training succeeded) it is exported again
+    retry = export_new_conversations(output, sessions, page_size=3)
+    assert (
+        retry["conversations"] == 6 and load_watermark(sessions)["conversation_id"] == 0
+    )
+    commit_watermark(retry["to_id"], sessions)
+    rerun = export_new_conversations(output, sessions, page_size=3)
+    assert rerun["conversations"] == 0 and read_jsonl(output) == []
+
+    # New turns in an old session (stored late, with an earlier timestamp) and a new session
+    add_turns(sessions, 1, ["one more thing"], start - timedelta(days=1))
+    add_turns(sessions, 3, ["good morning", "morning"], start + timedelta(days=1))
+    third = export_new_conversations(output, sessions, page_size=3)
+    assert read_jsonl(output) == [["one more thing"], ["good morning", "morning"]]
+    commit_watermark(third["to_id"], sessions)
+    # The watermark never moves back
+    commit_watermark(first["to_id"], sessions)
+    assert load_watermark(sessions)["conversation_id"] == third["to_id"] == 9
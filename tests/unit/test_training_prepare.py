@@ -0,0 +1,97 @@
+import json
+
+from ollie.training.prepare import IGNORE_INDEX, DEFAULT_CHAT_TEMPLATE, prepare_dataset
+
+
+class WordTokenizer:
+    """Whitespace tokenizer with the parts of the Hugging Face interface the preparation uses."""
+
+    name_or_path = "word-tokenizer"
+    eos_token_id = 1
+    pad_token_id = 0
+
+    def __init__(self):
+        self.chat_template = None
+        self.vocab = {}
+
+    def __len__(self):
+        return 1000
+
+    def apply_chat_template(self, messages, tokenize=False):
+        assert self.chat_template == DEFAULT_CHAT_TEMPLATE and not tokenize
+        return " ".join(f"<{m['role']}> {m['content']}" for m in messages)
+
+    def __call__(self, text, add_special_tokens=True):
+        return {
+            "input_ids": [
+                self.vocab.setdefault(word, len(self.vocab) + 2)
+                for word in text.split()
+            ]
+        }
+
+
+def dialogue(*contents):
+    return {
+        "messages": [
+            {"role": "user" if i % 2 == 0 else "assistant", "content": c}
+            for i, c in enumerate(contents)
+        ]
+    }
+
+
+def test_dialogues_are_deduplicated_filtered_and_packed(tmp_path):
+    data_file = tmp_path / "daily.jsonl"
+    story = (
+        "we walked along the river to the old mill and talked about the garden plans for spring, then stopped "
+        "at the bakery for bread and coffee before heading home in the rain while the dog ran ahead of us "
+        "through the puddles"
+    )
+    rows = [
+        dialogue("what did we do on sunday?", story),
+        dialogue("What did we do on Sunday", story),  # exact duplicate once normalized
+        dialogue("what did we do on sunday?", story + " again"),  # near-duplicate
+        dialogue("hi", "hello"),  # trivially short
+        dialogue(
+            "just talking to myself for a while about nothing in particular"
+        ),  # no reply
+        dialogue(
+            "remind me to call the plumber tomorrow morning",
+            "Sure, I will remind you at nine.",
+        ),
+    ]
+    data_file.write_text("".join(json.dumps(row) + "\n" for row in rows))
+    tokenizer = WordTokenizer()
+    (tmp_path / "cache" / "from-an-earlier-export").mkdir(parents=True)
+
+    dataset = prepare_dataset(
+        str(data_file), tokenizer, str(tmp_path / "cache"), seq_len=32
+    )
+
+    # Entries for earlier exports are pruned
+    (entry,) = (tmp_path / "cache").iterdir()
+    stats = json.loads((entry / "prepare_stats.json").read_text())
+    assert stats["dialogues"] == 6 and stats["kept"] == 2
+    assert (
+        stats["exact_duplicates"] == 1
+        and stats["near_duplicates"] == 1
+        and stats["short"] == 2
+    )
+    assert all(len(ids) == 32 for ids in dataset["input_ids"])
+    # Both dialogues end in EOS inside the packed stream; only the last block is padded
+    tokens = [
+        t
+        for ids, mask in zip(dataset["input_ids"], dataset["attention_mask"])
+        for t, m in zip(ids, mask)
+        if m
+    ]
+    assert tokens.count(tokenizer.eos_token_id) == 2 and len(tokens) == stats["tokens"]
+    assert (
+        dataset["labels"][-1][-1] == IGNORE_INDEX
+        and IGNORE_INDEX not in dataset["labels"][0]
+    )
+
+    # A rerun on the same file and settings loads the cached dataset
+    cached = prepare_dataset(
+        str(data_file), WordTokenizer(), str(tmp_path / "cache"), seq_len=32
+    )
+    assert cached["input_ids"] == dataset["input_ids"]
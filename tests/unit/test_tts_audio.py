@@ -0,0 +1,30 @@
+import io
+import wave
+
+import numpy as np
+
+from ollie.tts.audio import streaming_wav_header, to_pcm16, wav_bytes
+
+
+def test_streamed_chunks_form_a_readable_wav():
+    chunks = [to_pcm16(np.full(100, 0.5)), to_pcm16(np.full(50, -0.5))]
+    stream = streaming_wav_header(24000) + b"".join(chunks)
+
+    with wave.open(io.BytesIO(stream), "rb") as wav_file:
+        assert wav_file.getframerate() == 24000
+        assert wav_file.getnchannels() == 1
+        assert wav_file.getsampwidth() == 2
+        frames = np.frombuffer(wav_file.readframes(1000), dtype="<i2")
+    assert len(frames) == 150
+    assert frames[0] == 16383 and frames[-1] == -16383
+
+
+def test_wav_bytes_round_trip():
+    pcm = to_pcm16(np.array([0.0, 1.0, -1.0, 2.0]))
+    with wave.open(io.BytesIO(wav_bytes(pcm, 16000)), "rb") as wav_file:
+        assert np.frombuffer(wav_file.readframes(10), dtype="<i2").tolist() == [
+            0,
+            32767,
+            -32767,
+            32767,
+        ]
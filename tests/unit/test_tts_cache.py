@@ -0,0 +1,51 @@
+import os
+
+from ollie.tts.cache import AudioCache
+
+
+def test_key_is_stable_and_covers_language_speaker_and_model(tmp_path):
+    speaker_a = tmp_path / "a.wav"
+    speaker_b = tmp_path / "b.wav"
+    speaker_a.write_bytes(b"voice a")
+    speaker_b.write_bytes(b"voice b")
+    cache = AudioCache(str(tmp_path / "cache"))
+
+    key = cache.key("Hello there.", "en", str(speaker_a), "xtts")
+    assert key == AudioCache(str(tmp_path / "cache")).key(
+        "Hello there.", "en", str(speaker_a), "xtts"
+    )
+    assert key != cache.key("Hello there.", "pt", str(speaker_a), "xtts")
+    assert key != cache.key("Hello there.", "en", str(speaker_b), "xtts")
+    assert key != cache.key("Hello there.", "en", str(speaker_a), "other")
+    # The speaker is identified by content, not path
+    speaker_copy = tmp_path / "copy.wav"
+    speaker_copy.write_bytes(b"voice a")
+    assert key == cache.key("Hello there.", "en", str(speaker_copy), "xtts")
+
+
+def test_hits_survive_reopening(tmp_path):
+    cache = AudioCache(str(tmp_path))
+    key = cache.key("Sure.", "en", None, "xtts")
+    assert cache.get(key) is None
+    cache.put(key, b"RIFF audio")
+
+    reopened = AudioCache(str(tmp_path))
+    assert reopened.get(key) == b"RIFF audio"
+    assert reopened.stats()["hits"] == 1 and reopened.stats()["bytes"] == 10
+
+
+def test_evicts_least_recently_used_beyond_size_limit(tmp_path):
+    cache = AudioCache(str(tmp_path), max_bytes=250)
+    keys = [cache.key(f"phrase {i}", "en", None, "xtts") for i in range(3)]
+    for i, key in enumerate(keys[:2]):
+        path = cache.put(key, b"x" * 100)
+        os.utime(path, (1000 + i, 1000 + i))
+        cache._entries[key] = (100, 1000 + i)
+
+    # Touching the oldest entry makes the other one the eviction candidate
+    assert cache.get(keys[0]) is not None
+    cache.put(keys[2], b"x" * 100)
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None and cache.get(keys[2]) is not None
+    assert cache.stats()["bytes"] == 200
@@ -0,0 +1,80 @@
+import asyncio
+
+from ollie.tts.jobs import DONE, FAILED, PENDING, RUNNING, BatchJobs
+
+
+def test_submitted_job_renders_every_item():
+    async def render(text, language, speaker_wav, on_start):
+        await asyncio.sleep(0.01 if text == "slow" else 0)
+        if text == "bad":
+            raise RuntimeError("synthesis failed")
+        return f"/cache/{text}.wav", text == "cached"
+
+    async def scenario():
+        jobs = BatchJobs(render)
+        job = jobs.submit(["slow", "cached", "bad"], "en", None)
+        assert jobs.get(job.id) is job
+        await job.task
+        return job
+
+    job = asyncio.run(scenario())
+    assert [item["status"] for item in job.items] == [DONE, DONE, FAILED]
+    assert job.items[0]["path"] == "/cache/slow.wav" and job.items[1]["cached"] is True
+    assert job.status == FAILED
+    assert job.summary()["counts"] == {DONE: 2, FAILED: 1}
+
+
+def test_streamed_results_arrive_in_completion_order():
+    async def render(text, language, speaker_wav, on_start):
+        await asyncio.sleep(float(text))
+        return f"/cache/{text}.wav", False
+
+    async def scenario():
+        jobs = BatchJobs(render)
+        job = jobs.create(["0.03", "0.01", "0.02"])
+        return [item["index"] async for item in jobs.iter_results(job)], job
+
+    order, job = asyncio.run(scenario())
+    assert order == [1, 2, 0]
+    assert job.status == DONE and job.finished is not None
+
+
+def test_items_wait_as_pending_until_they_get_a_worker():
+    slot = asyncio.Semaphore(1)
+
+    async def render(text, language, speaker_wav, on_start):
+        async with slot:
+            on_start()
+            await asyncio.sleep(0.01)
+        return f"/cache/{text}.wav", False
+
+    async def scenario():
+        jobs = BatchJobs(render)
+        job = jobs.submit(["a", "b", "c"])
+        await asyncio.sleep(0.005)
+        statuses = [item["status"] for item in job.items]
+        await job.task
+        return statuses, job
+
+    statuses, job = asyncio.run(scenario())
+    # as_completed starts the items in no particular order; one holds the worker, the rest wait
+    assert sorted(statuses) == [PENDING, PENDING, RUNNING]
+    assert job.status == DONE
+
+
+def test_finished_jobs_are_pruned_beyond_limit():
+    async def render(text, language, speaker_wav, on_start):
+        return "/cache/x.wav", True
+
+    async def scenario():
+        jobs = BatchJobs(render, max_jobs=2)
+        ids = []
+        for _ in range(4):
+            job = jobs.submit(["hi"])
+            await job.task
+            ids.append(job.id)
+        return jobs, ids
+
+    jobs, ids = asyncio.run(scenario())
+    assert jobs.get(ids[0]) is None
+    assert jobs.get(ids[-1]) is not None
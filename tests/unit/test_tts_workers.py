@@ -0,0 +1,70 @@
+import asyncio
+from concurrent.futures import Executor, Future
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from ollie.tts.workers import SynthesisPool
+
+
+class FakeExecutor(Executor):
+    """Runs nothing; every call fails as if a worker had died, or returns its arguments."""
+
+    def __init__(self, broken: bool):
+        self.broken = broken
+
+    def submit(self, fn, *args):
+        future = Future()
+        if self.broken:
+            future.set_exception(
+                BrokenProcessPool(
+                    "A process in the process pool was terminated abruptly"
+                )
+            )
+        else:
+            future.set_result(args)
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        pass
+
+
+def test_broken_pool_is_restarted_once_and_calls_retried():
+    pool = SynthesisPool(workers=2, model_name="xtts")
+    restarts = []
+
+    async def start():
+        restarts.append(1)
+        pool.executor = FakeExecutor(broken=False)
+
+    pool.start = start
+    pool.executor = FakeExecutor(broken=True)
+    started = []
+
+    async def scenario():
+        return await asyncio.gather(
+            pool.run(
+                "synthesize_wav", "hello", on_start=lambda: started.append("hello")
+            ),
+            pool.run(
+                "synthesize_wav", "world", on_start=lambda: started.append("world")
+            ),
+        )
+
+    results = asyncio.run(scenario())
+    assert results == [("synthesize_wav", ("hello",)), ("synthesize_wav", ("world",))]
+    assert len(restarts) == 1
+    assert sorted(started) == ["hello", "world"]
+    assert pool.slots.waiting() == 0
+
+
+def test_run_before_start_fails_clearly_and_frees_the_slot():
+    pool = SynthesisPool(workers=1, model_name="xtts")
+
+    async def scenario():
+        for _ in range(2):
+            with pytest.raises(RuntimeError, match="synthesis pool not started"):
+                await pool.run("synthesize_wav", "hello")
+
+    asyncio.run(scenario())
+    assert pool.slots.waiting() == 0
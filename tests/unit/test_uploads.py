@@ -0,0 +1,42 @@
+import asyncio
+import hashlib
+import os
+
+from ollie.utils.uploads import file_chunks, save_stream, spool
+
+
+async def chunks_of(data: bytes, size: int):
+    for i in range(0, len(data), size):
+        yield data[i : i + size]
+
+
+def test_save_stream_names_file_by_content_hash(tmp_path):
+    data = os.urandom(300_000)
+
+    async def scenario():
+        first = await save_stream(
+            chunks_of(data, 65536), str(tmp_path / "day"), suffix=".wav"
+        )
+        again = await save_stream(
+            chunks_of(data, 1000), str(tmp_path / "day"), suffix=".wav"
+        )
+        read_back = b"".join([chunk async for chunk in file_chunks(first[0], 4096)])
+        return first, again, read_back
+
+    (path, digest, size), again, read_back = asyncio.run(scenario())
+    assert digest == hashlib.sha256(data).hexdigest() and size == len(data)
+    assert path == str(tmp_path / "day" / f"{digest}.wav") and again[0] == path
+    assert read_back == data
+    # No partial files are left behind
+    assert os.listdir(tmp_path / "day") == [f"{digest}.wav"]
+
+
+def test_spool_rolls_over_to_disk_beyond_max_memory():
+    data = os.urandom(100_000)
+
+    async def scenario(max_memory):
+        with await spool(chunks_of(data, 8192), max_memory=max_memory) as buffer:
+            return buffer._rolled, buffer.read()
+
+    assert asyncio.run(scenario(1_000_000)) == (False, data)
+    assert asyncio.run(scenario(10_000)) == (True, data)